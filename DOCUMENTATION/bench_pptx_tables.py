@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Table-building benchmark for generate_pptx.py.
+
+Builds synthetic access matrices (every tenth row a section header, the rest
+a mix of ✅ / — / short text like the real deck) and times two paths for
+the same output:
+
+- ``per-cell``: every cell styled through add_table_cell() (the old path);
+- ``bulk``: TableWriter, one styled template per cell style, copied.
+
+Both paginate the same way, so slide count and file size are reported once
+per row count. The file size is the saved (zipped) .pptx.
+
+Usage:
+  python3 DOCUMENTATION/bench_pptx_tables.py
+  python3 DOCUMENTATION/bench_pptx_tables.py --rows 50 500 --repeat 5 --json tables.json
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate_pptx  # noqa: E402
+
+SECTION_COLORS = [None, 'bronze', 'silver', 'gold']
+VALUES = [generate_pptx.CHECK] * 5 + [generate_pptx.DASH] * 3 + ['Lokal', 'Cloud E2EE']
+
+
+def synthetic_matrix(num_rows, columns, seed=0):
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(num_rows):
+        if i % 10 == 0:
+            rows.append({'section': f'Section {i // 10 + 1}', 'color': SECTION_COLORS[(i // 10) % 4]})
+        else:
+            rows.append([f'Feature {i}'] + [rnd.choice(VALUES) for _ in columns[1:]])
+    return {
+        'columns': columns,
+        'slides': [{'title': 'Feature Access Matrix', 'subtitle': f'{num_rows} rows', 'rows': rows}],
+    }
+
+
+def run(matrix, bulk):
+    started = time.perf_counter()
+    prs = generate_pptx.new_presentation()
+    generate_pptx.build_matrix_slides(prs, generate_pptx.palette(None), matrix, bulk=bulk)
+    built = time.perf_counter()
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    saved = time.perf_counter()
+    return {
+        'buildMs': (built - started) * 1000,
+        'saveMs': (saved - built) * 1000,
+        'slides': len(prs.slides),
+        'bytes': buffer.tell(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-cell and bulk table building in generate_pptx.py.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[50, 100, 250, 500],
+                        help='Matrix sizes (data rows incl. section headers)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size and path (median is reported)')
+    parser.add_argument('--variant', default='de', help='Variant whose matrix columns are used')
+    parser.add_argument('--json', metavar='PATH', help='Write the results as JSON')
+    args = parser.parse_args()
+
+    columns = generate_pptx.load_variant(args.variant)['matrix']['columns']
+    results = []
+    print(f"{'rows':>5} {'slides':>6} {'size':>8}  {'per-cell':>10} {'bulk':>10} {'speedup':>8}  {'save':>8}")
+    for num_rows in args.rows:
+        matrix = synthetic_matrix(num_rows, columns)
+        per_cell = [run(matrix, bulk=False) for _ in range(args.repeat)]
+        bulk = [run(matrix, bulk=True) for _ in range(args.repeat)]
+        slow = statistics.median(r['buildMs'] for r in per_cell)
+        fast = statistics.median(r['buildMs'] for r in bulk)
+        save = statistics.median(r['saveMs'] for r in bulk)
+        if per_cell[0]['bytes'] != bulk[0]['bytes']:
+            print(f'   warning: outputs differ in size ({per_cell[0]["bytes"]} vs {bulk[0]["bytes"]} bytes)')
+        result = {
+            'rows': num_rows,
+            'slides': bulk[0]['slides'],
+            'kb': round(bulk[0]['bytes'] / 1024, 1),
+            'perCellBuildMs': round(slow, 1),
+            'bulkBuildMs': round(fast, 1),
+            'speedup': round(slow / fast, 2),
+            'saveMs': round(save, 1),
+        }
+        results.append(result)
+        print(f"{num_rows:>5} {result['slides']:>6} {result['kb']:>6}KB  {slow:>8.0f}ms {fast:>8.0f}ms "
+              f"{result['speedup']:>7.1f}x  {save:>6.0f}ms")
+
+    if args.json:
+        with open(args.json, 'w') as fh:
+            json.dump({'repeat': args.repeat, 'results': results}, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,8 @@
 Meaningful Conversations — PPTX Generator
 ==========================================
 
-Generates a 5-slide PowerPoint presentation from the User Access Matrix.
+Generates the 6-slide User Access Matrix & Pricing presentation, once per
+variant in DOCUMENTATION/pptx-data/.
 
 Slides:
   1. Title
@@ -13,45 +14,156 @@ Slides:
   5. Bot Categories — Bronze · Silver · Gold
   6. Upgrade Paths & Discounts
 
+Variants:
+  Every pptx-data/<name>.json is one variant (locale or brand): slide texts,
+  matrix rows, tiers, upgrade rows, brand colours and the output file name.
+  A variant may start with "extends": "<other variant>" and only list what
+  differs; objects are merged key by key, lists are replaced.
+  Prices, matrix and upgrade changes are made in the JSON, not here.
+
+  Variants are built in parallel worker processes. Each output records a
+  hash of its inputs (resolved variant data + this script) in its document
+  properties; a variant whose hash is unchanged is skipped.
+
+Tables:
+  Cells are written through TableWriter (one styled template per cell
+  style, copied). A matrix that does not fit on one slide continues on the
+  next, with the header row and current section repeated.
+  bench_pptx_tables.py times this against per-cell styling.
+
 Usage:
   pip install python-pptx
-  python3 DOCUMENTATION/generate_pptx.py
+  python3 DOCUMENTATION/generate_pptx.py                 # all variants
+  python3 DOCUMENTATION/generate_pptx.py --variant de    # one variant
+  python3 DOCUMENTATION/generate_pptx.py --force         # ignore the hashes
 
-Output:
+Output (default variant "de"):
   DOCUMENTATION/Meaningful-Conversations-Access-Matrix-Pricing.pptx
 
 Last updated: February 2026 — v1.8.9+
 """
 
+import argparse
+import copy
+import hashlib
+import json
 import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 from pptx import Presentation
 from pptx.util import Inches, Pt, Emu
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.enum.shapes import MSO_SHAPE
+from pptx.oxml.ns import qn
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, 'pptx-data')
+
+# Stored in the output's dc:identifier so unchanged variants can be skipped
+INPUTS_PREFIX = 'inputs-sha256:'
+
+CHECK = '✅'
+DASH = '—'
+
+# Matrix tables are split across slides once their rows would have to be
+# squeezed below MATRIX_ROW_MIN_H to fit into MATRIX_TABLE_MAX_H
+MATRIX_TABLE_MAX_H = 6.2
+MATRIX_ROW_MIN_H = 0.36
 
 # ─── Brand Colors ──────────────────────────────────────────────────────────────
+# Defaults; a variant's "brand" object overrides them by name.
+
+DEFAULT_BRAND = {
+    'teal': '#1B7272',
+    'tealLight': '#E0F2F1',
+    'white': '#FFFFFF',
+    'dark': '#1F2937',
+    'gray': '#6B7280',
+    'grayLight': '#F3F4F6',
+    'bronze': '#CD7F32',
+    'bronzeBg': '#FDF0E0',
+    'silver': '#475669',          # Darker silver text for better contrast
+    'silverBg': '#DBE2EF',        # Blue-tinted background
+    'silverCard': '#E8ECF4',
+    'gold': '#D97706',
+    'goldBg': '#FFFBEB',
+    'green': '#16A34A',
+    'red': '#DC2626',
+    'headerSubtitle': '#B0D8D8',
+    'muted': '#BBBBBB',
+    'highlight': '#166534',       # Dark green for discounted prices
+    'referenceRow': '#F9FAFB',
+}
+
+# Section header rows in the matrix: text colour -> background colour
+SECTION_BACKGROUNDS = {'bronze': 'bronzeBg', 'silver': 'silverBg', 'gold': 'goldBg'}
+
+
+def palette(brand):
+    colors = dict(DEFAULT_BRAND, **(brand or {}))
+    return {name: RGBColor.from_string(value.lstrip('#')) for name, value in colors.items()}
+
+
+# ─── Variant data ──────────────────────────────────────────────────────────────
+
+def _merge(base, override):
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def list_variants(data_dir=DATA_DIR):
+    return sorted(name[:-5] for name in os.listdir(data_dir) if name.endswith('.json'))
+
+
+def load_variant(name, data_dir=DATA_DIR, _seen=()):
+    """Variant data with its "extends" chain resolved."""
+    if name in _seen:
+        raise ValueError(f'circular "extends" in pptx-data: {" -> ".join(_seen + (name,))}')
+    with open(os.path.join(data_dir, f'{name}.json'), encoding='utf-8') as fh:
+        data = json.load(fh)
+    parent = data.pop('extends', None)
+    if parent:
+        data = _merge(load_variant(parent, data_dir, _seen + (name,)), data)
+    return data
+
+
+def inputs_hash(data):
+    """Hash of everything that determines a variant's output."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    with open(os.path.abspath(__file__), 'rb') as fh:
+        digest.update(fh.read())
+    return digest.hexdigest()
+
+
+def built_inputs(path):
+    """Inputs hash recorded in an existing output, or None."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            core = zf.read('docProps/core.xml').decode('utf-8')
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    match = re.search(r'<dc:identifier>' + re.escape(INPUTS_PREFIX) + r'([0-9a-f]+)</dc:identifier>', core)
+    return match.group(1) if match else None
 
-TEAL = RGBColor(0x1B, 0x72, 0x72)
-TEAL_LIGHT = RGBColor(0xE0, 0xF2, 0xF1)
-WHITE = RGBColor(0xFF, 0xFF, 0xFF)
-DARK = RGBColor(0x1F, 0x29, 0x37)
-GRAY = RGBColor(0x6B, 0x72, 0x80)
-GRAY_LIGHT = RGBColor(0xF3, 0xF4, 0xF6)
-BRONZE = RGBColor(0xCD, 0x7F, 0x32)
-BRONZE_BG = RGBColor(0xFD, 0xF0, 0xE0)
-SILVER = RGBColor(0x47, 0x56, 0x69)          # Darker silver text for better contrast
-SILVER_BG = RGBColor(0xDB, 0xE2, 0xEF)       # Blue-tinted background
-GOLD = RGBColor(0xD9, 0x77, 0x06)
-GOLD_BG = RGBColor(0xFF, 0xFB, 0xEB)
-GREEN = RGBColor(0x16, 0xA3, 0x4A)
-RED = RGBColor(0xDC, 0x26, 0x26)
 
 # ─── Helpers ───────────────────────────────────────────────────────────────────
 
-prs = Presentation()
-prs.slide_width = Inches(13.333)
-prs.slide_height = Inches(7.5)
+def new_presentation():
+    prs = Presentation()
+    prs.slide_width = Inches(13.333)
+    prs.slide_height = Inches(7.5)
+    return prs
 
 
 def add_bg(slide, color):
@@ -62,7 +174,7 @@ def add_bg(slide, color):
 
 
 def add_text_box(slide, left, top, width, height, text,
-                 font_size=12, bold=False, color=DARK,
+                 font_size=12, bold=False, color=None,
                  alignment=PP_ALIGN.LEFT, font_name='Calibri'):
     txBox = slide.shapes.add_textbox(
         Inches(left), Inches(top), Inches(width), Inches(height))
@@ -72,14 +184,15 @@ def add_text_box(slide, left, top, width, height, text,
     p.text = text
     p.font.size = Pt(font_size)
     p.font.bold = bold
-    p.font.color.rgb = color
+    if color is not None:
+        p.font.color.rgb = color
     p.font.name = font_name
     p.alignment = alignment
     return txBox
 
 
 def add_table_cell(table, row, col, text,
-                   font_size=9, bold=False, color=DARK,
+                   font_size=9, bold=False, color=None,
                    alignment=PP_ALIGN.CENTER, bg_color=None):
     cell = table.cell(row, col)
     cell.text = ""
@@ -87,7 +200,8 @@ def add_table_cell(table, row, col, text,
     p.text = text
     p.font.size = Pt(font_size)
     p.font.bold = bold
-    p.font.color.rgb = color
+    if color is not None:
+        p.font.color.rgb = color
     p.font.name = 'Calibri'
     p.alignment = alignment
     cell.vertical_anchor = MSO_ANCHOR.MIDDLE
@@ -100,6 +214,43 @@ def add_table_cell(table, row, col, text,
     cell.margin_bottom = Emu(27432)
 
 
+class TableWriter:
+    """Fills a table, styling each distinct cell style only once.
+
+    The first cell of a style goes through add_table_cell(); its XML is kept
+    as a template and every later cell of that style is a copy with the text
+    swapped in, instead of a dozen python-pptx property setters. Text with
+    line breaks or control characters is not swapped in (add_table_cell()
+    knows how to encode it); such cells are reused only for the same text.
+    Pass the same ``templates`` dict to the writers of several tables (pages
+    of one matrix) to share the templates. ``bulk=False`` styles every cell
+    one by one (same output, kept for the benchmark).
+    """
+
+    def __init__(self, table, bulk=True, templates=None):
+        self.table = table
+        self.bulk = bulk
+        self._templates = {} if templates is None else templates
+        self._rows = table._tbl.tr_lst
+
+    def cell(self, row, col, text, **style):
+        if not self.bulk:
+            add_table_cell(self.table, row, col, text, **style)
+            return
+        swap = text.isprintable()
+        key = (bool(text) if swap else text, tuple(sorted(style.items())))
+        tr = self._rows[row]
+        template = self._templates.get(key)
+        if template is None:
+            add_table_cell(self.table, row, col, text, **style)
+            self._templates[key] = copy.deepcopy(tr.tc_lst[col])
+            return
+        tc = copy.deepcopy(template)
+        if swap and text:
+            tc.find(f".//{qn('a:t')}").text = text
+        tr.replace(tr.tc_lst[col], tc)
+
+
 def add_rounded_rect(slide, left, top, width, height,
                      fill_color, line_color=None):
     shape = slide.shapes.add_shape(
@@ -116,494 +267,404 @@ def add_rounded_rect(slide, left, top, width, height,
     return shape
 
 
-def build_matrix_slide(slide, title, subtitle, rows_data):
-    """Build a matrix slide with a teal header bar and a data table."""
-    add_bg(slide, WHITE)
-    hdr = slide.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(0.9))
-    hdr.fill.solid()
-    hdr.fill.fore_color.rgb = TEAL
-    hdr.line.fill.background()
+def add_bar(prs, slide, top, height, color):
+    bar = slide.shapes.add_shape(
+        MSO_SHAPE.RECTANGLE, 0, Inches(top), prs.slide_width, Inches(height))
+    bar.fill.solid()
+    bar.fill.fore_color.rgb = color
+    bar.line.fill.background()
+    return bar
+
+
+def add_header(prs, slide, c, title, subtitle=None):
+    """Teal header bar; with a subtitle the title is set smaller and higher."""
+    add_bg(slide, c['white'])
+    add_bar(prs, slide, 0, 0.9, c['teal'])
+    if subtitle is None:
+        add_text_box(slide, 0.5, 0.15, 12, 0.6, title,
+                     font_size=28, bold=True, color=c['white'])
+        return
     add_text_box(slide, 0.5, 0.12, 10, 0.35, title,
-                 font_size=26, bold=True, color=WHITE)
+                 font_size=26, bold=True, color=c['white'])
     add_text_box(slide, 0.5, 0.5, 10, 0.3, subtitle,
-                 font_size=12, color=RGBColor(0xB0, 0xD8, 0xD8))
+                 font_size=12, color=c['headerSubtitle'])
+
+
+def paginate_rows(rows_data, per_page):
+    """Split matrix rows into pages of at most ``per_page`` rows.
+
+    A section header never ends a page, and a page that starts inside a
+    section repeats that section's header.
+    """
+    per_page = max(2, per_page)
+    pages = []
+    page = []
+    section = None
+    for row in rows_data:
+        is_section = isinstance(row, dict)
+        # A section header needs room for itself and at least one row
+        if len(page) >= per_page - (1 if is_section else 0):
+            # Headers at the end of the page move to the next one
+            carried = []
+            while page and isinstance(page[-1], dict):
+                carried.insert(0, page.pop())
+            if page:
+                pages.append(page)
+            if carried or is_section or section is None:
+                page = carried
+            else:
+                page = [section]
+        if is_section:
+            section = row
+        page.append(row)
+    if page:
+        pages.append(page)
+    return pages
+
+
+def build_matrix_slide(prs, slide, c, columns, title, subtitle, rows_data,
+                       bulk=True, templates=None):
+    """Build a matrix slide with a teal header bar and a data table.
+
+    ``rows_data`` items are either ``[label, guest, registered, premium,
+    client]`` or a section header ``{"section": label, "color": name}``.
+    """
+    add_header(prs, slide, c, title, subtitle)
 
     num_rows = len(rows_data) + 1
-    num_cols = 5
+    num_cols = len(columns)
 
-    table_h = min(6.2, 0.38 * num_rows + 0.1)
+    table_h = min(MATRIX_TABLE_MAX_H, 0.38 * num_rows + 0.1)
     tbl = slide.shapes.add_table(
         num_rows, num_cols,
         Inches(0.4), Inches(1.15), Inches(12.5), Inches(table_h)).table
+    writer = TableWriter(tbl, bulk, templates)
+
+    for ci, column in enumerate(columns):
+        tbl.columns[ci].width = Inches(column['width'])
+        writer.cell(0, ci, column['label'], font_size=10, bold=True,
+                    color=c['white'], bg_color=c['teal'])
 
-    tbl.columns[0].width = Inches(4.8)
-    tbl.columns[1].width = Inches(1.925)
-    tbl.columns[2].width = Inches(1.925)
-    tbl.columns[3].width = Inches(1.925)
-    tbl.columns[4].width = Inches(1.925)
-
-    headers = [
-        'Feature',
-        'Guest\n(kostenlos)',
-        'Registered\n(3,90 €/Monat)',
-        'Premium\n(9,90 €/Monat)',
-        'Client\n(durch Coach)',
-    ]
-    for ci, h in enumerate(headers):
-        add_table_cell(tbl, 0, ci, h, font_size=10, bold=True,
-                       color=WHITE, bg_color=TEAL)
-
-    for ri, (label, guest, reg, prem, client, is_header, section_color) \
-            in enumerate(rows_data):
+    for ri, row in enumerate(rows_data):
         row_idx = ri + 1
-        if is_header:
-            bg = (GRAY_LIGHT if not section_color
-                  else (BRONZE_BG if section_color == BRONZE
-                        else SILVER_BG if section_color == SILVER
-                        else GOLD_BG))
-            fc = DARK if not section_color else section_color
-            for ci in range(num_cols):
-                add_table_cell(tbl, row_idx, ci, '', bg_color=bg)
-            add_table_cell(tbl, row_idx, 0, label, font_size=10,
-                           bold=True, color=fc, alignment=PP_ALIGN.LEFT,
-                           bg_color=bg)
+        if isinstance(row, dict):
+            section_color = row.get('color')
+            bg = c[SECTION_BACKGROUNDS[section_color]] if section_color else c['grayLight']
+            fc = c[section_color] if section_color else c['dark']
+            writer.cell(row_idx, 0, row['section'], font_size=10,
+                        bold=True, color=fc, alignment=PP_ALIGN.LEFT,
+                        bg_color=bg)
+            for ci in range(1, num_cols):
+                writer.cell(row_idx, ci, '', color=c['dark'], bg_color=bg)
         else:
-            row_bg = WHITE if ri % 2 == 0 else GRAY_LIGHT
-            add_table_cell(tbl, row_idx, 0, label, font_size=10,
-                           color=DARK, alignment=PP_ALIGN.LEFT, bg_color=row_bg)
-            for ci, val in enumerate([guest, reg, prem, client], 1):
-                vc = (GREEN if val == '✅'
-                      else (RGBColor(0xBB, 0xBB, 0xBB) if val == '—'
-                            else DARK))
-                add_table_cell(tbl, row_idx, ci, val, font_size=10,
-                               color=vc, bg_color=row_bg)
+            row_bg = c['white'] if ri % 2 == 0 else c['grayLight']
+            writer.cell(row_idx, 0, row[0], font_size=10,
+                        color=c['dark'], alignment=PP_ALIGN.LEFT, bg_color=row_bg)
+            for ci, val in enumerate(row[1:], 1):
+                vc = (c['green'] if val == CHECK
+                      else (c['muted'] if val == DASH else c['dark']))
+                writer.cell(row_idx, ci, val, font_size=10,
+                            color=vc, bg_color=row_bg)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SLIDE 1 — TITLE
 # ═══════════════════════════════════════════════════════════════════════════════
 
-slide1 = prs.slides.add_slide(prs.slide_layouts[6])
-add_bg(slide1, WHITE)
-
-header = slide1.shapes.add_shape(
-    MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(0.15))
-header.fill.solid()
-header.fill.fore_color.rgb = TEAL
-header.line.fill.background()
-
-add_text_box(slide1, 1.5, 2.0, 10, 1.2,
-             'Meaningful Conversations',
-             font_size=42, bold=True, color=TEAL, alignment=PP_ALIGN.CENTER)
-add_text_box(slide1, 1.5, 3.2, 10, 0.8,
-             'User Access Matrix & Preismodell',
-             font_size=24, color=GRAY, alignment=PP_ALIGN.CENTER)
-add_text_box(slide1, 1.5, 4.3, 10, 0.5,
-             'by manualmode.at  •  v1.8.9  •  Februar 2026',
-             font_size=14, color=GRAY, alignment=PP_ALIGN.CENTER)
-
-bottom = slide1.shapes.add_shape(
-    MSO_SHAPE.RECTANGLE, 0, Inches(7.35), prs.slide_width, Inches(0.15))
-bottom.fill.solid()
-bottom.fill.fore_color.rgb = TEAL
-bottom.line.fill.background()
+def build_title_slide(prs, c, data):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    add_bg(slide, c['white'])
+    add_bar(prs, slide, 0, 0.15, c['teal'])
 
+    add_text_box(slide, 1.5, 2.0, 10, 1.2, data['title'],
+                 font_size=42, bold=True, color=c['teal'], alignment=PP_ALIGN.CENTER)
+    add_text_box(slide, 1.5, 3.2, 10, 0.8, data['subtitle'],
+                 font_size=24, color=c['gray'], alignment=PP_ALIGN.CENTER)
+    add_text_box(slide, 1.5, 4.3, 10, 0.5, data['byline'],
+                 font_size=14, color=c['gray'], alignment=PP_ALIGN.CENTER)
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# SLIDE 2 — PLATFORM FEATURES & FUNCTIONS
-# ═══════════════════════════════════════════════════════════════════════════════
-
-slide2 = prs.slides.add_slide(prs.slide_layouts[6])
-
-#                  (label, guest, registered, premium, client, is_header, section_color)
-features_data = [
-    ('Core Functions',                       '', '', '', '', True,  None),
-    ('Chat & Voice (Web Speech API)',        '✅', '✅', '✅', '✅', False, None),
-    ('Server TTS (High Quality)',            '—',  '✅', '✅', '✅', False, None),
-    ('Life Context',                         'Lokal', 'Cloud E2EE', 'Cloud E2EE', 'Cloud E2EE', False, None),
-    ('Cloud-Sync & Geräteübergreifend',      '—',  '✅', '✅', '✅', False, None),
-    ('Persönlichkeitsprofil (OCEAN)',         '—',  '✅', '✅', '✅', False, None),
-    ('Persönlichkeitsprofil (Riemann & SD)', '—',  '—',  '✅', '✅', False, None),
-    ('Narrative Signature & PDF-Export',      '—',  '✅', '✅', '✅', False, None),
-    ('DPC (Dynamic Prompt Composition)',      '—',  '✅', '✅', '✅', False, None),
-    ('DPFL (Adaptive Learning)',              '—',  '—',  '✅', '✅', False, None),
-    ('Comfort Check',                         '—',  '—',  '✅', '✅', False, None),
-    ('Gamification (XP, Levels)',             'Lokal', '✅', '✅', '✅', False, None),
-    ('Kalenderexport (.ics)',                 '✅', '✅', '✅', '✅', False, None),
-    ('Krisenreaktion (Helplines)',            '✅', '✅', '✅', '✅', False, None),
-]
-
-build_matrix_slide(slide2,
-                   'Feature Access Matrix',
-                   'Plattform-Features & Funktionen',
-                   features_data)
+    add_bar(prs, slide, 7.35, 0.15, c['teal'])
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# SLIDE 3 — COACHING BOTS & EXCLUSIVE FEATURES
+# SLIDES 2–3 — FEATURE ACCESS MATRIX
 # ═══════════════════════════════════════════════════════════════════════════════
 
-slide3 = prs.slides.add_slide(prs.slide_layouts[6])
-
-bots_data = [
-    ('Management & Kommunikation',           '', '', '', '', True, BRONZE),
-    ('Nobody (GPS, Problemlösung)',          '✅', '✅', '✅', '✅', False, None),
-    ('Gloria Interview (Strukturierte Interviews)', '—', '✅', '✅', '✅', False, None),
-    ('Gloria (Onboarding)',                  '✅', '✅', '✅', '✅', False, None),
-    ('Coaching Bots',                        '', '', '', '', True, SILVER),
-    ('Max (Ambitioniert)',                   '✅', '✅', '✅', '✅', False, None),
-    ('Ava (Strategisch)',                    '✅', '✅', '✅', '✅', False, None),
-    ('Kenji (Stoisch)',                      '—',  '—',  '✅', '✅', False, None),
-    ('Chloe (Strukturierte Reflexion)',      '—',  '—',  '✅', '✅', False, None),
-    ('Exklusiv für Klienten',               '', '', '', '', True, GOLD),
-    ('Rob (Mentale Fitness)',                '—',  '—',  '—',  '✅', False, None),
-    ('Victor (Systemisch)',                  '—',  '—',  '—',  '✅', False, None),
-    ('Premium+ Features',                    '', '', '', '', True, None),
-    ('Transcript Evaluation & PDF',          '—',  '—',  '✅', '✅', False, None),
-    ('Bot-Empfehlungen (in Evaluation)',     '—',  '—',  '✅', '✅', False, None),
-    ('PEP Lösungsblockaden (Dr. Bohne)',     '—',  '—',  '—',  '✅', False, None),
-]
-
-build_matrix_slide(slide3,
-                   'Feature Access Matrix',
-                   'Coaching-Bots & exklusive Features',
-                   bots_data)
+def build_matrix_slides(prs, c, data, bulk=True):
+    """One slide per matrix, more if its rows do not fit on one."""
+    per_page = int(MATRIX_TABLE_MAX_H / MATRIX_ROW_MIN_H) - 1
+    templates = {}
+    for matrix in data['slides']:
+        pages = paginate_rows(matrix['rows'], per_page)
+        for number, rows in enumerate(pages, 1):
+            subtitle = matrix['subtitle']
+            if len(pages) > 1:
+                subtitle = f'{subtitle} ({number}/{len(pages)})'
+            slide = prs.slides.add_slide(prs.slide_layouts[6])
+            build_matrix_slide(prs, slide, c, data['columns'],
+                               matrix['title'], subtitle, rows, bulk, templates)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SLIDE 4 — PRICING MODEL
 # ═══════════════════════════════════════════════════════════════════════════════
 
-slide4 = prs.slides.add_slide(prs.slide_layouts[6])
-add_bg(slide4, WHITE)
-
-hdr4 = slide4.shapes.add_shape(
-    MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(0.9))
-hdr4.fill.solid()
-hdr4.fill.fore_color.rgb = TEAL
-hdr4.line.fill.background()
-add_text_box(slide4, 0.5, 0.15, 12, 0.6,
-             'Preismodell — 4 Stufen',
-             font_size=28, bold=True, color=WHITE)
-
-tiers = [
-    {
-        'name': 'Guest',
-        'price': 'Kostenlos',
-        'color': GRAY,
-        'bg': GRAY_LIGHT,
-        'features': [
-            'Nobody, Gloria, Max, Ava',
-            'Chat & Voice',
-            'Life Context (lokal)',
-            'Kalenderexport',
-        ],
-        'limit': 'Daten nur im Browser',
-    },
-    {
-        'name': 'Registered',
-        'price': '3,90 €/Monat',
-        'price2': 'oder 14,90 €/Jahr',
-        'color': TEAL,
-        'bg': TEAL_LIGHT,
-        'features': [
-            'Alles aus Guest, plus:',
-            'Gloria Interview (Transkript)',
-            'Cloud-Sync & E2EE',
-            'Server-TTS (High Quality)',
-            'OCEAN-Profil, Signature, DPC',
-        ],
-        'limit': 'Kein Riemann/SD, DPFL, Kenji/Chloe',
-    },
-    {
-        'name': 'Premium',
-        'price': '9,90 €/Monat',
-        'price2': '24,90 €/3M · 79,90 €/Jahr',
-        'color': SILVER,
-        'bg': RGBColor(0xE8, 0xEC, 0xF4),
-        'features': [
-            'Alles aus Registered, plus:',
-            'Kenji & Chloe',
-            'Riemann-Thomann & Spiral Dynamics',
-            'DPFL & Comfort Check',
-            'Transcript Evaluation (PDF & Bots)',
-        ],
-        'limit': 'Kein Rob/Victor, kein PEP',
-    },
-    {
-        'name': 'Client',
-        'price': 'Durch Coach',
-        'price2': 'Nicht käuflich',
-        'color': GOLD,
-        'bg': GOLD_BG,
-        'features': [
-            'Alles aus Premium, plus:',
-            'Rob & Victor',
-            'PEP Lösungsblockaden',
-            '',
-            '',
-        ],
-        'limit': 'Vollzugang',
-    },
-]
-
-card_w = 2.85
-card_h = 4.2
-gap = 0.25
-total_w = 4 * card_w + 3 * gap
-start_x = (13.333 - total_w) / 2
-
-for i, tier in enumerate(tiers):
-    x = start_x + i * (card_w + gap)
-    y = 1.3
-
-    add_rounded_rect(slide4, x, y, card_w, card_h, tier['bg'], tier['color'])
-
-    add_text_box(slide4, x + 0.15, y + 0.15, card_w - 0.3, 0.4,
-                 tier['name'],
-                 font_size=20, bold=True, color=tier['color'],
-                 alignment=PP_ALIGN.CENTER)
-    add_text_box(slide4, x + 0.15, y + 0.55, card_w - 0.3, 0.35,
-                 tier['price'],
-                 font_size=16, bold=True, color=DARK,
-                 alignment=PP_ALIGN.CENTER)
-
-    if 'price2' in tier:
-        add_text_box(slide4, x + 0.15, y + 0.85, card_w - 0.3, 0.25,
-                     tier['price2'],
-                     font_size=9, color=GRAY, alignment=PP_ALIGN.CENTER)
-
-    div_y = y + 1.15
-    div = slide4.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(x + 0.3), Inches(div_y), Inches(card_w - 0.6), Pt(1))
-    div.fill.solid()
-    div.fill.fore_color.rgb = tier['color']
-    div.line.fill.background()
-
-    feat_y = div_y + 0.15
-    for fi, feat in enumerate(tier['features']):
-        if not feat:
-            continue
-        prefix = '✓ ' if fi > 0 or i == 0 else ''
-        fc = DARK if fi > 0 or i == 0 else tier['color']
-        fb = fi == 0 and i > 0
-        add_text_box(slide4, x + 0.2, feat_y + fi * 0.33, card_w - 0.4, 0.3,
-                     prefix + feat, font_size=10, bold=fb, color=fc)
-
-    add_text_box(slide4, x + 0.15, y + card_h - 0.45, card_w - 0.3, 0.35,
-                 tier['limit'],
-                 font_size=8, color=GRAY, alignment=PP_ALIGN.CENTER)
-
-# Upgrade arrows
-arrow_y = 1.3 + card_h + 0.3
-for i in range(3):
-    ax = start_x + (i + 0.5) * (card_w + gap) + card_w * 0.5 - gap * 0.5
-    arrow = slide4.shapes.add_shape(
-        MSO_SHAPE.RIGHT_ARROW,
-        Inches(ax - 0.2), Inches(arrow_y), Inches(0.5), Inches(0.3))
-    arrow.fill.solid()
-    arrow.fill.fore_color.rgb = TEAL
-    arrow.line.fill.background()
-
-add_text_box(slide4, 0.5, arrow_y + 0.35, 12.3, 0.4,
-             'Guest → Registered → Premium → Client  |  '
-             'Natürlicher Upgrade-Pfad durch erlebten Mehrwert',
-             font_size=12, color=GRAY, alignment=PP_ALIGN.CENTER)
+def build_pricing_slide(prs, c, data):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    add_header(prs, slide, c, data['title'])
+
+    tiers = data['tiers']
+    card_w = 2.85
+    card_h = 4.2
+    gap = 0.25
+    total_w = len(tiers) * card_w + (len(tiers) - 1) * gap
+    start_x = (13.333 - total_w) / 2
+
+    for i, tier in enumerate(tiers):
+        x = start_x + i * (card_w + gap)
+        y = 1.3
+        color = c[tier['color']]
+
+        add_rounded_rect(slide, x, y, card_w, card_h, c[tier['bg']], color)
+
+        add_text_box(slide, x + 0.15, y + 0.15, card_w - 0.3, 0.4,
+                     tier['name'],
+                     font_size=20, bold=True, color=color,
+                     alignment=PP_ALIGN.CENTER)
+        add_text_box(slide, x + 0.15, y + 0.55, card_w - 0.3, 0.35,
+                     tier['price'],
+                     font_size=16, bold=True, color=c['dark'],
+                     alignment=PP_ALIGN.CENTER)
+
+        if 'price2' in tier:
+            add_text_box(slide, x + 0.15, y + 0.85, card_w - 0.3, 0.25,
+                         tier['price2'],
+                         font_size=9, color=c['gray'], alignment=PP_ALIGN.CENTER)
+
+        div_y = y + 1.15
+        div = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            Inches(x + 0.3), Inches(div_y), Inches(card_w - 0.6), Pt(1))
+        div.fill.solid()
+        div.fill.fore_color.rgb = color
+        div.line.fill.background()
+
+        feat_y = div_y + 0.15
+        for fi, feat in enumerate(tier['features']):
+            if not feat:
+                continue
+            prefix = '✓ ' if fi > 0 or i == 0 else ''
+            fc = c['dark'] if fi > 0 or i == 0 else color
+            fb = fi == 0 and i > 0
+            add_text_box(slide, x + 0.2, feat_y + fi * 0.33, card_w - 0.4, 0.3,
+                         prefix + feat, font_size=10, bold=fb, color=fc)
+
+        add_text_box(slide, x + 0.15, y + card_h - 0.45, card_w - 0.3, 0.35,
+                     tier['limit'],
+                     font_size=8, color=c['gray'], alignment=PP_ALIGN.CENTER)
+
+    # Upgrade arrows
+    arrow_y = 1.3 + card_h + 0.3
+    for i in range(len(tiers) - 1):
+        ax = start_x + (i + 0.5) * (card_w + gap) + card_w * 0.5 - gap * 0.5
+        arrow = slide.shapes.add_shape(
+            MSO_SHAPE.RIGHT_ARROW,
+            Inches(ax - 0.2), Inches(arrow_y), Inches(0.5), Inches(0.3))
+        arrow.fill.solid()
+        arrow.fill.fore_color.rgb = c['teal']
+        arrow.line.fill.background()
+
+    add_text_box(slide, 0.5, arrow_y + 0.35, 12.3, 0.4, data['upgradeHint'],
+                 font_size=12, color=c['gray'], alignment=PP_ALIGN.CENTER)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SLIDE 5 — BOT CATEGORIES
 # ═══════════════════════════════════════════════════════════════════════════════
 
-slide5 = prs.slides.add_slide(prs.slide_layouts[6])
-add_bg(slide5, WHITE)
-
-hdr5 = slide5.shapes.add_shape(
-    MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(0.9))
-hdr5.fill.solid()
-hdr5.fill.fore_color.rgb = TEAL
-hdr5.line.fill.background()
-add_text_box(slide5, 0.5, 0.15, 12, 0.6,
-             'Bot-Kategorien — Bronze · Silver · Gold',
-             font_size=28, bold=True, color=WHITE)
-
-sections = [
-    {
-        'title': 'Management & Kommunikation',
-        'subtitle': 'Nobody & Gloria: Guest  |  Gloria Interview: Registered',
-        'color': BRONZE,
-        'bg': BRONZE_BG,
-        'bots': [
-            ('Nobody', 'GPS-Ansatz, Problemlösung, Kommunikationsanalyse'),
-            ('Gloria Interview', 'Strukturierte Interviews mit Transkript-Export'),
-            ('Gloria', 'Onboarding & Erstgespräch'),
-        ],
-    },
-    {
-        'title': 'Coaching',
-        'subtitle': 'Max & Ava: Guest  |  Kenji & Chloe: Premium',
-        'color': SILVER,
-        'bg': RGBColor(0xE8, 0xEC, 0xF4),
-        'bots': [
-            ('Max', 'Ambitioniert, motivierend, neugierig'),
-            ('Ava', 'Strategisch, entscheidend, organisiert'),
-            ('Kenji 🔒', 'Stoisch, philosophisch, weise'),
-            ('Chloe 🔒', 'Strukturierte Reflexion, evidenzbasiert'),
-        ],
-    },
-    {
-        'title': 'Exklusiv für Klienten',
-        'subtitle': 'Nur mit manualmode.at Coaching-Beziehung',
-        'color': GOLD,
-        'bg': GOLD_BG,
-        'bots': [
-            ('Rob 🔒', 'Mentale Fitness, empathisch, achtsam'),
-            ('Victor 🔒', 'Systemisch, analytisch, neutral'),
-        ],
-    },
-]
-
-sec_w = 3.8
-sec_gap = 0.35
-total_sec_w = 3 * sec_w + 2 * sec_gap
-sec_start_x = (13.333 - total_sec_w) / 2
-
-for i, sec in enumerate(sections):
-    sx = sec_start_x + i * (sec_w + sec_gap)
-    sy = 1.3
-    sec_h = 5.3
-
-    add_rounded_rect(slide5, sx, sy, sec_w, sec_h, sec['bg'], sec['color'])
-
-    add_text_box(slide5, sx + 0.15, sy + 0.2, sec_w - 0.3, 0.4,
-                 sec['title'],
-                 font_size=16, bold=True, color=sec['color'],
-                 alignment=PP_ALIGN.CENTER)
-    add_text_box(slide5, sx + 0.15, sy + 0.6, sec_w - 0.3, 0.3,
-                 sec['subtitle'],
-                 font_size=9, color=GRAY, alignment=PP_ALIGN.CENTER)
-
-    div = slide5.shapes.add_shape(
-        MSO_SHAPE.RECTANGLE,
-        Inches(sx + 0.3), Inches(sy + 1.0), Inches(sec_w - 0.6), Pt(1))
-    div.fill.solid()
-    div.fill.fore_color.rgb = sec['color']
-    div.line.fill.background()
-
-    for bi, (name, desc) in enumerate(sec['bots']):
-        by = sy + 1.2 + bi * 0.95
-        add_text_box(slide5, sx + 0.25, by, sec_w - 0.5, 0.3,
-                     name, font_size=14, bold=True, color=DARK)
-        add_text_box(slide5, sx + 0.25, by + 0.32, sec_w - 0.5, 0.5,
-                     desc, font_size=10, color=GRAY)
-
-add_text_box(slide5, 0.5, 6.8, 12.3, 0.4,
-             '🔒 = Erfordert höheren Zugang  |  '
-             'Einzelne Premium-Bots können für 3,90 € permanent '
-             'freigeschaltet werden',
-             font_size=11, color=GRAY, alignment=PP_ALIGN.CENTER)
+def build_categories_slide(prs, c, data):
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    add_header(prs, slide, c, data['title'])
+
+    sections = data['sections']
+    sec_w = 3.8
+    sec_gap = 0.35
+    total_sec_w = len(sections) * sec_w + (len(sections) - 1) * sec_gap
+    sec_start_x = (13.333 - total_sec_w) / 2
+
+    for i, sec in enumerate(sections):
+        sx = sec_start_x + i * (sec_w + sec_gap)
+        sy = 1.3
+        sec_h = 5.3
+        color = c[sec['color']]
+
+        add_rounded_rect(slide, sx, sy, sec_w, sec_h, c[sec['bg']], color)
+
+        add_text_box(slide, sx + 0.15, sy + 0.2, sec_w - 0.3, 0.4,
+                     sec['title'],
+                     font_size=16, bold=True, color=color,
+                     alignment=PP_ALIGN.CENTER)
+        add_text_box(slide, sx + 0.15, sy + 0.6, sec_w - 0.3, 0.3,
+                     sec['subtitle'],
+                     font_size=9, color=c['gray'], alignment=PP_ALIGN.CENTER)
+
+        div = slide.shapes.add_shape(
+            MSO_SHAPE.RECTANGLE,
+            Inches(sx + 0.3), Inches(sy + 1.0), Inches(sec_w - 0.6), Pt(1))
+        div.fill.solid()
+        div.fill.fore_color.rgb = color
+        div.line.fill.background()
+
+        for bi, (name, desc) in enumerate(sec['bots']):
+            by = sy + 1.2 + bi * 0.95
+            add_text_box(slide, sx + 0.25, by, sec_w - 0.5, 0.3,
+                         name, font_size=14, bold=True, color=c['dark'])
+            add_text_box(slide, sx + 0.25, by + 0.32, sec_w - 0.5, 0.5,
+                         desc, font_size=10, color=c['gray'])
+
+    add_text_box(slide, 0.5, 6.8, 12.3, 0.4, data['footnote'],
+                 font_size=11, color=c['gray'], alignment=PP_ALIGN.CENTER)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SLIDE 6 — UPGRADE PATHS & DISCOUNTS
 # ═══════════════════════════════════════════════════════════════════════════════
 
-slide6 = prs.slides.add_slide(prs.slide_layouts[6])
-add_bg(slide6, WHITE)
-
-hdr6 = slide6.shapes.add_shape(
-    MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(0.9))
-hdr6.fill.solid()
-hdr6.fill.fore_color.rgb = TEAL
-hdr6.line.fill.background()
-add_text_box(slide6, 0.5, 0.12, 10, 0.35,
-             'Upgrade-Pfade & Rabatte',
-             font_size=26, bold=True, color=WHITE)
-add_text_box(slide6, 0.5, 0.5, 10, 0.3,
-             'Frühere Investitionen werden immer anerkannt — kein Buyer\'s Remorse',
-             font_size=12, color=RGBColor(0xB0, 0xD8, 0xD8))
-
-# --- Main upgrade table ---
-upgrade_rows = [
-    ('Ausgangslage',          '1-Monats-Pass', '3-Monats-Pass', '1-Jahres-Pass', 'Rabatt-Modell'),
-    ('Normalpreis',           '9,90 €',        '24,90 €',       '79,90 €',       '—'),
-    ('Registered Monatsabo',  '9,90 €',        '24,90 €',       '79,90 €',       'Pro-rata Restmonat als Guthaben'),
-    ('Registered Lifetime',   '7,90 €',        '18,90 €',       '59,90 €',       '~20–25% Loyalty-Rabatt'),
-    ('1 Bot-Unlock (3,90 €)', '6,00 €',        '21,00 €',       '76,00 €',       '3,90 € Anrechnung'),
-    ('2 Bot-Unlocks (7,80 €)','2,10 €',        '17,10 €',       '72,10 €',       '7,80 € Anrechnung'),
-    ('Lifetime + 1 Bot',      '4,00 €',        '15,00 €',       '56,00 €',       'Loyalty + Bot kumuliert'),
-    ('Lifetime + 2 Bots',     '0,10 €',        '11,10 €',       '52,10 €',       'Loyalty + Bots kumuliert'),
-    ('Guest → Premium',       '9,90 €',        '24,90 €',       '79,90 €',       'Kein Rabatt (enthält Registered)'),
-]
-
-num_rows = len(upgrade_rows)
-num_cols = 5
-tbl6 = slide6.shapes.add_table(
-    num_rows, num_cols,
-    Inches(0.4), Inches(1.15), Inches(12.5), Inches(5.5)).table
-
-tbl6.columns[0].width = Inches(3.0)
-tbl6.columns[1].width = Inches(2.0)
-tbl6.columns[2].width = Inches(2.0)
-tbl6.columns[3].width = Inches(2.0)
-tbl6.columns[4].width = Inches(3.5)
-
-# Header row
-for ci, h in enumerate(upgrade_rows[0]):
-    add_table_cell(tbl6, 0, ci, h, font_size=10, bold=True,
-                   color=WHITE, bg_color=TEAL)
-
-# Normalpreis row (reference)
-for ci, val in enumerate(upgrade_rows[1]):
-    add_table_cell(tbl6, 1, ci, val, font_size=10,
-                   bold=(ci == 0),
-                   color=GRAY,
-                   alignment=PP_ALIGN.LEFT if ci in (0, 4) else PP_ALIGN.CENTER,
-                   bg_color=RGBColor(0xF9, 0xFA, 0xFB))
-
-# Data rows
-HIGHLIGHT = RGBColor(0x16, 0x65, 0x34)  # Dark green for discounted prices
-for ri in range(2, num_rows):
-    row_bg = WHITE if ri % 2 == 0 else GRAY_LIGHT
-    row = upgrade_rows[ri]
-    # Label column
-    add_table_cell(tbl6, ri, 0, row[0], font_size=10,
-                   bold=True, color=DARK, alignment=PP_ALIGN.LEFT,
-                   bg_color=row_bg)
-    # Price columns (1-3): highlight if discounted
-    for ci in range(1, 4):
-        is_discounted = row[ci] != upgrade_rows[1][ci]
-        add_table_cell(tbl6, ri, ci, row[ci], font_size=10,
-                       bold=is_discounted,
-                       color=HIGHLIGHT if is_discounted else DARK,
-                       bg_color=row_bg)
-    # Rabatt-Modell column
-    add_table_cell(tbl6, ri, 4, row[4], font_size=9,
-                   color=GRAY, alignment=PP_ALIGN.LEFT,
-                   bg_color=row_bg)
-
-# --- Principles footer ---
-principles = [
-    '✓ Fallback-Sicherheit: Registered Lifetime bleibt aktiv wenn Premium abläuft',
-    '✓ Kumulierbar: Loyalty-Rabatt und Bot-Guthaben stapeln sich',
-    '✓ Technisch umsetzbar: PayPal Custom IDs erlauben Tracking früherer Käufe',
-]
-for pi, p_text in enumerate(principles):
-    add_text_box(slide6, 0.5, 6.55 + pi * 0.28, 12.3, 0.25,
-                 p_text, font_size=9, color=GRAY)
+def build_upgrade_slide(prs, c, data):
+    """Upgrade table: header row, reference (regular price) row, data rows.
+
+    Prices that differ from the reference row are highlighted as discounts.
+    """
+    slide = prs.slides.add_slide(prs.slide_layouts[6])
+    add_header(prs, slide, c, data['title'], data['subtitle'])
+
+    upgrade_rows = data['rows']
+    widths = data['columnWidths']
+    num_rows = len(upgrade_rows)
+    num_cols = len(widths)
+    last = num_cols - 1
+    tbl = slide.shapes.add_table(
+        num_rows, num_cols,
+        Inches(0.4), Inches(1.15), Inches(12.5), Inches(5.5)).table
+
+    for ci, width in enumerate(widths):
+        tbl.columns[ci].width = Inches(width)
+    writer = TableWriter(tbl)
+
+    # Header row
+    for ci, h in enumerate(upgrade_rows[0]):
+        writer.cell(0, ci, h, font_size=10, bold=True,
+                    color=c['white'], bg_color=c['teal'])
+
+    # Reference row (regular price)
+    for ci, val in enumerate(upgrade_rows[1]):
+        writer.cell(1, ci, val, font_size=10,
+                    bold=(ci == 0),
+                    color=c['gray'],
+                    alignment=PP_ALIGN.LEFT if ci in (0, last) else PP_ALIGN.CENTER,
+                    bg_color=c['referenceRow'])
+
+    # Data rows
+    for ri in range(2, num_rows):
+        row_bg = c['white'] if ri % 2 == 0 else c['grayLight']
+        row = upgrade_rows[ri]
+        # Label column
+        writer.cell(ri, 0, row[0], font_size=10,
+                    bold=True, color=c['dark'], alignment=PP_ALIGN.LEFT,
+                    bg_color=row_bg)
+        # Price columns: highlight if discounted
+        for ci in range(1, last):
+            is_discounted = row[ci] != upgrade_rows[1][ci]
+            writer.cell(ri, ci, row[ci], font_size=10,
+                        bold=is_discounted,
+                        color=c['highlight'] if is_discounted else c['dark'],
+                        bg_color=row_bg)
+        # Discount model column
+        writer.cell(ri, last, row[last], font_size=9,
+                    color=c['gray'], alignment=PP_ALIGN.LEFT,
+                    bg_color=row_bg)
+
+    # --- Principles footer ---
+    for pi, p_text in enumerate(data['principles']):
+        add_text_box(slide, 0.5, 6.55 + pi * 0.28, 12.3, 0.25,
+                     p_text, font_size=9, color=c['gray'])
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# SAVE
+# BUILD
 # ═══════════════════════════════════════════════════════════════════════════════
 
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_path = os.path.join(
-    script_dir,
-    'Meaningful-Conversations-Access-Matrix-Pricing.pptx')
-prs.save(output_path)
-print(f'✅ PPTX saved to: {output_path}')
-print(f'   6 slides: Title, Features, Bots & Exclusive, Pricing, '
-      f'Bot Categories, Upgrade Paths')
+def build_deck(data):
+    prs = new_presentation()
+    c = palette(data.get('brand'))
+    build_title_slide(prs, c, data['title'])
+    build_matrix_slides(prs, c, data['matrix'])
+    build_pricing_slide(prs, c, data['pricing'])
+    build_categories_slide(prs, c, data['categories'])
+    build_upgrade_slide(prs, c, data['upgrades'])
+    return prs
+
+
+def build_variant(name, data, output_path, digest):
+    """Build and save one variant (runs in a worker process)."""
+    started = time.perf_counter()
+    prs = build_deck(data)
+    prs.core_properties.title = data['title']['subtitle']
+    prs.core_properties.identifier = INPUTS_PREFIX + digest
+    # Write next to the target and rename, so an interrupted build never
+    # leaves a truncated deck that a later run would try to read
+    tmp_path = f'{output_path}.tmp'
+    prs.save(tmp_path)
+    os.replace(tmp_path, output_path)
+    return name, output_path, len(prs.slides), time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--variant', action='append', dest='variants', metavar='NAME',
+                        help='build only this variant (repeatable; default: every pptx-data/*.json)')
+    parser.add_argument('--out-dir', default=SCRIPT_DIR,
+                        help='directory for the generated decks (default: DOCUMENTATION/)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild even if the inputs are unchanged')
+    args = parser.parse_args()
+
+    available = list_variants()
+    names = args.variants or available
+    unknown = sorted(set(names) - set(available))
+    if unknown:
+        parser.error(f"unknown variant(s): {', '.join(unknown)} (available: {', '.join(available)})")
+
+    pending = []
+    for name in names:
+        data = load_variant(name)
+        output_path = os.path.join(args.out_dir, data['output'])
+        digest = inputs_hash(data)
+        if not args.force and built_inputs(output_path) == digest:
+            print(f'⏭️  {name}: unchanged ({output_path})')
+            continue
+        pending.append((name, data, output_path, digest))
+
+    if not pending:
+        return 0
+
+    started = time.perf_counter()
+    jobs = max(1, min(args.jobs, len(pending)))
+    if jobs == 1:
+        results = [build_variant(*job) for job in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(build_variant, *job) for job in pending]
+            results = [future.result() for future in as_completed(futures)]
+
+    for name, output_path, slides, seconds in sorted(results):
+        print(f'✅ {name}: {slides} slides saved to {output_path} ({seconds:.2f}s)')
+    print(f'   {len(results)} variant(s) in {time.perf_counter() - started:.2f}s with {jobs} worker(s)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
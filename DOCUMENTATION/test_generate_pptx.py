@@ -0,0 +1,45 @@
+"""Tests for generate_pptx.paginate_rows (run with ``python -m pytest DOCUMENTATION``)."""
+
+from generate_pptx import paginate_rows
+
+
+def section(label):
+    return {'section': label, 'color': 'teal'}
+
+
+def rows(n, prefix='r'):
+    return [[f'{prefix}{i}', '', '', '', ''] for i in range(n)]
+
+
+def check_pages(pages, per_page):
+    for page in pages:
+        assert 0 < len(page) <= per_page
+        assert not isinstance(page[-1], dict)
+
+
+def test_section_header_does_not_end_a_page():
+    a, b = section('a'), section('b')
+    pages = paginate_rows([a] + rows(14) + [b] + rows(3, 'b'), 16)
+    check_pages(pages, 16)
+    assert pages[1][0] is b
+
+
+def test_consecutive_sections_move_to_the_next_page_together():
+    a, b, c = section('a'), section('b'), section('c')
+    data = [a] + rows(13) + [b, c] + rows(1, 'c')
+    pages = paginate_rows(data, 16)
+    check_pages(pages, 16)
+    assert sum(len(page) for page in pages) == len(data)
+
+    data = [a] + rows(14) + [b, c] + rows(1, 'c')
+    pages = paginate_rows(data, 16)
+    check_pages(pages, 16)
+    assert pages[1][:2] == [b, c]
+
+
+def test_continuation_page_repeats_the_section_header():
+    a = section('a')
+    pages = paginate_rows([a] + rows(20), 16)
+    check_pages(pages, 16)
+    assert len(pages[0]) == 16
+    assert pages[1][0] is a and len(pages[1]) == 6
@@ -61,6 +61,14 @@ router.post('/synthesize', authMiddleware, async (req, res) => {
         });
     }
     
+    // Abort the upstream synthesis if the client disconnects (user interrupted the coach)
+    const abortController = new AbortController();
+    res.on('close', () => {
+        if (!res.writableFinished) {
+            abortController.abort();
+        }
+    });
+    
     try {
         // Check if Piper is available
         const available = await isPiperAvailable();
@@ -72,7 +80,7 @@ router.post('/synthesize', authMiddleware, async (req, res) => {
             });
         }
         
-        const result = await synthesizeSpeech(text, botId, language, isMeditation, voiceId, format);
+        const result = await synthesizeSpeech(text, botId, language, isMeditation, voiceId, format, true, req.get('x-trace-id'), abortController.signal);
         
         if (!result) {
             return res.status(503).json({
@@ -81,7 +89,7 @@ router.post('/synthesize', authMiddleware, async (req, res) => {
             });
         }
         
-        const { buffer: audioBuffer, contentType } = result;
+        const { buffer: audioBuffer, contentType, degraded } = result;
         const durationMs = Date.now() - startTime;
         const characterCount = text.length;
         
@@ -100,15 +108,23 @@ router.post('/synthesize', authMiddleware, async (req, res) => {
                 textLength: characterCount,
                 isMeditation,
                 audioSize: audioBuffer.length,
+                ...(degraded ? { degraded } : {}),
             },
         });
         
         res.setHeader('Content-Type', contentType);
         res.setHeader('Content-Length', audioBuffer.length);
         res.setHeader('Cache-Control', 'public, max-age=3600');
+        if (degraded) {
+            res.setHeader('X-TTS-Degraded', degraded);
+        }
         res.send(audioBuffer);
         
     } catch (error) {
+        if (abortController.signal.aborted) {
+            console.log(`TTS request aborted by client after ${Date.now() - startTime}ms`);
+            return;
+        }
         console.error('TTS synthesis error:', error);
         
         const durationMs = Date.now() - startTime;
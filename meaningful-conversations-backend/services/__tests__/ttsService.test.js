@@ -0,0 +1,49 @@
+const { cleanTextForSpeech } = require('../ttsService');
+const { getCompiledPhoneticPatterns, reloadDictionary } = require('../../utils/phoneticDictionary');
+
+describe('cleanTextForSpeech', () => {
+  beforeAll(() => {
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+  });
+
+  afterAll(() => {
+    console.log.mockRestore();
+  });
+
+  test('removes markdown and keeps link text', () => {
+    expect(cleanTextForSpeech('## Titel\n**fett** und [Link](https://example.com)', 'de'))
+      .toBe('Titel fett und Link');
+  });
+
+  test('applies phonetic replacements on word boundaries only', () => {
+    expect(cleanTextForSpeech('Coach und Coaching, nicht Coaches', 'de'))
+      .toBe('Koutsch und Koutsching, nicht Coaches');
+  });
+
+  test('maps characters that crash Piper and collapses whitespace', () => {
+    expect(cleanTextForSpeech('„Ja“ – ‘gut’…  wei\u00ADter', 'de'))
+      .toBe('„Ja" - \'gut\'... weiter');
+  });
+
+  test('gives the same result on repeated calls', () => {
+    const text = 'Coach — Coach — Coach';
+    expect(cleanTextForSpeech(text, 'de')).toBe(cleanTextForSpeech(text, 'de'));
+  });
+});
+
+describe('getCompiledPhoneticPatterns', () => {
+  test('compiles once per language until the dictionary is reloaded', () => {
+    jest.spyOn(console, 'log').mockImplementation(() => {});
+    const first = getCompiledPhoneticPatterns('de');
+    expect(getCompiledPhoneticPatterns('de')).toBe(first);
+    expect(first.every(p => p.regex instanceof RegExp && p.regex.global)).toBe(true);
+
+    reloadDictionary();
+    expect(getCompiledPhoneticPatterns('de')).not.toBe(first);
+    console.log.mockRestore();
+  });
+
+  test('returns no patterns for a language without a dictionary', () => {
+    expect(getCompiledPhoneticPatterns('xx')).toEqual([]);
+  });
+});
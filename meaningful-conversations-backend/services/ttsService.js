@@ -2,15 +2,26 @@
 // Handles communication with the Piper TTS container/process
 
 const axios = require('axios');
+const crypto = require('crypto');
 const { exec } = require('child_process');
 const { promisify } = require('util');
 const execAsync = promisify(exec);
-const { getPhoneticReplacements } = require('../utils/phoneticDictionary');
+const { getCompiledPhoneticPatterns } = require('../utils/phoneticDictionary');
 
 // Configuration
 const TTS_SERVICE_URL = process.env.TTS_SERVICE_URL || 'http://tts:8082';
 const USE_TTS_CONTAINER = process.env.TTS_SERVICE_URL ? true : false;
 
+// Characters that can crash Piper/ONNX, mapped in one pass (see cleanTextForSpeech)
+const SPEECH_CHAR_MAP = {
+    '\u2018': "'", '\u2019': "'",
+    '\u201C': '"', '\u201D': '"',
+    '\u2013': '-', '\u2014': '-',
+    '\u2026': '...',
+    '\u00AD': '',
+};
+const SPEECH_CHAR_RE = /[\u2018\u2019\u201C\u201D\u2013\u2014\u2026\u00AD]/g;
+
 /**
  * Voice configuration mapping
  * Maps bot characteristics (gender, personality) to Piper voice models
@@ -117,9 +128,11 @@ function getVoiceModelFromId(voiceId) {
  * @param {boolean} isMeditation - Whether to use meditation mode (slower)
  * @param {string} voiceId - Optional: Specific voice ID to use (overrides bot default)
  * @param {boolean} stream - Not used (kept for backwards compatibility)
- * @returns {Promise<{buffer: Buffer, contentType: string}|null>} - Audio data with content type, or null for Web Speech fallback
+ * @param {string} traceId - Optional: Trace ID forwarded to the TTS container (X-Trace-Id); generated if omitted
+ * @param {AbortSignal} signal - Optional: Aborts the container request (and skips retries) when the client goes away
+ * @returns {Promise<{buffer: Buffer, contentType: string, degraded: string|null}|null>} - Audio data with content type (degraded: the container's X-TTS-Degraded header when it rendered a lighter voice/bitrate under load), or null for Web Speech fallback
  */
-async function synthesizeSpeech(text, botId, language, isMeditation = false, voiceId = null, format = 'opus', stream = true) {
+async function synthesizeSpeech(text, botId, language, isMeditation = false, voiceId = null, format = 'opus', stream = true, traceId = null, signal = null) {
     if (!text || text.trim().length === 0) {
         throw new Error('Text is required for speech synthesis');
     }
@@ -156,6 +169,11 @@ async function synthesizeSpeech(text, botId, language, isMeditation = false, voi
     
     // Try TTS container first (if configured)
     if (USE_TTS_CONTAINER) {
+        // One trace ID per synthesis; the sanitize-and-retry attempt gets the same ID
+        // with a '-retry' suffix, so its spans can be correlated in the logs while the
+        // container tracks (and cancels) it as a request of its own
+        const traceHeaders = { 'X-Trace-Id': traceId || crypto.randomUUID() };
+        const retryTraceHeaders = { 'X-Trace-Id': `${traceHeaders['X-Trace-Id'].slice(0, 58)}-retry` };
         try {
             const requestPayload = {
                 text: cleanText,
@@ -164,23 +182,36 @@ async function synthesizeSpeech(text, botId, language, isMeditation = false, voi
                 format: format === 'wav' ? 'wav' : 'opus',
             };
             
-            console.log(`TTS request: model=${model}, lengthScale=${lengthScale}, format=${requestPayload.format}`);
+            console.log(`TTS request: model=${model}, lengthScale=${lengthScale}, format=${requestPayload.format}, trace=${traceHeaders['X-Trace-Id']}`);
             
             const response = await axios.post(
                 `${TTS_SERVICE_URL}/synthesize`,
                 requestPayload,
                 {
                     timeout: 65000,
-                    responseType: 'arraybuffer'
+                    responseType: 'arraybuffer',
+                    headers: traceHeaders,
+                    signal,
                 }
             );
             
             const contentType = response.headers['content-type'] || 'audio/ogg; codecs=opus';
             const audioFormat = response.headers['x-audio-format'] || 'opus';
-            console.log(`TTS via container: ${response.headers['x-tts-duration-ms']}ms (piper=${response.headers['x-tts-piper-ms']}ms, encode=${response.headers['x-tts-encode-ms']}ms), ${response.data.byteLength} bytes, format=${audioFormat}`);
-            return { buffer: Buffer.from(response.data), contentType };
+            console.log(`TTS via container: ${response.headers['x-tts-duration-ms']}ms (piper=${response.headers['x-tts-piper-ms']}ms, encode=${response.headers['x-tts-encode-ms']}ms), ${response.data.byteLength} bytes, format=${audioFormat}, trace=${traceHeaders['X-Trace-Id']}`);
+            if (response.headers['server-timing']) {
+                console.log(`TTS timing [${traceHeaders['X-Trace-Id']}]: ${response.headers['server-timing']}`);
+            }
+            const degraded = response.headers['x-tts-degraded'] || null;
+            if (degraded) {
+                console.warn(`TTS degraded under load [${traceHeaders['X-Trace-Id']}]: ${degraded}`);
+            }
+            return { buffer: Buffer.from(response.data), contentType, degraded };
             
         } catch (error) {
+            // Client is gone: the container stops at its next chunk boundary, don't retry
+            if (signal?.aborted) {
+                throw error;
+            }
             console.warn('TTS container failed:', error.message, '- retrying with sanitized text');
             try {
                 const sanitized = cleanText
@@ -191,13 +222,17 @@ async function synthesizeSpeech(text, botId, language, isMeditation = false, voi
                     const retryResponse = await axios.post(
                         `${TTS_SERVICE_URL}/synthesize`,
                         { text: sanitized, model, lengthScale, format: format === 'wav' ? 'wav' : 'opus' },
-                        { timeout: 65000, responseType: 'arraybuffer' }
+                        { timeout: 65000, responseType: 'arraybuffer', headers: retryTraceHeaders, signal }
                     );
                     const contentType = retryResponse.headers['content-type'] || 'audio/ogg; codecs=opus';
-                    console.log(`TTS retry succeeded after sanitization: ${retryResponse.data.byteLength} bytes`);
-                    return { buffer: Buffer.from(retryResponse.data), contentType };
+                    console.log(`TTS retry succeeded after sanitization: ${retryResponse.data.byteLength} bytes, trace=${retryTraceHeaders['X-Trace-Id']}`);
+                    return { buffer: Buffer.from(retryResponse.data), contentType, degraded: retryResponse.headers['x-tts-degraded'] || null };
                 }
             } catch (retryErr) {
+                // Client went away during the retry: stop here, not in local Piper
+                if (signal?.aborted) {
+                    throw retryErr;
+                }
                 console.warn('TTS retry also failed:', retryErr.message);
             }
         }
@@ -231,7 +266,7 @@ async function synthesizeSpeech(text, botId, language, isMeditation = false, voi
         }
         
         console.log('TTS via local Piper');
-        return { buffer: stdout, contentType: 'audio/wav' };
+        return { buffer: stdout, contentType: 'audio/wav', degraded: null };
     } catch (error) {
         console.error('Piper TTS error:', error);
         throw new Error(`Failed to synthesize speech: ${error.message}`);
@@ -248,8 +283,8 @@ async function synthesizeSpeech(text, botId, language, isMeditation = false, voi
  */
 function cleanTextForSpeech(text, language = 'de') {
     // Load phonetic replacements from dictionary
-    // Dictionary is cached, so this has no I/O overhead
-    const phoneticReplacements = getPhoneticReplacements(language);
+    // Dictionary and compiled patterns are cached, so this has no I/O or RegExp construction overhead
+    const phoneticPatterns = getCompiledPhoneticPatterns(language);
     
     // First, clean markdown and formatting
     let cleanedText = text
@@ -270,21 +305,16 @@ function cleanTextForSpeech(text, language = 'de') {
     // Use word boundaries to avoid partial replacements
     let replacementsApplied = 0;
     const replacementLog = [];
-    for (const pattern of phoneticReplacements) {
-        const { term, phonetic, caseSensitive } = pattern;
-        
-        // Escape special regex characters in the term
-        const escapedTerm = term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
-        
-        // Create regex with appropriate flags (case-sensitive or not)
-        const flags = caseSensitive ? 'g' : 'gi';
-        const regex = new RegExp(`\\b${escapedTerm}\\b`, flags);
-        
-        const matches = cleanedText.match(regex);
-        if (matches) {
-            cleanedText = cleanedText.replace(regex, phonetic);
+    for (const { term, phonetic, caseSensitive, regex } of phoneticPatterns) {
+        // One pass per term: replace and count the matches together
+        let matches = 0;
+        cleanedText = cleanedText.replace(regex, () => {
+            matches++;
+            return phonetic;
+        });
+        if (matches > 0) {
             replacementsApplied++;
-            replacementLog.push(`"${term}" → "${phonetic}" (${matches.length}x)${caseSensitive ? ' [case-sensitive]' : ''}`);
+            replacementLog.push(`"${term}" → "${phonetic}" (${matches}x)${caseSensitive ? ' [case-sensitive]' : ''}`);
         }
     }
     
@@ -293,13 +323,10 @@ function cleanTextForSpeech(text, language = 'de') {
     }
     
     // Final cleanup — normalize unicode that can crash Piper/ONNX
+    // (the TTS service normalizes again; already-clean text passes through it cheaply)
     return cleanedText
         .normalize('NFKC')
-        .replace(/[\u2018\u2019]/g, "'")
-        .replace(/[\u201C\u201D]/g, '"')
-        .replace(/[\u2013\u2014]/g, '-')
-        .replace(/\u2026/g, '...')
-        .replace(/\u00AD/g, '')
+        .replace(SPEECH_CHAR_RE, (ch) => SPEECH_CHAR_MAP[ch])
         .replace(/\s+/g, ' ')
         .trim();
 }
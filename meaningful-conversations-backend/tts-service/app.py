@@ -1,5 +1,6 @@
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
+from flask_sock import Sock
 import subprocess
 import os
 import io
@@ -9,11 +10,35 @@ import sys
 import tempfile
 import logging
 import threading
-import re
-import unicodedata
+from collections import Counter
+from types import SimpleNamespace
+
+from werkzeug.wsgi import wrap_file
+
+import cancellation
+import chunking
+import memory_diagnostics
+import text_normalization
+from audio_store import cache_key, store_from_env, voice_file_id
+from cancellation import SynthesisCancelled
+from chunking import adaptive_chunks, split_tts_chunks
+from degradation import DEGRADED_HEADER, governor_from_env
+from single_flight import SingleFlight
+from profiling import PROFILING_ENABLED, RequestProfiler, wants_profile
+from stub_voice import STUB_ENABLED, StubVoice
+from tracing import TRACE_HEADER, end_trace, note, record, resolve_trace_id, span, start_trace
+from voice_session import VoiceSession
+
+try:
+    # Imported at module load so gunicorn --preload pays for piper/onnxruntime
+    # once in the master instead of in each worker's first request
+    from piper import PiperVoice
+except ImportError:  # stub voice / tools running without piper installed
+    PiperVoice = None
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,56 +53,45 @@ VOICE_DIR = os.getenv('PIPER_VOICE_DIR', '/models')
 _model_cache = {}
 _cache_lock = threading.Lock()
 MODEL_TTL_SECONDS = 600  # evict after 10 min of inactivity
+# Models held by open voice sessions (/ws) are never evicted
+_pinned_models = Counter()
+# Estimated memory per loaded model (reported by /diagnostics/memory)
+_model_footprints = memory_diagnostics.ModelFootprints()
+# model -> voice_file_id() (size/mtime of its files), part of the clip store key;
+# read when the model is loaded, or on first use when another process loads it
+_voice_files = {}
+
+# 'thread' runs Piper in the request thread; 'process' hands inference to a
+# per-worker pool of processes that each own their models (see inference_pool.py);
+# 'shared' routes each model to one owner process per container (see model_router.py)
+TTS_EXECUTOR = os.getenv('TTS_EXECUTOR', 'thread')
+REMOTE_EXECUTORS = ('process', 'shared')
+TTS_PROCESS_WORKERS = int(os.getenv('TTS_PROCESS_WORKERS', '2'))
+_inference_pool = None
+_inference_pool_pid = None
+_inference_pool_lock = threading.Lock()
+
+# Shared on-disk clip store (None unless TTS_AUDIO_STORE_DIR is set)
+_audio_store = store_from_env()
+
+# Identical concurrent requests share one synthesis (see single_flight.py)
+_single_flight = SingleFlight()
+
+# Lighter voice / lower bitrate under load (see degradation.py)
+_governor = governor_from_env()
+if _governor.enabled and not STUB_ENABLED:
+    for _heavy, _light in list(_governor.voices.items()):
+        if not os.path.exists(f"{VOICE_DIR}/{_light}.onnx"):
+            logger.warning(f"Degradation voice {_light} for {_heavy} not found, ignoring")
+            del _governor.voices[_heavy]
+
+# Opt-in allocation tracing for /diagnostics/memory (TTS_TRACEMALLOC=1)
+memory_diagnostics.start_tracing()
 
 
 def sanitize_text_for_piper(text: str) -> str:
     """Normalize unicode and strip characters that trigger Piper/ONNX runtime errors."""
-    if not text:
-        return ''
-    text = unicodedata.normalize('NFKC', text)
-    for src, dst in [
-        ('\u2018', "'"), ('\u2019', "'"), ('\u201c', '"'), ('\u201d', '"'),
-        ('\u2013', '-'), ('\u2014', '-'), ('\u2026', '...'), ('\u00ad', ''),
-    ]:
-        text = text.replace(src, dst)
-    text = re.sub(r"[^\w\s.,!?;:'\"()\-\–—/äöüÄÖÜß]", ' ', text, flags=re.UNICODE)
-    return re.sub(r'\s+', ' ', text).strip()
-
-
-def split_tts_chunks(text: str, max_len: int = 180) -> list:
-    """Split long or problematic text at sentence boundaries for per-chunk synthesis."""
-    text = text.strip()
-    if not text:
-        return []
-    if len(text) <= max_len:
-        return [text]
-
-    parts = re.split(r'(?<=[.!?…;])\s+', text)
-    chunks = []
-    current = ''
-    for part in parts:
-        part = part.strip()
-        if not part:
-            continue
-        if len(part) > max_len:
-            if current:
-                chunks.append(current)
-                current = ''
-            for i in range(0, len(part), max_len):
-                piece = part[i:i + max_len].strip()
-                if piece:
-                    chunks.append(piece)
-            continue
-        candidate = f'{current} {part}'.strip() if current else part
-        if len(candidate) <= max_len:
-            current = candidate
-        else:
-            if current:
-                chunks.append(current)
-            current = part
-    if current:
-        chunks.append(current)
-    return chunks or [text]
+    return text_normalization.normalize(text).text
 
 
 def concat_wav_bytes(wav_chunks: list) -> bytes:
@@ -129,49 +143,119 @@ def _get_voice(model_name):
             return entry['voice']
 
         model_path = f"{VOICE_DIR}/{model_name}.onnx"
-        if not os.path.exists(model_path):
+        if STUB_ENABLED:
+            voice_cls = StubVoice
+        elif not os.path.exists(model_path):
             raise FileNotFoundError(f'Piper model not found: {model_name}')
-
-        from piper import PiperVoice
+        elif PiperVoice is None:
+            raise RuntimeError('piper-tts is not installed')
+        else:
+            voice_cls = PiperVoice
         t0 = time.time()
-        voice = PiperVoice.load(model_path)
+        with span('model-load'):
+            voice = _model_footprints.load(model_name, model_path, lambda: voice_cls.load(model_path))
         load_ms = int((time.time() - t0) * 1000)
         logger.info(f"Model loaded: {model_name} in {load_ms}ms")
 
         entry['voice'] = voice
         with _cache_lock:
             entry['last_used'] = time.time()
+            _voice_files[model_name] = voice_file_id(VOICE_DIR, model_name)
         return voice
 
 
+def clip_key(text, model, length_scale, speaker, output_format, **extra):
+    """Audio store / single-flight key, including the identity of the voice files."""
+    with _cache_lock:
+        voice_file = _voice_files.get(model)
+        if voice_file is None:
+            voice_file = _voice_files[model] = voice_file_id(VOICE_DIR, model)
+    return cache_key(text, model, length_scale, speaker, output_format, voice_file, **extra)
+
+
 def _get_model_lock(model_name):
     """Get the per-model lock (ensures sequential Piper calls per model)."""
     entry = _ensure_model_entry(model_name)
     return entry['lock']
 
 
+def _get_inference_pool():
+    """Start the inference pool (or model router) lazily, once per gunicorn worker process."""
+    global _inference_pool, _inference_pool_pid
+    if _inference_pool is not None and _inference_pool_pid == os.getpid():
+        return _inference_pool
+    with _inference_pool_lock:
+        if _inference_pool is None or _inference_pool_pid != os.getpid():
+            if TTS_EXECUTOR == 'shared':
+                from model_router import SOCKET_DIR_ENV, ModelRouter, start_owners
+                # Normally started by the gunicorn master (gunicorn.conf.py)
+                socket_dir = os.getenv(SOCKET_DIR_ENV) or start_owners(VOICE_DIR, MODEL_TTL_SECONDS)
+                try:
+                    voices = [f[:-len('.onnx')] for f in os.listdir(VOICE_DIR) if f.endswith('.onnx')]
+                except OSError:
+                    voices = []
+                _inference_pool = ModelRouter(socket_dir, voices)
+            else:
+                from inference_pool import InferencePool
+                _inference_pool = InferencePool(TTS_PROCESS_WORKERS, VOICE_DIR, MODEL_TTL_SECONDS)
+            _inference_pool_pid = os.getpid()
+        return _inference_pool
+
+
+def close_inference_pool():
+    """Release this worker's pool processes or owner connections (gunicorn worker_exit)."""
+    global _inference_pool
+    with _inference_pool_lock:
+        if _inference_pool is not None and _inference_pool_pid == os.getpid():
+            _inference_pool.close()
+        _inference_pool = None
+
+
 def _evict_stale_models():
     """Remove models not used within TTL."""
     now = time.time()
     with _cache_lock:
         stale = [k for k, v in _model_cache.items()
                  if v.get('voice') is not None
+                 and not _pinned_models[k]
                  and now - v['last_used'] > MODEL_TTL_SECONDS]
         for k in stale:
             del _model_cache[k]
+            _voice_files.pop(k, None)
+            _model_footprints.evicted(k)
             logger.info(f"Model evicted (idle): {k}")
 
 
 @app.route('/health', methods=['GET'])
 def health():
     try:
-        piper_voices = [f for f in os.listdir(VOICE_DIR) if f.endswith('.onnx')]
-        cached_models = list(_model_cache.keys())
+        if STUB_ENABLED and not os.path.isdir(VOICE_DIR):
+            piper_voices = []
+        else:
+            piper_voices = [f for f in os.listdir(VOICE_DIR) if f.endswith('.onnx')]
+        model_owners = None
+        if TTS_EXECUTOR in REMOTE_EXECUTORS:
+            assignment = _get_inference_pool().assignment()
+            cached_models = list(assignment.keys())
+            if TTS_EXECUTOR == 'shared':
+                model_owners = assignment
+        else:
+            cached_models = list(_model_cache.keys())
         return jsonify({
             'status': 'ok',
             'piperAvailable': True,
             'piperVoiceCount': len(piper_voices),
+            'executor': TTS_EXECUTOR,
+            'stubVoice': STUB_ENABLED,
             'cachedModels': cached_models,
+            'modelOwners': model_owners,
+            'audioStore': _audio_store.root if _audio_store is not None else None,
+            'cancellation': cancellation.stats(),
+            'singleFlight': _single_flight.stats(),
+            'pinnedModels': sorted(_pinned_models),
+            'charsPerSec': chunking.rates(),
+            'textNormalization': text_normalization.stats(),
+            'degradation': _governor.stats(),
         }), 200
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)}), 503
@@ -183,6 +267,10 @@ def warmup():
     data = request.json or {}
     model = data.get('model', 'en_US-amy-medium')
     try:
+        if TTS_EXECUTOR in REMOTE_EXECUTORS:
+            pool = _get_inference_pool()
+            pool.warm(model)
+            return jsonify({'status': 'ok', 'model': model, 'cached': list(pool.assignment().keys())}), 200
         _get_voice(model)
         return jsonify({'status': 'ok', 'model': model, 'cached': list(_model_cache.keys())}), 200
     except FileNotFoundError as e:
@@ -192,6 +280,89 @@ def warmup():
         return jsonify({'error': str(e)}), 500
 
 
+def _pin_model(model):
+    """Load a model for a voice session and keep it resident; returns load time in ms."""
+    t0 = time.time()
+    if TTS_EXECUTOR in REMOTE_EXECUTORS:
+        # Pool processes evict on their own TTL; sessions keep them warm via _touch_model
+        _get_inference_pool().warm(model)
+    else:
+        _get_voice(model)
+        with _cache_lock:
+            _pinned_models[model] += 1
+    return int((time.time() - t0) * 1000)
+
+
+def _unpin_model(model):
+    if TTS_EXECUTOR not in REMOTE_EXECUTORS:
+        with _cache_lock:
+            _pinned_models[model] -= 1
+            if _pinned_models[model] <= 0:
+                del _pinned_models[model]
+
+
+def _touch_model(model):
+    if TTS_EXECUTOR in REMOTE_EXECUTORS:
+        _get_inference_pool().warm(model)
+    else:
+        _get_voice(model)
+
+
+def _render_chunk(text, model, length_scale, speaker, output_format):
+    wav_data = synthesize_with_piper_safe(text, model, length_scale, speaker)
+    with span('encode'):
+        return convert_audio(wav_data, output_format)
+
+
+_voice_backend = SimpleNamespace(
+    chunks=adaptive_chunks,
+    render=_render_chunk,
+    pin=_pin_model,
+    unpin=_unpin_model,
+    touch=_touch_model,
+)
+
+
+@sock.route('/ws')
+def voice_socket(ws):
+    """Duplex voice-mode session: JSON control messages in, binary audio frames out."""
+    VoiceSession(ws, _voice_backend, keepalive=MODEL_TTL_SECONDS / 2).run()
+
+
+@app.route('/cancel', methods=['POST'])
+def cancel():
+    """Cancel an in-flight /synthesize request by its request (trace) ID."""
+    data = request.get_json(silent=True) or {}
+    request_id = data.get('requestId') or request.headers.get(TRACE_HEADER)
+    if not request_id or request_id != resolve_trace_id(request_id):
+        return jsonify({'error': 'Valid requestId is required'}), 400
+    local = cancellation.cancel(request_id)
+    logger.info(f"TTS cancel requested: request={request_id}, local={local}")
+    return jsonify({'status': 'ok', 'requestId': request_id, 'local': local}), 202
+
+
+@app.route('/diagnostics/memory', methods=['GET'])
+def diagnostics_memory():
+    """Memory report of the answering worker and its process tree (see memory_diagnostics.py)."""
+    if not memory_diagnostics.DIAGNOSTICS_TOKEN:
+        return jsonify({'error': 'Diagnostics disabled'}), 404
+    if not memory_diagnostics.authorized(request.headers):
+        return jsonify({'error': 'Unauthorized'}), 401
+    top = request.args.get('top', 15, type=int)
+    # Under gunicorn the parent is the master, whose tree holds every worker and owner
+    under_gunicorn = request.environ.get('SERVER_SOFTWARE', '').startswith('gunicorn')
+    root_pid = os.getppid() if under_gunicorn else os.getpid()
+    report = memory_diagnostics.report(root_pid, top, rebase=request.args.get('rebase') == '1')
+    if TTS_EXECUTOR in REMOTE_EXECUTORS:
+        report['models'] = None
+        report['inferenceProcesses'] = _get_inference_pool().memory()
+    else:
+        report['models'] = _model_footprints.report()
+        report['inferenceProcesses'] = None
+    report['pinnedModels'] = sorted(_pinned_models)
+    return jsonify(report), 200
+
+
 @app.route('/voices', methods=['GET'])
 def get_voices():
     try:
@@ -218,13 +389,16 @@ AUDIO_FORMATS = {
 }
 
 
-def convert_audio(wav_data, output_format='opus'):
+def convert_audio(wav_data, output_format='opus', bitrate=None):
     """Convert WAV to compressed format using ffmpeg pipes (no disk I/O)."""
     if output_format == 'wav' or output_format not in AUDIO_FORMATS:
         return wav_data, 'audio/wav'
 
     config = AUDIO_FORMATS[output_format]
-    cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-i', 'pipe:0'] + config['args'] + ['pipe:1']
+    args = list(config['args'])
+    if bitrate is not None and '-b:a' in args:
+        args[args.index('-b:a') + 1] = bitrate
+    cmd = ['ffmpeg', '-y', '-loglevel', 'error', '-i', 'pipe:0'] + args + ['pipe:1']
 
     try:
         result = subprocess.run(cmd, input=wav_data, capture_output=True, timeout=30)
@@ -243,73 +417,198 @@ def convert_audio(wav_data, output_format='opus'):
 
 def synthesize_with_piper(text, model, length_scale, speaker=None):
     """Synthesize speech using cached PiperVoice (no subprocess)."""
+    if TTS_EXECUTOR in REMOTE_EXECUTORS:
+        return _get_inference_pool().synthesize(text, model, length_scale, speaker)
+
     voice = _get_voice(model)
     model_lock = _get_model_lock(model)
 
     # PiperVoice.synthesize is not thread-safe for the same model instance,
     # so serialize calls per model. Different models can run in parallel.
-    with model_lock:
-        buf = io.BytesIO()
-        with wave.open(buf, 'wb') as wf:
-            voice.synthesize(
-                text, wf,
-                speaker_id=int(speaker) if speaker is not None else None,
-                length_scale=length_scale,
-            )
+    with span('lock-wait'):
+        cancellation.acquire(model_lock, len(text))
+    try:
+        t0 = time.perf_counter()
+        try:
+            buf = io.BytesIO()
+            with wave.open(buf, 'wb') as wf:
+                voice.synthesize(
+                    text, wf,
+                    speaker_id=int(speaker) if speaker is not None else None,
+                    length_scale=length_scale,
+                )
+        except Exception:
+            record('inference-failed', (time.perf_counter() - t0) * 1000)
+            raise
+        inference_ms = (time.perf_counter() - t0) * 1000
+        record('inference', inference_ms)
+        chunking.observe(model, len(text), inference_ms)
+        cancellation.progress(len(text))
         return buf.getvalue()
+    finally:
+        model_lock.release()
 
 
 def synthesize_with_piper_safe(text, model, length_scale, speaker=None):
     """Synthesize with sanitize + sentence-chunk fallbacks for ONNX edge cases."""
     last_error = None
-    sanitized = sanitize_text_for_piper(text)
+    with span('sanitize'):
+        normalized = text_normalization.normalize(text)
+    sanitized = normalized.text
 
     for label, attempt in [('full', text), ('sanitized', sanitized)]:
         if not attempt or not attempt.strip():
             continue
         if label == 'sanitized' and attempt == text:
             continue
+        cancellation.check(len(attempt))
         try:
-            return synthesize_with_piper(attempt, model, length_scale, speaker)
+            wav = synthesize_with_piper(attempt, model, length_scale, speaker)
+            note('path', label)
+            return wav
+        except SynthesisCancelled:
+            raise
         except Exception as e:
             last_error = e
             logger.warning(f"Piper {label} attempt failed ({len(attempt)} chars): {e}")
 
     base = sanitized or text
-    chunks = split_tts_chunks(base)
+    with span('chunk'):
+        chunks = split_tts_chunks(base, sentences=normalized.sentences if sanitized else None)
     if len(chunks) > 1:
         wav_parts = []
+        remaining = sum(len(c) for c in chunks)
         for idx, chunk in enumerate(chunks):
+            cancellation.check(remaining)
+            remaining -= len(chunk)
             try:
                 wav_parts.append(synthesize_with_piper(chunk, model, length_scale, speaker))
+            except SynthesisCancelled:
+                raise
             except Exception as chunk_err:
                 logger.warning(f"Piper chunk {idx + 1}/{len(chunks)} failed: {chunk_err}")
         if wav_parts:
             logger.info(f"Piper chunk fallback: {len(wav_parts)}/{len(chunks)} chunks OK")
-            return concat_wav_bytes(wav_parts)
+            note('path', 'chunks')
+            with span('concat'):
+                return concat_wav_bytes(wav_parts)
 
     # Single-chunk ONNX failure: try word-by-word synthesis
     if last_error and base:
         words = [w for w in base.split() if w.strip()]
         if len(words) > 1:
             wav_parts = []
+            remaining = sum(len(w) for w in words)
             for idx, word in enumerate(words):
+                cancellation.check(remaining)
+                remaining -= len(word)
                 try:
                     wav_parts.append(synthesize_with_piper(word, model, length_scale, speaker))
+                except SynthesisCancelled:
+                    raise
                 except Exception as word_err:
                     logger.warning(f"Piper word {idx + 1}/{len(words)} failed: {word_err}")
             if wav_parts:
                 logger.info(f"Piper word fallback: {len(wav_parts)}/{len(words)} words OK")
-                return concat_wav_bytes(wav_parts)
+                note('path', 'words')
+                with span('concat'):
+                    return concat_wav_bytes(wav_parts)
 
     if last_error:
         raise last_error
     raise ValueError('No synthesizable text')
 
 
+def publish_clip(store_key, output_format, audio_data, mimetype):
+    """Write a rendered clip to the shared store; returns True if it was stored."""
+    # Only publish clips that came out in the requested format (not the WAV fallback)
+    if _audio_store is None or mimetype != AUDIO_FORMATS[output_format]['mime']:
+        return False
+    try:
+        _audio_store.put(store_key, output_format, audio_data)
+        return True
+    except OSError as e:
+        logger.warning(f"Audio store write failed: {e}")
+        return False
+
+
+def render_clip(text, model, length_scale, speaker, output_format, store_key=None, bitrate=None):
+    """Synthesize, encode and publish one clip; returns (audio, mimetype, piper_ms, encode_ms)."""
+    t0 = time.time()
+    wav_data = synthesize_with_piper_safe(text, model, length_scale, speaker)
+    piper_ms = int((time.time() - t0) * 1000)
+
+    # No cancel check from here on: the Piper work is done, and an encoded,
+    # stored clip serves the next request for this text
+    with span('encode'):
+        audio_data, mimetype = convert_audio(wav_data, output_format, bitrate)
+
+    if store_key is not None:
+        with span('store-write'):
+            publish_clip(store_key, output_format, audio_data, mimetype)
+    encode_ms = int((time.time() - t0) * 1000) - piper_ms
+    return audio_data, mimetype, piper_ms, encode_ms
+
+
+def _stored_clip_response(fh, output_format, start_time):
+    """Serve a stored clip via wsgi.file_wrapper so gunicorn can use sendfile()."""
+    size = os.fstat(fh.fileno()).st_size
+    duration_ms = int((time.time() - start_time) * 1000)
+    logger.info(f"TTS Store hit: total={duration_ms}ms, {size} bytes ({output_format})")
+
+    response = Response(
+        wrap_file(request.environ, fh),
+        mimetype=AUDIO_FORMATS[output_format]['mime'],
+        direct_passthrough=True,
+    )
+    response.headers['Content-Length'] = str(size)
+    response.headers['X-TTS-Duration-Ms'] = str(duration_ms)
+    response.headers['X-TTS-Piper-Ms'] = '0'
+    response.headers['X-TTS-Encode-Ms'] = '0'
+    response.headers['X-Audio-Size-Bytes'] = str(size)
+    response.headers['X-Audio-Format'] = output_format
+    response.headers['X-TTS-Engine'] = 'piper'
+    response.headers['X-TTS-Cache'] = 'hit'
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
 @app.route('/synthesize', methods=['POST'])
 def synthesize():
     """Synthesize speech from text using Piper, with optional Opus/MP3 encoding."""
+    t0 = time.perf_counter()
+    trace_id = resolve_trace_id(request.headers.get(TRACE_HEADER))
+    trace, token = start_trace(trace_id)
+    cancel_token, cancel_ctx = cancellation.start(trace_id, request.environ)
+    profiler = None
+    try:
+        if PROFILING_ENABLED and wants_profile(request.headers):
+            profiler = RequestProfiler()
+        if profiler is not None:
+            with profiler:
+                response = app.make_response(_synthesize(trace))
+        else:
+            response = app.make_response(_synthesize(trace))
+    finally:
+        cancellation.finish(cancel_token, cancel_ctx)
+        end_trace(token)
+    trace.add('total', (time.perf_counter() - t0) * 1000)
+    if profiler is not None:
+        try:
+            profiler.dump(trace_id, request.get_json(silent=True) or {}, {
+                'status': response.status_code,
+                'serverTiming': trace.server_timing(),
+            })
+        except OSError as e:
+            logger.warning(f"Writing profile failed: {e}")
+    response.headers[TRACE_HEADER] = trace_id
+    timing = trace.server_timing()
+    if timing:
+        response.headers['Server-Timing'] = timing
+    return response
+
+
+def _synthesize(trace):
     start_time = time.time()
 
     try:
@@ -320,20 +619,46 @@ def synthesize():
         speaker = data.get('speaker')
         output_format = data.get('format', 'opus')
 
-        logger.info(f"TTS Request: model={model}, speaker={speaker}, format={output_format}, text_length={len(text)}")
+        logger.info(f"TTS Request: model={model}, speaker={speaker}, format={output_format}, text_length={len(text)}, trace={trace.trace_id}")
 
         if not text:
             return jsonify({'error': 'Text is required'}), 400
 
-        wav_data = synthesize_with_piper_safe(text, model, length_scale, speaker)
-
-        piper_ms = int((time.time() - start_time) * 1000)
-        audio_data, mimetype = convert_audio(wav_data, output_format)
+        key = clip_key(text, model, length_scale, speaker, output_format)
+        store_key = None
+        if _audio_store is not None and output_format in AUDIO_FORMATS:
+            _audio_store.start_evictor()
+            store_key = key
+            with span('store'):
+                stored = _audio_store.open(store_key, output_format)
+            if stored is not None:
+                return _stored_clip_response(stored, output_format, start_time)
+
+        with _governor.track():
+            degraded = _governor.decide(model, output_format)
+            render_model, render_speaker, bitrate, publish_key = model, speaker, None, store_key
+            if degraded is not None:
+                if degraded.model is not None:
+                    # The lighter variant is a different voice file: speaker IDs do not carry over
+                    render_model, render_speaker = degraded.model, None
+                bitrate = degraded.bitrate
+                # The store keeps full-quality clips only
+                publish_key = None
+                key = clip_key(text, render_model, length_scale, render_speaker, output_format, bitrate=bitrate)
+            (audio_data, mimetype, piper_ms, encode_ms), coalesced = _single_flight.run(
+                key, lambda: render_clip(text, render_model, length_scale, render_speaker, output_format,
+                                         publish_key, bitrate))
 
         duration_ms = int((time.time() - start_time) * 1000)
-        encode_ms = duration_ms - piper_ms
+        if not coalesced:
+            _governor.observe(duration_ms)
 
-        logger.info(f"TTS Success: piper={piper_ms}ms, encode={encode_ms}ms, total={duration_ms}ms, {len(audio_data)} bytes ({output_format})")
+        if coalesced:
+            note('path', 'coalesced')
+            logger.info(f"TTS Coalesced: total={duration_ms}ms, {len(audio_data)} bytes ({output_format}), trace={trace.trace_id}")
+        else:
+            logger.info(f"TTS Success: piper={piper_ms}ms, encode={encode_ms}ms, total={duration_ms}ms, {len(audio_data)} bytes ({output_format}), trace={trace.trace_id}"
+                        + (f", degraded=({degraded.header()})" if degraded is not None else ''))
 
         # Periodically check for stale models
         _evict_stale_models()
@@ -345,14 +670,23 @@ def synthesize():
         response.headers['X-Audio-Size-Bytes'] = str(len(audio_data))
         response.headers['X-Audio-Format'] = output_format
         response.headers['X-TTS-Engine'] = 'piper'
+        if store_key is not None:
+            response.headers['X-TTS-Cache'] = 'miss'
+        if coalesced:
+            response.headers['X-TTS-Coalesced'] = '1'
+        if degraded is not None:
+            response.headers[DEGRADED_HEADER] = degraded.header()
         response.headers['Cache-Control'] = 'public, max-age=3600'
 
         return response
 
     except FileNotFoundError as e:
         return jsonify({'error': str(e)}), 404
+    except SynthesisCancelled as e:
+        # 499: client closed request (nginx convention); usually nobody reads it
+        return jsonify({'error': str(e), 'reason': e.reason}), 499
     except Exception as e:
-        logger.error(f"TTS synthesis error: {e}", exc_info=True)
+        logger.error(f"TTS synthesis error (trace={trace.trace_id}): {e}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
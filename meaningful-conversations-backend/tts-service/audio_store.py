@@ -0,0 +1,196 @@
+"""Content-addressed audio store shared by all workers and TTS replicas.
+
+Clips are keyed by a hash of their synthesis parameters and live on a shared
+volume as ``<dir>/<key[:2]>/<key>.<format>``. Writes go to a temp file in the
+same directory followed by ``os.replace``, so readers never see partial files.
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bump when synthesis output changes in a way that invalidates stored clips
+STORE_VERSION = 1
+
+
+def voice_file_id(voice_dir, model):
+    """Size and mtime of a voice's .onnx and .onnx.json, e.g. ``'63201294:1712...;4883:1712...'``.
+
+    Part of the clip key, so replacing a voice file under the same name
+    starts a new set of clips instead of serving the old voice from the
+    (persistent) store. Missing files count as ``-``.
+    """
+    parts = []
+    for suffix in ('.onnx', '.onnx.json'):
+        try:
+            st = os.stat(os.path.join(voice_dir, model + suffix))
+            parts.append(f'{st.st_size}:{st.st_mtime_ns}')
+        except OSError:
+            parts.append('-')
+    return ';'.join(parts)
+
+
+def cache_key(text, model, length_scale, speaker, output_format, voice_file=None, **extra):
+    """Stable hash of everything that influences the rendered clip.
+
+    ``voice_file`` is the model's ``voice_file_id()``.
+    """
+    payload = {
+        'v': STORE_VERSION,
+        'text': text,
+        'model': model,
+        'voiceFile': voice_file,
+        'lengthScale': round(float(length_scale), 4),
+        'speaker': None if speaker is None else str(speaker),
+        'format': output_format,
+    }
+    payload.update(extra)
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class AudioStore:
+    """Atomic on-disk clip store with background size-based eviction."""
+
+    def __init__(self, root, max_bytes, evict_interval=60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self._evictor_pid = None
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, key, output_format):
+        return os.path.join(self.root, key[:2], f'{key}.{output_format}')
+
+    def open(self, key, output_format):
+        """Open a stored clip for reading, or return None on a miss.
+
+        The file handle stays valid even if the evictor unlinks the path
+        while the response is being sent.
+        """
+        path = self.path_for(key, output_format)
+        try:
+            fh = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            # Refresh mtime so eviction approximates LRU across replicas
+            os.utime(path)
+        except OSError:
+            pass
+        return fh
+
+    def put(self, key, output_format, data):
+        """Atomically publish a clip. Concurrent writers of the same key are harmless."""
+        path = self.path_for(key, output_format)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=f'.{output_format}')
+        try:
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        return path
+
+    def start_evictor(self):
+        """Start the background eviction thread once per process.
+
+        Cheap to call on every request; threads do not survive a fork, so a
+        forked worker starts its own evictor on first use.
+        """
+        if self._evictor_pid == os.getpid() or self.max_bytes <= 0:
+            return
+        self._evictor_pid = os.getpid()
+        threading.Thread(target=self._evict_loop, name='audio-store-evictor', daemon=True).start()
+
+    def _evict_loop(self):
+        while True:
+            time.sleep(self.evict_interval)
+            try:
+                self.evict()
+            except Exception as e:
+                logger.warning(f"Audio store eviction failed: {e}")
+
+    def evict(self):
+        """Delete least recently used clips until the store fits in max_bytes.
+
+        Only one process on the shared volume evicts at a time; the others
+        skip this round.
+        """
+        lock_path = os.path.join(self.root, '.evict.lock')
+        with open(lock_path, 'a') as lock_fh:
+            try:
+                fcntl.flock(lock_fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return 0
+
+            entries = []
+            total = 0
+            now = time.time()
+            for dirpath, _dirnames, filenames in os.walk(self.root):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    if name.startswith('.tmp-'):
+                        # Leftover from a writer that died mid-write
+                        if now - st.st_mtime > 3600:
+                            self._unlink(path)
+                        continue
+                    if name.startswith('.'):
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+                    total += st.st_size
+
+            if total <= self.max_bytes:
+                return 0
+
+            entries.sort()
+            removed = 0
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if self._unlink(path):
+                    total -= size
+                    removed += 1
+            logger.info(f"Audio store evicted {removed} clips, {total} bytes remain")
+            return removed
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+def store_from_env():
+    """Build the store from TTS_AUDIO_STORE_DIR / TTS_AUDIO_STORE_MAX_MB, or None if disabled."""
+    root = os.getenv('TTS_AUDIO_STORE_DIR')
+    if not root:
+        return None
+    max_mb = int(os.getenv('TTS_AUDIO_STORE_MAX_MB', '1024'))
+    interval = int(os.getenv('TTS_AUDIO_STORE_EVICT_INTERVAL', '60'))
+    try:
+        store = AudioStore(root, max_mb * 1024 * 1024, evict_interval=interval)
+    except OSError as e:
+        logger.warning(f"Audio store disabled, cannot use {root}: {e}")
+        return None
+    logger.info(f"Audio store enabled: {root} (max {max_mb} MB)")
+    return store
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Startup-time benchmark for the TTS service.
+
+Two measurements, both written as one JSON record so releases can be
+compared (``--history`` appends to a JSONL file):
+
+- ``--import-time``: ``python -X importtime -c "import app"``, reporting the
+  total and the slowest top-level packages.
+- ``--cold-start``: spawns the service the way the Dockerfile does (gunicorn
+  with --preload, or ``python app.py`` when gunicorn is missing) and measures
+  spawn -> /health ready -> first audio, plus one warm request for reference.
+
+Usage:
+  # Inside the container / with models available
+  python bench_startup.py --import-time --cold-start --label v1.9.0 --history startup.jsonl
+
+  # Anywhere, with the stub voice
+  python bench_startup.py --cold-start --stub --runs 5
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def import_time(env, top):
+    """Profile ``import app``; returns total ms and the slowest top-level imports."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=HERE, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f'import app failed:\n{proc.stderr[-2000:]}')
+    packages = []
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_RE.match(line)
+        if not m:
+            continue
+        cumulative = int(m.group(2))
+        # Two spaces per nesting level; children are listed before their parent
+        depth = (len(m.group(3)) - 1) // 2
+        name = m.group(4)
+        if depth == 0:
+            if name == 'app':
+                total_us = cumulative
+                break
+            packages = []  # interpreter startup imports, not ours
+        elif depth == 1:
+            packages.append((name, cumulative))
+    packages.sort(key=lambda p: p[1], reverse=True)
+    return {
+        'totalMs': round(total_us / 1000, 1),
+        'slowest': [{'module': name, 'cumulativeMs': round(us / 1000, 1)} for name, us in packages[:top]],
+    }
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _request(port, method, path, body=None, timeout=120):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    try:
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+        resp = conn.getresponse()
+        return resp.status, resp.read()
+    finally:
+        conn.close()
+
+
+def cold_start(env, model, text, workers, threads, preload):
+    """Spawn the service once and time it up to the first synthesized audio."""
+    port = _free_port()
+    env = dict(env, PORT=str(port))
+    try:
+        import gunicorn  # noqa: F401
+        cmd = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(threads),
+               '-b', f'127.0.0.1:{port}', '--timeout', '60']
+        if preload:
+            cmd.append('--preload')
+        cmd.append('app:app')
+        server = 'gunicorn'
+    except ImportError:
+        cmd = [sys.executable, 'app.py']
+        server = 'flask'
+
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit(f'Service exited during startup (code {proc.returncode})')
+            try:
+                if _request(port, 'GET', '/health', timeout=1)[0] == 200:
+                    break
+            except OSError:
+                pass
+            if time.perf_counter() - t0 > 120:
+                raise SystemExit('Service did not become healthy within 120s')
+            time.sleep(0.01)
+        ready = time.perf_counter()
+
+        payload = {'text': text, 'model': model, 'format': 'wav'}
+        status, body = _request(port, 'POST', '/synthesize', payload)
+        if status != 200:
+            raise SystemExit(f'First synthesis failed ({status}): {body[:200]!r}')
+        first_audio = time.perf_counter()
+
+        warm0 = time.perf_counter()
+        _request(port, 'POST', '/synthesize', dict(payload, text=text + ' '))
+        warm_ms = (time.perf_counter() - warm0) * 1000
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    return {
+        'server': server,
+        'readyMs': (ready - t0) * 1000,
+        'firstAudioMs': (first_audio - t0) * 1000,
+        'firstRequestMs': (first_audio - ready) * 1000,
+        'warmRequestMs': warm_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure TTS service import time and cold start to first audio.')
+    parser.add_argument('--import-time', action='store_true', help='Profile "import app" with -X importtime')
+    parser.add_argument('--cold-start', action='store_true', help='Time spawn -> ready -> first audio')
+    parser.add_argument('--runs', type=int, default=3, help='Cold starts to run (median is reported)')
+    parser.add_argument('--model', default='de_DE-thorsten-medium')
+    parser.add_argument('--text', default='Schön, dass Sie da sind. Worüber möchten Sie heute sprechen?')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--no-preload', action='store_true', help='Start gunicorn without --preload')
+    parser.add_argument('--stub', action='store_true', help='Use the stub voice (TTS_STUB_VOICE=1)')
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list')
+    parser.add_argument('--label', help='Release or commit label stored with the result')
+    parser.add_argument('--json', metavar='PATH', help='Write the result as JSON')
+    parser.add_argument('--history', metavar='PATH', help='Append the result to a JSONL history file')
+    args = parser.parse_args()
+
+    if not args.import_time and not args.cold_start:
+        parser.error('choose --import-time and/or --cold-start')
+
+    env = dict(os.environ)
+    if args.stub:
+        env['TTS_STUB_VOICE'] = '1'
+
+    result = {
+        'label': args.label,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'stub': args.stub,
+    }
+
+    if args.import_time:
+        result['importTime'] = import_time(env, args.top)
+        print(f"import app: {result['importTime']['totalMs']}ms")
+        for entry in result['importTime']['slowest']:
+            print(f"  {entry['cumulativeMs']:>8.1f}ms  {entry['module']}")
+
+    if args.cold_start:
+        runs = []
+        for i in range(args.runs):
+            run = cold_start(env, args.model, args.text, args.workers, args.threads, not args.no_preload)
+            runs.append(run)
+            print(f"cold start {i + 1}/{args.runs} ({run['server']}): ready={run['readyMs']:.0f}ms, "
+                  f"first audio={run['firstAudioMs']:.0f}ms (first request {run['firstRequestMs']:.0f}ms), "
+                  f"warm request={run['warmRequestMs']:.0f}ms")
+        result['coldStart'] = {
+            'runs': len(runs),
+            'server': runs[0]['server'],
+            'preload': not args.no_preload,
+            'workers': args.workers,
+            'model': args.model,
+            **{key: round(statistics.median(r[key] for r in runs), 1)
+               for key in ('readyMs', 'firstAudioMs', 'firstRequestMs', 'warmRequestMs')},
+        }
+        cs = result['coldStart']
+        print(f"median: ready={cs['readyMs']:.0f}ms, first audio={cs['firstAudioMs']:.0f}ms, warm={cs['warmRequestMs']:.0f}ms")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump(result, fh, indent=2)
+    if args.history:
+        with open(args.history, 'a', encoding='utf-8') as fh:
+            fh.write(json.dumps(result) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
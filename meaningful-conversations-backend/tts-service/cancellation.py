@@ -0,0 +1,279 @@
+"""Cancellation of in-flight synthesis.
+
+A request is cancelled when its client disconnects (detected by peeking the
+gunicorn client socket) or when ``POST /cancel`` names its request ID (the
+trace ID). Synthesis checks the token bound to the current context between
+attempts, chunks and words and while waiting for a model lock, so a
+cancelled request stops at the next boundary and frees the lock instead of
+running every remaining fallback for nobody. A single Piper call is never
+interrupted.
+
+gunicorn runs several workers, so ``/cancel`` may land on a worker that does
+not own the request; it then leaves a marker file in TTS_CANCEL_DIR which the
+owning worker sees on its next check.
+"""
+
+import contextvars
+import logging
+import os
+import re
+import socket
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_default_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+CANCEL_DIR = os.getenv('TTS_CANCEL_DIR', os.path.join(_default_dir, 'tts-cancel'))
+# How often a thread waiting for a model lock re-checks its token
+LOCK_POLL_SECONDS = 0.05
+# CPU cost per character used to estimate saved work before any chunk finished
+DEFAULT_CPU_MS_PER_CHAR = 2.5
+_MARKER_TTL_SECONDS = 120
+_MARKER_PREFIX = 'req-'
+_MARKER_NAME_RE = re.compile(r'^[A-Za-z0-9._-]{1,128}$')
+
+_current = contextvars.ContextVar('tts_cancel', default=None)
+# request ID -> tokens of the requests running under it (a caller may reuse an ID)
+_active = {}
+_active_lock = threading.Lock()
+_stats = {'cancelled': 0, 'disconnected': 0, 'explicit': 0, 'wastedCpuMs': 0.0, 'savedCpuMs': 0.0}
+_stats_lock = threading.Lock()
+_pruner_pid = None
+
+
+class SynthesisCancelled(Exception):
+    """Raised at a synthesis boundary once the request has been cancelled."""
+
+    def __init__(self, request_id, reason):
+        super().__init__(f'Synthesis cancelled ({reason})')
+        self.request_id = request_id
+        self.reason = reason
+
+
+def _socket_probe(sock):
+    """Return a callable that is True once the peer has closed the socket."""
+    def closed():
+        try:
+            return sock.recv(1, socket.MSG_PEEK | socket.MSG_DONTWAIT) == b''
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+    return closed
+
+
+class CancelToken:
+    def __init__(self, request_id, environ=None):
+        self.request_id = request_id
+        self.reason = None
+        self._event = threading.Event()
+        self._marker = _marker_path(request_id)
+        sock = (environ or {}).get('gunicorn.socket')
+        self._client_closed = _socket_probe(sock) if sock is not None else None
+        self._cpu0 = time.thread_time()
+        self.synthesized_chars = 0
+
+    def begin(self):
+        """Restart CPU accounting in the thread that is about to do the work."""
+        self._cpu0 = time.thread_time()
+
+    def cancel(self, reason='explicit'):
+        if self.reason is None:
+            self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        if self._client_closed is not None and self._client_closed():
+            self.cancel('disconnected')
+        elif self._marker is not None and os.path.exists(self._marker):
+            self.cancel('explicit')
+        return self._event.is_set()
+
+    def check(self, remaining_chars=0):
+        """Raise SynthesisCancelled if cancelled; account the CPU spent and saved."""
+        if not self.cancelled:
+            return
+        wasted_ms = (time.thread_time() - self._cpu0) * 1000
+        if self.synthesized_chars:
+            per_char = wasted_ms / self.synthesized_chars
+        else:
+            per_char = DEFAULT_CPU_MS_PER_CHAR
+        saved_ms = remaining_chars * per_char
+        with _stats_lock:
+            _stats['cancelled'] += 1
+            _stats[self.reason] += 1
+            _stats['wastedCpuMs'] += wasted_ms
+            _stats['savedCpuMs'] += saved_ms
+        logger.info(f"TTS cancelled ({self.reason}): request={self.request_id}, "
+                    f"wasted={int(wasted_ms)}ms cpu, saved~{int(saved_ms)}ms cpu")
+        raise SynthesisCancelled(self.request_id, self.reason)
+
+
+class JointToken(CancelToken):
+    """Token for work shared by several requests: cancelled once all of them are."""
+
+    def __init__(self, request_id, members):
+        super().__init__(request_id)
+        self._members = [m for m in members if m is not None]
+        self._members_lock = threading.Lock()
+
+    def join(self, token):
+        if token is not None:
+            with self._members_lock:
+                self._members.append(token)
+
+    @property
+    def cancelled(self):
+        if self._event.is_set():
+            return True
+        with self._members_lock:
+            members = list(self._members)
+        if members and all(m.cancelled for m in members):
+            self.cancel(members[0].reason)
+        return self._event.is_set()
+
+
+def start(request_id, environ=None):
+    token = CancelToken(request_id, environ)
+    with _active_lock:
+        _active.setdefault(request_id, []).append(token)
+    return token, _current.set(token)
+
+
+def finish(token, ctx_token):
+    _current.reset(ctx_token)
+    with _active_lock:
+        tokens = _active.get(token.request_id, [])
+        if token in tokens:
+            tokens.remove(token)
+        if tokens:
+            # Another request with this ID is still running and may need the marker
+            return
+        _active.pop(token.request_id, None)
+    if token._marker is not None:
+        try:
+            os.unlink(token._marker)
+        except OSError:
+            pass
+
+
+def cancel(request_id):
+    """Cancel a request by ID; returns True if it is running in this worker."""
+    with _active_lock:
+        tokens = list(_active.get(request_id, ()))
+    if tokens:
+        for token in tokens:
+            token.cancel('explicit')
+        return True
+    # Possibly owned by another worker: leave a marker for it
+    marker = _marker_path(request_id)
+    if marker is None:
+        return False
+    try:
+        os.makedirs(CANCEL_DIR, exist_ok=True)
+        with open(marker, 'w'):
+            pass
+        _prune_markers()
+    except OSError as e:
+        logger.warning(f"Writing cancel marker failed: {e}")
+    return False
+
+
+def _marker_path(request_id):
+    """Marker file for ``request_id``, or None if the ID is not a safe file name."""
+    if not _MARKER_NAME_RE.match(request_id):
+        return None
+    # The prefix keeps '.' and '..' from naming the directory itself
+    return os.path.join(CANCEL_DIR, _MARKER_PREFIX + request_id)
+
+
+def start_pruner():
+    """Prune stale markers now and every _MARKER_TTL_SECONDS (once per process).
+
+    Markers for requests that already finished (or never ran in any worker)
+    would otherwise only be removed by the next /cancel. Called from
+    gunicorn's post_fork, since threads do not survive the fork.
+    """
+    global _pruner_pid
+    if _pruner_pid == os.getpid():
+        return
+    _pruner_pid = os.getpid()
+    threading.Thread(target=_prune_loop, name='cancel-marker-pruner', daemon=True).start()
+
+
+def _prune_loop():
+    while True:
+        try:
+            _prune_markers()
+        except Exception as e:
+            logger.warning(f"Pruning cancel markers failed: {e}")
+        time.sleep(_MARKER_TTL_SECONDS)
+
+
+def _prune_markers():
+    cutoff = time.time() - _MARKER_TTL_SECONDS
+    try:
+        names = os.listdir(CANCEL_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        path = os.path.join(CANCEL_DIR, name)
+        try:
+            if os.stat(path).st_mtime < cutoff:
+                os.unlink(path)
+        except OSError:
+            pass
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def bind(token):
+    """Make ``token`` the current one for the enclosed block."""
+    ctx_token = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(ctx_token)
+
+
+def check(remaining_chars=0):
+    """Raise SynthesisCancelled if the current request was cancelled (no-op outside requests)."""
+    token = _current.get()
+    if token is not None:
+        token.check(remaining_chars)
+
+
+def progress(chars):
+    """Record characters synthesized so far (used to estimate saved CPU)."""
+    token = _current.get()
+    if token is not None:
+        token.synthesized_chars += chars
+
+
+def acquire(lock, remaining_chars=0):
+    """Acquire a model lock, giving up if the current request is cancelled meanwhile."""
+    token = _current.get()
+    if token is None:
+        lock.acquire()
+        return
+    while not lock.acquire(timeout=LOCK_POLL_SECONDS):
+        token.check(remaining_chars)
+    try:
+        token.check(remaining_chars)
+    except SynthesisCancelled:
+        lock.release()
+        raise
+
+
+def stats():
+    with _stats_lock:
+        return {k: round(v) if isinstance(v, float) else v for k, v in _stats.items()}
@@ -0,0 +1,158 @@
+"""Text chunking for per-chunk synthesis.
+
+``split_tts_chunks`` is the fixed-size fallback used when a full-text
+synthesis fails. ``adaptive_chunks`` plans chunks for streaming: the first
+chunk is sized so it synthesizes within TTS_FIRST_AUDIO_MS at the model's
+measured speed, and each following chunk is as large as can be synthesized
+while the previous one plays. Both break at sentence, then clause (comma,
+colon, dash), then word boundaries, and only cut inside a word that is
+longer than a whole chunk.
+"""
+
+import os
+import re
+import threading
+
+FIRST_AUDIO_MS = int(os.getenv('TTS_FIRST_AUDIO_MS', '300'))
+CHUNK_MAX_CHARS = int(os.getenv('TTS_CHUNK_MAX_CHARS', '400'))
+MIN_FIRST_CHARS = 20
+# Assumed speed before a model has been measured
+DEFAULT_CHARS_PER_SEC = 150.0
+# Weight of the newest measurement in the per-model moving average
+RATE_ALPHA = 0.2
+# Spoken duration per character at lengthScale 1.0
+SPOKEN_SECONDS_PER_CHAR = 0.065
+# Fraction of the previous chunk's playback the next chunk may take to synthesize
+PLAYBACK_HEADROOM = 0.5
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?…;])\s+')
+_CLAUSE_RE = re.compile(r'(?<=[,:–—])\s+|(?<=\s-)\s+')
+
+_rates = {}
+_rates_lock = threading.Lock()
+
+
+def observe(model, chars, ms):
+    """Feed one inference measurement into the model's chars/sec average."""
+    if chars <= 0 or ms <= 0:
+        return
+    rate = chars * 1000 / ms
+    with _rates_lock:
+        previous = _rates.get(model)
+        _rates[model] = rate if previous is None else previous + RATE_ALPHA * (rate - previous)
+
+
+def chars_per_sec(model):
+    with _rates_lock:
+        return _rates.get(model, DEFAULT_CHARS_PER_SEC)
+
+
+def rates():
+    with _rates_lock:
+        return {model: round(rate, 1) for model, rate in _rates.items()}
+
+
+def _split_words(text, max_len):
+    """Pack words into pieces of at most max_len; only overlong words are cut."""
+    pieces = []
+    current = ''
+    for word in text.split():
+        while len(word) > max_len:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(word[:max_len])
+            word = word[max_len:]
+        candidate = f'{current} {word}' if current else word
+        if len(candidate) <= max_len:
+            current = candidate
+        else:
+            pieces.append(current)
+            current = word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _units(text, max_len, sentences=None):
+    """Split text into clauses of at most max_len characters.
+
+    ``sentences`` is the text already split at sentence boundaries
+    (text_normalization caches it); it is split here otherwise.
+    """
+    units = []
+    for sentence in (sentences if sentences is not None else _SENTENCE_RE.split(text)):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_len:
+            units.append(sentence)
+            continue
+        for clause in _CLAUSE_RE.split(sentence):
+            clause = clause.strip()
+            if not clause:
+                continue
+            if len(clause) <= max_len:
+                units.append(clause)
+            else:
+                units.extend(_split_words(clause, max_len))
+    return units
+
+
+def _pack(units, limit):
+    """Greedily join units up to limit; returns (chunk, units consumed)."""
+    chunk = units[0]
+    taken = 1
+    while taken < len(units):
+        candidate = f'{chunk} {units[taken]}'
+        if len(candidate) > limit:
+            break
+        chunk = candidate
+        taken += 1
+    return chunk, taken
+
+
+def split_tts_chunks(text: str, max_len: int = 180, sentences=None) -> list:
+    """Split long or problematic text at sentence boundaries for per-chunk synthesis."""
+    text = text.strip()
+    if not text:
+        return []
+    if len(text) <= max_len:
+        return [text]
+
+    units = _units(text, max_len, sentences)
+    chunks = []
+    while units:
+        chunk, taken = _pack(units, max_len)
+        chunks.append(chunk)
+        units = units[taken:]
+    return chunks or [text]
+
+
+def adaptive_chunks(text, model, length_scale=1.0):
+    """Plan streaming chunks: a short first chunk, then as large as playback allows."""
+    text = text.strip()
+    if not text:
+        return []
+    rate = chars_per_sec(model)
+    limit = max(MIN_FIRST_CHARS, min(CHUNK_MAX_CHARS, int(rate * FIRST_AUDIO_MS / 1000)))
+    if len(text) <= limit:
+        return [text]
+
+    units = _units(text, CHUNK_MAX_CHARS)
+    # Start with the first clause rather than the whole first sentence, and cut
+    # at a word boundary only if that clause is still far too long
+    if len(units[0]) > limit:
+        clauses = [c.strip() for c in _CLAUSE_RE.split(units[0]) if c.strip()]
+        if len(clauses[0]) > 2 * limit:
+            clauses[:1] = _split_words(clauses[0], limit)
+        units[:1] = clauses
+
+    chunks = []
+    while units:
+        chunk, taken = _pack(units, limit)
+        chunks.append(chunk)
+        units = units[taken:]
+        playback_s = len(chunk) * SPOKEN_SECONDS_PER_CHAR * (length_scale or 1.0)
+        limit = min(CHUNK_MAX_CHARS, max(limit, int(playback_s * rate * PLAYBACK_HEADROOM)))
+    return chunks
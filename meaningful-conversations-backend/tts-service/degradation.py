@@ -0,0 +1,191 @@
+"""Load-aware degradation of /synthesize (lighter voice, lower Opus bitrate).
+
+Disabled unless TTS_DEGRADE_INFLIGHT and/or TTS_DEGRADE_LATENCY_MS is set.
+A worker enters the degraded state when its in-flight synthesis requests
+reach TTS_DEGRADE_INFLIGHT or the mean synthesis latency over the last
+TTS_DEGRADE_WINDOW_SECONDS reaches TTS_DEGRADE_LATENCY_MS. It leaves again
+once both are below TTS_DEGRADE_RECOVER_RATIO of their thresholds and it
+has been degraded for at least TTS_DEGRADE_MIN_SECONDS, so it does not flap
+around the threshold.
+
+While degraded, voices listed in TTS_DEGRADE_VOICES
+(``heavy=light,heavy=light``) are rendered with their lighter variant and
+Opus is encoded at TTS_DEGRADE_OPUS_BITRATE. Responses say so in
+``X-TTS-Degraded``. State is per gunicorn worker, like the load it measures.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEGRADED_HEADER = 'X-TTS-Degraded'
+
+
+def _env_number(name, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
+
+def parse_voice_map(spec):
+    """``'a=b,c=d'`` -> ``{'a': 'b', 'c': 'd'}``."""
+    mapping = {}
+    for item in (spec or '').split(','):
+        heavy, sep, light = item.partition('=')
+        if sep and heavy.strip() and light.strip():
+            mapping[heavy.strip()] = light.strip()
+    return mapping
+
+
+class Degradation:
+    """What a degraded request renders instead of what it asked for."""
+
+    def __init__(self, model, bitrate, reasons):
+        self.model = model
+        self.bitrate = bitrate
+        self.reasons = reasons
+
+    def header(self):
+        parts = []
+        if self.model is not None:
+            parts.append(f'voice={self.model}')
+        if self.bitrate is not None:
+            parts.append(f'bitrate={self.bitrate}')
+        parts.append(f"reason={'+'.join(self.reasons)}")
+        return '; '.join(parts)
+
+
+class LoadGovernor:
+    """Per-worker load signal (in-flight count, windowed latency) and degraded state."""
+
+    def __init__(self, inflight_threshold=None, latency_threshold_ms=None, voices=None,
+                 opus_bitrate='24k', recover_ratio=0.5, min_seconds=30.0, window_seconds=30.0):
+        self.inflight_threshold = inflight_threshold
+        self.latency_threshold_ms = latency_threshold_ms
+        self.voices = voices or {}
+        self.opus_bitrate = opus_bitrate or None
+        self.recover_ratio = recover_ratio
+        self.min_seconds = min_seconds
+        self.window_seconds = window_seconds
+        self.enabled = inflight_threshold is not None or latency_threshold_ms is not None
+        self._inflight = 0
+        self._latencies = deque()
+        self._since = None
+        self._reasons = []
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._degraded_seconds = 0.0
+
+    @contextmanager
+    def track(self):
+        """Count a synthesis as in flight for the enclosed block."""
+        with self._lock:
+            self._inflight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    def observe(self, latency_ms):
+        """Record the latency of one completed synthesis."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._latencies.append((time.monotonic(), latency_ms))
+
+    def _mean_latency(self, now):
+        while self._latencies and now - self._latencies[0][0] > self.window_seconds:
+            self._latencies.popleft()
+        if not self._latencies:
+            return 0.0
+        return sum(ms for _, ms in self._latencies) / len(self._latencies)
+
+    def _update(self, now):
+        """Apply the thresholds with hysteresis; caller holds the lock."""
+        latency = self._mean_latency(now)
+        reasons = []
+        if self.inflight_threshold is not None and self._inflight >= self.inflight_threshold:
+            reasons.append('inflight')
+        if self.latency_threshold_ms is not None and latency >= self.latency_threshold_ms:
+            reasons.append('latency')
+
+        if self._since is None:
+            if reasons:
+                self._since = now
+                self._reasons = reasons
+                self._stats['entered'] += 1
+                for reason in reasons:
+                    self._stats[f'entered:{reason}'] += 1
+                logger.warning(f"TTS degraded ({'+'.join(reasons)}): inflight={self._inflight}, "
+                               f"latency={latency:.0f}ms (pid {os.getpid()})")
+            return
+
+        if reasons:
+            self._reasons = reasons
+            return
+        recovered = (
+            (self.inflight_threshold is None or self._inflight <= self.inflight_threshold * self.recover_ratio)
+            and (self.latency_threshold_ms is None or latency <= self.latency_threshold_ms * self.recover_ratio)
+        )
+        if recovered and now - self._since >= self.min_seconds:
+            self._degraded_seconds += now - self._since
+            logger.info(f"TTS degradation ended after {now - self._since:.0f}s (pid {os.getpid()})")
+            self._since = None
+            self._reasons = []
+
+    def decide(self, model, output_format):
+        """Return a Degradation for this request, or None to render as asked."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._update(time.monotonic())
+            if self._since is None:
+                return None
+            reasons = list(self._reasons)
+        light = self.voices.get(model)
+        bitrate = self.opus_bitrate if output_format == 'opus' else None
+        if light is None and bitrate is None:
+            return None
+        with self._lock:
+            self._stats['responses'] += 1
+            if light is not None:
+                self._stats[f'voice:{model}->{light}'] += 1
+            if bitrate is not None:
+                self._stats['bitrate'] += 1
+        return Degradation(light, bitrate, reasons)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            self._update(now)
+            degraded_seconds = self._degraded_seconds + (now - self._since if self._since is not None else 0)
+            return {
+                'enabled': self.enabled,
+                'degraded': self._since is not None,
+                'reasons': list(self._reasons),
+                'inflight': self._inflight,
+                'meanLatencyMs': round(self._mean_latency(now)),
+                'entered': self._stats['entered'],
+                'enteredBy': {k.split(':', 1)[1]: v for k, v in self._stats.items() if k.startswith('entered:')},
+                'degradedResponses': self._stats['responses'],
+                'bitrateReduced': self._stats['bitrate'],
+                'voiceSubstitutions': {k.split(':', 1)[1]: v for k, v in self._stats.items() if k.startswith('voice:')},
+                'degradedSeconds': round(degraded_seconds),
+            }
+
+
+def governor_from_env():
+    return LoadGovernor(
+        inflight_threshold=_env_number('TTS_DEGRADE_INFLIGHT', int),
+        latency_threshold_ms=_env_number('TTS_DEGRADE_LATENCY_MS', float),
+        voices=parse_voice_map(os.getenv('TTS_DEGRADE_VOICES')),
+        opus_bitrate=os.getenv('TTS_DEGRADE_OPUS_BITRATE', '24k'),
+        recover_ratio=float(os.getenv('TTS_DEGRADE_RECOVER_RATIO', '0.5')),
+        min_seconds=float(os.getenv('TTS_DEGRADE_MIN_SECONDS', '30')),
+        window_seconds=float(os.getenv('TTS_DEGRADE_WINDOW_SECONDS', '30')),
+    )
@@ -0,0 +1,33 @@
+"""gunicorn hooks (picked up automatically from the working directory).
+
+With TTS_EXECUTOR=shared the model owner processes are started here, once in
+the master, before the workers are forked; the workers find them through
+TTS_OWNER_SOCKET_DIR (see model_router.py). Each worker prunes stale cancel
+markers in the background (see cancellation.py).
+"""
+
+import os
+
+
+def on_starting(server):
+    if os.getenv('TTS_EXECUTOR') == 'shared':
+        from app import MODEL_TTL_SECONDS, VOICE_DIR
+        from model_router import start_owners
+        start_owners(VOICE_DIR, MODEL_TTL_SECONDS)
+
+
+def post_fork(server, worker):
+    from cancellation import start_pruner
+    start_pruner()
+
+
+def worker_exit(server, worker):
+    if os.getenv('TTS_EXECUTOR') in ('process', 'shared'):
+        from app import close_inference_pool
+        close_inference_pool()
+
+
+def on_exit(server):
+    if os.getenv('TTS_EXECUTOR') == 'shared':
+        from model_router import stop_owners
+        stop_owners()
@@ -0,0 +1,313 @@
+"""Process-pool executor for Piper inference (TTS_EXECUTOR=process).
+
+Phonemization, preprocessing and WAV writing hold the GIL, so threads inside
+one gunicorn worker do not scale on CPU-heavy texts. In process mode each
+pool process owns the models routed to it and runs inference outside the
+worker's GIL. PCM comes back through a per-process shared memory buffer
+instead of being pickled through the pipe; only the WAV parameters and the
+frame count travel as messages.
+"""
+
+import io
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+import wave
+from multiprocessing import resource_tracker, shared_memory
+
+import cancellation
+import chunking
+import memory_diagnostics
+from stub_voice import STUB_ENABLED, StubVoice
+from tracing import record, span
+
+logger = logging.getLogger(__name__)
+
+SHM_BYTES = int(os.getenv('TTS_PROCESS_SHM_MB', '16')) * 1024 * 1024
+
+
+class ModelHost:
+    """Models owned by one process; answers 'warm', 'synth', 'models' and 'memory' messages.
+
+    Thread-safe: calls for the same model are serialized, different models
+    run concurrently (used by the socket owners in model_router.py).
+    """
+
+    def __init__(self, voice_dir, model_ttl, untrack_buffers=False):
+        if STUB_ENABLED:
+            self._voice_cls = StubVoice
+        else:
+            # Import before the first request instead of inside it
+            from piper import PiperVoice
+            self._voice_cls = PiperVoice
+        self.voice_dir = voice_dir
+        self.model_ttl = model_ttl
+        self.untrack_buffers = untrack_buffers
+        self.voices = {}
+        self.last_used = {}
+        self.footprints = memory_diagnostics.ModelFootprints()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _model_lock(self, model):
+        with self._lock:
+            return self._locks.setdefault(model, threading.Lock())
+
+    def _voice(self, model):
+        """Return the loaded voice; caller holds the model lock."""
+        voice = self.voices.get(model)
+        if voice is None:
+            model_path = f"{self.voice_dir}/{model}.onnx"
+            if not STUB_ENABLED and not os.path.exists(model_path):
+                raise FileNotFoundError(f'Piper model not found: {model}')
+            t0 = time.time()
+            voice = self.footprints.load(model, model_path, lambda: self._voice_cls.load(model_path))
+            logger.info(f"Model loaded: {model} in {int((time.time() - t0) * 1000)}ms (pid {os.getpid()})")
+            with self._lock:
+                self.voices[model] = voice
+        with self._lock:
+            self.last_used[model] = time.time()
+        return voice
+
+    def handle(self, msg, buffers):
+        """Answer one message; ``buffers`` caches the caller's shared memory by name."""
+        op = msg[0]
+        try:
+            if op == 'models':
+                with self._lock:
+                    return ('ok', sorted(self.voices))
+            if op == 'memory':
+                return ('ok', {**memory_diagnostics.process_memory(), 'models': self.footprints.report()})
+            model = msg[1]
+            with self._model_lock(model):
+                voice = self._voice(model)
+                if op == 'warm':
+                    return ('ok',)
+
+                _, model, text, length_scale, speaker, shm_name = msg
+                buf = io.BytesIO()
+                with wave.open(buf, 'wb') as wf:
+                    voice.synthesize(
+                        text, wf,
+                        speaker_id=int(speaker) if speaker is not None else None,
+                        length_scale=length_scale,
+                    )
+            buf.seek(0)
+            with wave.open(buf, 'rb') as wf:
+                params = (wf.getnchannels(), wf.getsampwidth(), wf.getframerate())
+                frames = wf.readframes(wf.getnframes())
+
+            if shm_name not in buffers:
+                buffers[shm_name] = shared_memory.SharedMemory(name=shm_name)
+                if self.untrack_buffers:
+                    resource_tracker.unregister(buffers[shm_name]._name, 'shared_memory')
+            shm = buffers[shm_name]
+            if len(frames) <= shm.size:
+                shm.buf[:len(frames)] = frames
+                return ('ok', params, len(frames), None)
+            # Larger than the shared buffer: fall back to the pipe
+            return ('ok', params, len(frames), frames)
+        except FileNotFoundError as e:
+            return ('missing', str(e))
+        except Exception as e:
+            return ('error', f'{type(e).__name__}: {e}')
+
+    def evict_idle(self):
+        now = time.time()
+        with self._lock:
+            stale = [m for m, t in self.last_used.items() if now - t > self.model_ttl]
+        for name in stale:
+            lock = self._model_lock(name)
+            # Skip models that are busy right now
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                with self._lock:
+                    if now - self.last_used.get(name, now) <= self.model_ttl:
+                        continue
+                    self.voices.pop(name, None)
+                    self.last_used.pop(name, None)
+                self.footprints.evicted(name)
+                logger.info(f"Model evicted (idle): {name} (pid {os.getpid()})")
+            finally:
+                lock.release()
+
+
+def serve_connection(conn, host):
+    """Answer messages on one connection until it closes or sends 'stop'."""
+    buffers = {}
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError, KeyboardInterrupt):
+                break
+            if msg[0] == 'stop':
+                break
+            conn.send(host.handle(msg, buffers))
+            host.evict_idle()
+    finally:
+        for shm in buffers.values():
+            shm.close()
+
+
+def wav_from_reply(reply, shm):
+    """Rebuild WAV bytes from an 'ok' synth reply and the caller's shared buffer."""
+    _, (channels, sampwidth, framerate), nbytes, frames = reply
+    if frames is None:
+        frames = shm.buf[:nbytes].tobytes()
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(sampwidth)
+        wf.setframerate(framerate)
+        wf.writeframes(frames)
+    return out.getvalue()
+
+
+def _serve(conn, voice_dir, model_ttl):
+    """Pool process loop: load models on demand and answer synthesis requests."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve_connection(conn, ModelHost(voice_dir, model_ttl))
+
+
+class _PoolProcess:
+    """One pool process, its pipe and the shared PCM buffer it writes into."""
+
+    def __init__(self, ctx, index, voice_dir, model_ttl):
+        self.index = index
+        self.lock = threading.Lock()
+        self.shm = shared_memory.SharedMemory(create=True, size=SHM_BYTES)
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_serve, args=(child_conn, voice_dir, model_ttl),
+            name=f'tts-inference-{index}', daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+    def request(self, msg):
+        """Send one message and wait for the reply. Caller holds self.lock."""
+        try:
+            self.conn.send(msg)
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise RuntimeError(f'Inference process {self.index} died: {e}') from e
+
+    def close(self):
+        try:
+            self.conn.send(('stop',))
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+        self.shm.close()
+        self.shm.unlink()
+
+
+class InferencePool:
+    """Routes each model to the pool process that holds it."""
+
+    def __init__(self, size, voice_dir, model_ttl):
+        self._ctx = mp.get_context('spawn')
+        self._voice_dir = voice_dir
+        self._model_ttl = model_ttl
+        self._procs = [_PoolProcess(self._ctx, i, voice_dir, model_ttl) for i in range(size)]
+        self._assignment = {}
+        self._lock = threading.Lock()
+        logger.info(f"Inference pool started: {size} processes (pid {os.getpid()})")
+
+    def _route(self, model):
+        """Sticky model -> process assignment, spreading models evenly."""
+        with self._lock:
+            idx = self._assignment.get(model)
+            if idx is None:
+                load = [0] * len(self._procs)
+                for assigned in self._assignment.values():
+                    load[assigned] += 1
+                idx = load.index(min(load))
+                self._assignment[model] = idx
+            return self._procs[idx]
+
+    def _restart(self, proc):
+        with self._lock:
+            if self._procs[proc.index] is not proc:
+                return
+            logger.warning(f"Restarting inference process {proc.index}")
+            try:
+                proc.close()
+            except Exception:
+                pass
+            self._procs[proc.index] = _PoolProcess(self._ctx, proc.index, self._voice_dir, self._model_ttl)
+
+    def _call(self, proc, msg):
+        with span('lock-wait'):
+            proc.lock.acquire()
+        try:
+            return proc.request(msg)
+        except RuntimeError:
+            self._restart(proc)
+            raise
+        finally:
+            proc.lock.release()
+
+    def warm(self, model):
+        proc = self._route(model)
+        reply = self._call(proc, ('warm', model))
+        self._raise_for(model, reply)
+
+    def synthesize(self, text, model, length_scale, speaker=None):
+        """Synthesize in the owning process and return WAV bytes."""
+        proc = self._route(model)
+        with span('lock-wait'):
+            cancellation.acquire(proc.lock, len(text))
+        try:
+            t0 = time.perf_counter()
+            try:
+                reply = proc.request(('synth', model, text, length_scale, speaker, proc.shm.name))
+            except RuntimeError:
+                self._restart(proc)
+                raise
+            if reply[0] != 'ok':
+                record('inference-failed', (time.perf_counter() - t0) * 1000)
+                self._raise_for(model, reply)
+            wav = wav_from_reply(reply, proc.shm)
+        finally:
+            proc.lock.release()
+        inference_ms = (time.perf_counter() - t0) * 1000
+        record('inference', inference_ms)
+        chunking.observe(model, len(text), inference_ms)
+        cancellation.progress(len(text))
+        return wav
+
+    def _raise_for(self, model, reply):
+        status = reply[0]
+        if status == 'ok':
+            return
+        if status == 'missing':
+            with self._lock:
+                self._assignment.pop(model, None)
+            raise FileNotFoundError(reply[1])
+        raise RuntimeError(reply[1])
+
+    def assignment(self):
+        with self._lock:
+            return dict(self._assignment)
+
+    def memory(self):
+        """Memory report of each pool process (see memory_diagnostics.py)."""
+        reports = []
+        for proc in list(self._procs):
+            try:
+                reports.append({'process': proc.index, **self._call(proc, ('memory',))[1]})
+            except RuntimeError:
+                continue
+        return reports
+
+    def close(self):
+        for proc in self._procs:
+            proc.close()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""End-to-end load test for the TTS service.
+
+Replays the request mix found in service logs (``TTS Request: model=...,
+format=..., text_length=...`` lines) or a synthetic German/English coaching
+corpus at a fixed concurrency, and reports throughput, latency and
+time-to-first-byte percentiles plus error/429 rates per model.
+
+Usage:
+  # Against a running service, mix taken from production logs
+  podman logs meaningful-conversations-tts-production > tts.log
+  python loadtest.py --url http://localhost:8082 --log tts.log --concurrency 8 --requests 500
+
+  # Reproducible run on any Linux box: spawn the service with the stub voice
+  # (requests wav instead of the logged format when ffmpeg is not installed)
+  python loadtest.py --spawn-stub --concurrency 8 --duration 60 --json result.json
+
+  # Soak test: drive synthesis for hours and chart memory from /diagnostics/memory
+  TTS_DIAGNOSTICS_TOKEN=... python loadtest.py --url http://localhost:8082 --soak \
+      --duration 21600 --concurrency 2 --sample-interval 60 --soak-csv soak.csv --soak-chart soak.svg
+"""
+
+import argparse
+import csv
+import http.client
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import defaultdict
+
+_REQUEST_RE = re.compile(r'TTS Request: model=([^,]+), speaker=[^,]*, format=([^,]+), text_length=(\d+)')
+
+# Sentences shaped like coach replies; combined to reach the requested lengths
+CORPUS = {
+    'de': [
+        'Das klingt nach einem wichtigen Thema für Sie.',
+        'Was genau möchten Sie am Ende dieser Sitzung erreicht haben?',
+        'Lassen Sie uns kurz innehalten und auf das schauen, was Sie gerade gesagt haben.',
+        'Wenn Sie an die letzte Woche denken, welcher Moment fällt Ihnen als Erstes ein?',
+        'Ich höre, dass Ihnen Klarheit in dieser Entscheidung sehr wichtig ist.',
+        'Welche kleinen Schritte wären bis zu unserem nächsten Gespräch realistisch?',
+        'Atmen Sie ruhig ein, und lassen Sie den Atem langsam wieder los.',
+        'Was würde sich verändern, wenn dieser Gedanke nicht mehr da wäre?',
+    ],
+    'en': [
+        'That sounds like an important topic for you.',
+        'What would you like to have achieved by the end of this session?',
+        'Let us pause for a moment and look at what you just said.',
+        'When you think about last week, which moment comes to mind first?',
+        'I hear that clarity in this decision matters a lot to you.',
+        'Which small steps would be realistic before our next conversation?',
+        'Breathe in calmly, and slowly let the breath go again.',
+        'What would change if this thought were no longer there?',
+    ],
+}
+
+# Synthetic mix when no log is given: (model, format, weight)
+SYNTHETIC_MODELS = [
+    ('de_DE-thorsten-medium', 'opus', 4),
+    ('de_DE-eva_k-x_low', 'opus', 3),
+    ('en_US-amy-medium', 'opus', 2),
+    ('en_US-ryan-medium', 'opus', 1),
+]
+# Typical reply lengths in characters
+SYNTHETIC_LENGTHS = [40, 80, 120, 180, 250, 350, 500, 800]
+
+
+def load_log_mix(path):
+    """Collect (model, format, text_length) samples from service log lines."""
+    samples = []
+    with open(path, encoding='utf-8', errors='replace') as fh:
+        for line in fh:
+            m = _REQUEST_RE.search(line)
+            if m:
+                samples.append((m.group(1), m.group(2), int(m.group(3))))
+    if not samples:
+        raise SystemExit(f'No "TTS Request:" lines found in {path}')
+    return samples
+
+
+def synthetic_mix(n, rng):
+    models = [m for m, _f, w in SYNTHETIC_MODELS for _ in range(w)]
+    formats = {m: f for m, f, _w in SYNTHETIC_MODELS}
+    samples = []
+    for _ in range(n):
+        model = rng.choice(models)
+        samples.append((model, formats[model], rng.choice(SYNTHETIC_LENGTHS)))
+    return samples
+
+
+def make_text(model, length, rng):
+    sentences = CORPUS['de' if model.startswith('de') else 'en']
+    parts = []
+    total = 0
+    while total < length:
+        sentence = rng.choice(sentences)
+        parts.append(sentence)
+        total += len(sentence) + 1
+    text = ' '.join(parts)
+    if len(text) > length:
+        cut = text.rfind(' ', 0, length)
+        text = text[:cut if cut > 0 else length]
+    return text
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Stats:
+    def __init__(self):
+        self.latency = []
+        self.ttfb = []
+        self.status = defaultdict(int)
+        self.cache_hits = 0
+        self.bytes = 0
+
+
+def _one_request(host, port, payload, timeout):
+    """POST /synthesize; returns (status, ttfb_ms, total_ms, bytes, cache_header)."""
+    body = json.dumps(payload).encode('utf-8')
+    t0 = time.perf_counter()
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request('POST', '/synthesize', body=body, headers={'Content-Type': 'application/json'})
+        resp = conn.getresponse()
+        first = resp.read(1)
+        ttfb = (time.perf_counter() - t0) * 1000
+        rest = resp.read()
+        total = (time.perf_counter() - t0) * 1000
+        return resp.status, ttfb, total, len(first) + len(rest), resp.getheader('X-TTS-Cache')
+    finally:
+        conn.close()
+
+
+def run_load(url, samples, concurrency, max_requests, duration, timeout, seed, force_format=None, progress=None):
+    parsed = urllib.parse.urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+    rng = random.Random(seed)
+    per_model = defaultdict(Stats)
+    lock = threading.Lock()
+    issued = [0]
+    deadline = time.time() + duration if duration else None
+
+    def next_job():
+        with lock:
+            if max_requests and issued[0] >= max_requests:
+                return None
+            if deadline and time.time() >= deadline:
+                return None
+            issued[0] += 1
+            model, fmt, length = rng.choice(samples)
+            return model, fmt, make_text(model, length, rng)
+
+    def worker():
+        while True:
+            job = next_job()
+            if job is None:
+                return
+            model, fmt, text = job
+            payload = {'text': text, 'model': model, 'format': force_format or fmt, 'lengthScale': 1.1}
+            try:
+                status, ttfb, total, size, cache = _one_request(host, port, payload, timeout)
+            except (OSError, http.client.HTTPException):
+                status, ttfb, total, size, cache = 'error', None, None, 0, None
+            with lock:
+                if progress is not None:
+                    progress['done'] += 1
+                stats = per_model[model]
+                stats.status[status] += 1
+                if status == 200:
+                    stats.latency.append(total)
+                    stats.ttfb.append(ttfb)
+                    stats.bytes += size
+                    if cache == 'hit':
+                        stats.cache_hits += 1
+
+    t0 = time.time()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return per_model, time.time() - t0
+
+
+def summarize(per_model, elapsed):
+    def row(name, stats_list):
+        latency = [v for s in stats_list for v in s.latency]
+        ttfb = [v for s in stats_list for v in s.ttfb]
+        status = defaultdict(int)
+        for s in stats_list:
+            for code, n in s.status.items():
+                status[code] += n
+        total = sum(status.values())
+        ok = status.get(200, 0)
+        return {
+            'model': name,
+            'requests': total,
+            'throughputRps': round(ok / elapsed, 2) if elapsed else 0,
+            'p50Ms': percentile(latency, 50),
+            'p95Ms': percentile(latency, 95),
+            'p99Ms': percentile(latency, 99),
+            'ttfbP50Ms': percentile(ttfb, 50),
+            'ttfbP95Ms': percentile(ttfb, 95),
+            'errorRate': round((total - ok) / total, 4) if total else 0,
+            'rate429': round(status.get(429, 0) / total, 4) if total else 0,
+            'cacheHits': sum(s.cache_hits for s in stats_list),
+            'status': {str(k): v for k, v in status.items()},
+        }
+
+    rows = [row(model, [stats]) for model, stats in sorted(per_model.items())]
+    rows.append(row('ALL', list(per_model.values())))
+    return rows
+
+
+def print_table(rows, elapsed):
+    print(f'\nElapsed: {elapsed:.1f}s')
+    header = f"{'model':<24}{'req':>6}{'rps':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'ttfb50':>8}{'ttfb95':>8}{'err%':>7}{'429%':>7}{'hits':>6}"
+    print(header)
+    print('-' * len(header))
+
+    def fmt(v):
+        return f'{v:.0f}' if v is not None else '-'
+
+    for r in rows:
+        print(f"{r['model']:<24}{r['requests']:>6}{r['throughputRps']:>8.2f}{fmt(r['p50Ms']):>8}{fmt(r['p95Ms']):>8}"
+              f"{fmt(r['p99Ms']):>8}{fmt(r['ttfbP50Ms']):>8}{fmt(r['ttfbP95Ms']):>8}"
+              f"{r['errorRate'] * 100:>6.1f}%{r['rate429'] * 100:>6.1f}%{r['cacheHits']:>6}")
+
+
+class MemorySampler:
+    """Polls /diagnostics/memory during a soak run and keeps one row per process and sample."""
+
+    def __init__(self, url, token, interval, progress):
+        parsed = urllib.parse.urlparse(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.token = token
+        self.interval = interval
+        self.progress = progress
+        self.rows = []
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='soak-sampler', daemon=True)
+        self._t0 = None
+
+    def start(self):
+        self._t0 = time.time()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+    def _run(self):
+        self.sample()
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=120)
+        try:
+            conn.request('GET', '/diagnostics/memory?top=5', headers={'X-TTS-Diagnostics': self.token})
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.status != 200:
+                raise OSError(f'HTTP {resp.status}: {body[:200]!r}')
+            report = json.loads(body)
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            self.errors += 1
+            print(f'  memory sample failed: {e}', file=sys.stderr)
+            return
+        finally:
+            conn.close()
+        elapsed = round(time.time() - self._t0, 1)
+        buffers = report['largeBuffers']
+        allocations = report.get('allocations') or {}
+        for proc in report['processes']:
+            # Heap details are only known for the worker that answered
+            answering = proc['pid'] == report['pid']
+            self.rows.append({
+                'elapsedSec': elapsed,
+                'requests': self.progress['done'],
+                'pid': proc['pid'],
+                'process': proc['name'],
+                'rssMb': proc['rssMb'],
+                'largeBuffers': buffers['count'] if answering else '',
+                'largeBufferMb': buffers['totalMb'] if answering else '',
+                'tracedMb': allocations.get('tracedMb', '') if answering else '',
+            })
+        total = sum(p['rssMb'] for p in report['processes'])
+        print(f"  [{elapsed / 60:6.1f} min] {self.progress['done']} requests, "
+              f"{len(report['processes'])} processes, {total:.0f} MB RSS total")
+
+    def series(self):
+        """RSS over time per process (pid) plus the container total."""
+        per_pid = defaultdict(list)
+        totals = defaultdict(float)
+        for row in self.rows:
+            per_pid[f"{row['process']} {row['pid']}"].append((row['elapsedSec'], row['rssMb']))
+            totals[row['elapsedSec']] += row['rssMb']
+        series = dict(sorted(per_pid.items()))
+        series['total'] = sorted(totals.items())
+        return series
+
+    def write_csv(self, path):
+        fields = ['elapsedSec', 'requests', 'pid', 'process', 'rssMb', 'largeBuffers', 'largeBufferMb', 'tracedMb']
+        with open(path, 'w', newline='', encoding='utf-8') as fh:
+            writer = csv.DictWriter(fh, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.rows)
+
+
+def growth(points):
+    """Least-squares slope of (seconds, MB) points in MB per hour."""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_t = sum(t for t, _ in points) / n
+    mean_m = sum(m for _, m in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if not var:
+        return None
+    return sum((t - mean_t) * (m - mean_m) for t, m in points) / var * 3600
+
+
+def write_svg_chart(series, path, title):
+    """Plot RSS over time as a standalone SVG line chart (no plotting dependency)."""
+    width, height, left, right, top, bottom = 960, 480, 70, 220, 40, 50
+    points = [p for values in series.values() for p in values]
+    if not points:
+        return
+    max_t = max(t for t, _ in points) or 1
+    max_m = max(m for _, m in points) * 1.1 or 1
+    plot_w, plot_h = width - left - right, height - top - bottom
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22']
+
+    def xy(t, m):
+        return left + t / max_t * plot_w, top + plot_h - m / max_m * plot_h
+
+    hours = max_t >= 7200
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="sans-serif" font-size="12">',
+           f'<rect width="{width}" height="{height}" fill="white"/>',
+           f'<text x="{left}" y="24" font-size="15">{title}</text>']
+    for i in range(6):
+        m = max_m * i / 5
+        _, y = xy(0, m)
+        out.append(f'<line x1="{left}" y1="{y:.1f}" x2="{left + plot_w}" y2="{y:.1f}" stroke="#ddd"/>')
+        out.append(f'<text x="{left - 8}" y="{y + 4:.1f}" text-anchor="end">{m:.0f} MB</text>')
+    for i in range(6):
+        t = max_t * i / 5
+        x, _ = xy(t, 0)
+        label = f'{t / 3600:.1f} h' if hours else f'{t / 60:.0f} min'
+        out.append(f'<text x="{x:.1f}" y="{top + plot_h + 20}" text-anchor="middle">{label}</text>')
+    for i, (name, values) in enumerate(series.items()):
+        color = '#000' if name == 'total' else colors[i % len(colors)]
+        coords = ' '.join(f'{x:.1f},{y:.1f}' for x, y in (xy(t, m) for t, m in values))
+        out.append(f'<polyline fill="none" stroke="{color}" stroke-width="{2 if name == "total" else 1.5}" points="{coords}"/>')
+        ly = top + 16 * i
+        slope = growth(values)
+        trend = f' ({slope:+.1f} MB/h)' if slope is not None else ''
+        out.append(f'<line x1="{width - right + 15}" y1="{ly}" x2="{width - right + 35}" y2="{ly}" stroke="{color}" stroke-width="2"/>')
+        out.append(f'<text x="{width - right + 40}" y="{ly + 4}">{name}{trend}</text>')
+    out.append('</svg>')
+    with open(path, 'w', encoding='utf-8') as fh:
+        fh.write('\n'.join(out))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def spawn_stub_service(workers, threads, extra_env):
+    """Start the service with TTS_STUB_VOICE=1 (gunicorn if installed, else Flask)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    port = _free_port()
+    env = dict(os.environ, TTS_STUB_VOICE='1', PORT=str(port), **extra_env)
+    try:
+        import gunicorn  # noqa: F401
+        cmd = [sys.executable, '-m', 'gunicorn', '-w', str(workers), '--threads', str(threads),
+               '-b', f'127.0.0.1:{port}', '--timeout', '60', 'app:app']
+    except ImportError:
+        cmd = [sys.executable, 'app.py']
+    proc = subprocess.Popen(cmd, cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise SystemExit('Stub TTS service did not become healthy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay TTS traffic against the service and report latency.')
+    parser.add_argument('--url', default='http://localhost:8082', help='Service base URL')
+    parser.add_argument('--log', help='Service log to take the model/format/length mix from')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='Total requests (ignored with --duration)')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds instead of a fixed count')
+    parser.add_argument('--timeout', type=float, default=65, help='Per-request timeout (matches ttsService.js)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--format', help='Request this format for every sample instead of the logged one')
+    parser.add_argument('--spawn-stub', action='store_true', help='Start a local service with the stub voice')
+    parser.add_argument('--stub-workers', type=int, default=2)
+    parser.add_argument('--stub-threads', type=int, default=4)
+    parser.add_argument('--stub-env', action='append', default=[], metavar='KEY=VALUE',
+                        help='Extra environment for the spawned service (e.g. TTS_EXECUTOR=process)')
+    parser.add_argument('--json', metavar='PATH', help='Also write the summary as JSON')
+    parser.add_argument('--soak', action='store_true',
+                        help='Sample /diagnostics/memory during the run and chart RSS over time (use with --duration)')
+    parser.add_argument('--sample-interval', type=float, default=60, help='Seconds between memory samples')
+    parser.add_argument('--diagnostics-token', default=os.getenv('TTS_DIAGNOSTICS_TOKEN'),
+                        help='Token for /diagnostics/memory (default: $TTS_DIAGNOSTICS_TOKEN)')
+    parser.add_argument('--soak-csv', default='soak-memory.csv', metavar='PATH')
+    parser.add_argument('--soak-chart', default='soak-memory.svg', metavar='PATH')
+    args = parser.parse_args()
+
+    if args.soak and not args.duration:
+        parser.error('--soak needs --duration')
+    if args.soak and args.spawn_stub and not args.diagnostics_token:
+        args.diagnostics_token = uuid.uuid4().hex
+    if args.soak and not args.diagnostics_token:
+        parser.error('--soak needs --diagnostics-token or TTS_DIAGNOSTICS_TOKEN')
+
+    rng = random.Random(args.seed)
+    samples = load_log_mix(args.log) if args.log else synthetic_mix(1000, rng)
+
+    proc = None
+    url = args.url
+    if args.spawn_stub:
+        # Opus/MP3 are encoded with ffmpeg; without it every non-WAV request fails
+        if args.format is None and shutil.which('ffmpeg') is None:
+            print('ffmpeg not found on PATH: requesting wav for every sample (use --format to override)')
+            args.format = 'wav'
+        extra = dict(item.split('=', 1) for item in args.stub_env)
+        if args.soak:
+            extra.setdefault('TTS_DIAGNOSTICS_TOKEN', args.diagnostics_token)
+        proc, url = spawn_stub_service(args.stub_workers, args.stub_threads, extra)
+        print(f'Stub service on {url}')
+
+    progress = {'done': 0}
+    sampler = None
+    try:
+        print(f'Load test: {url}, concurrency={args.concurrency}, '
+              f'{f"duration={args.duration}s" if args.duration else f"requests={args.requests}"}, '
+              f'mix={"log " + args.log if args.log else "synthetic"} ({len(samples)} samples)')
+        if args.soak:
+            sampler = MemorySampler(url, args.diagnostics_token, args.sample_interval, progress)
+            sampler.start()
+        per_model, elapsed = run_load(url, samples, args.concurrency,
+                                      None if args.duration else args.requests,
+                                      args.duration, args.timeout, args.seed, args.format, progress)
+        if sampler is not None:
+            sampler.stop()
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    rows = summarize(per_model, elapsed)
+    print_table(rows, elapsed)
+    if sampler is not None:
+        series = sampler.series()
+        sampler.write_csv(args.soak_csv)
+        write_svg_chart(series, args.soak_chart, f'TTS RSS over {elapsed / 3600:.1f} h, {progress["done"]} requests')
+        print(f'\nMemory ({len(sampler.rows)} rows, {sampler.errors} failed samples) -> {args.soak_csv}, {args.soak_chart}')
+        for name, values in series.items():
+            slope = growth(values)
+            print(f"  {name:<28}{values[0][1]:>8.1f} -> {values[-1][1]:>8.1f} MB"
+                  f"{f'  ({slope:+.1f} MB/h)' if slope is not None else ''}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as fh:
+            json.dump({'url': url, 'concurrency': args.concurrency, 'elapsedSec': elapsed, 'models': rows}, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,239 @@
+"""Memory diagnostics for long-running workers (``GET /diagnostics/memory``).
+
+Disabled unless TTS_DIAGNOSTICS_TOKEN is set; requests must send
+``X-TTS-Diagnostics: <token>``. A report covers the answering worker:
+
+- RSS and peak RSS of every process of the container (gunicorn master,
+  workers, inference pool / model owner processes);
+- per-model footprint: ``.onnx`` size and the RSS growth measured while the
+  model loaded (ONNX Runtime allocates its arenas at load and on first run);
+- live bytes/bytearray/BytesIO/ndarray objects above TTS_DIAG_LARGE_BUFFER_KB;
+- with TTS_TRACEMALLOC=1, the top allocation sites and the diff against a
+  baseline snapshot (taken at startup, replaced with ``?rebase=1``).
+
+tracemalloc slows every allocation down, so it stays off unless asked for;
+the rest costs nothing until the endpoint is called.
+"""
+
+import gc
+import hmac
+import io
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+DIAGNOSTICS_HEADER = 'X-TTS-Diagnostics'
+
+DIAGNOSTICS_TOKEN = os.getenv('TTS_DIAGNOSTICS_TOKEN')
+TRACEMALLOC_ENABLED = os.getenv('TTS_TRACEMALLOC') == '1'
+TRACEMALLOC_FRAMES = int(os.getenv('TTS_TRACEMALLOC_FRAMES', '1'))
+LARGE_BUFFER_BYTES = int(os.getenv('TTS_DIAG_LARGE_BUFFER_KB', '256')) * 1024
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_BUFFER_TYPES = (bytes, bytearray, io.BytesIO, memoryview)
+
+_baseline = None
+_baseline_lock = threading.Lock()
+
+
+def authorized(headers):
+    """True if diagnostics are enabled and the request carries the token."""
+    supplied = headers.get(DIAGNOSTICS_HEADER)
+    return bool(DIAGNOSTICS_TOKEN) and bool(supplied) and hmac.compare_digest(supplied, DIAGNOSTICS_TOKEN)
+
+
+def start_tracing():
+    """Start tracemalloc (TTS_TRACEMALLOC=1) and take the baseline snapshot."""
+    global _baseline
+    if not TRACEMALLOC_ENABLED or tracemalloc.is_tracing():
+        return
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+    with _baseline_lock:
+        _baseline = tracemalloc.take_snapshot()
+    logger.info(f"tracemalloc started ({TRACEMALLOC_FRAMES} frames, pid {os.getpid()})")
+
+
+def _mb(nbytes):
+    return round(nbytes / (1024 * 1024), 1)
+
+
+def rss_bytes():
+    """Current RSS of this process (cheap: one read of /proc/self/statm)."""
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return 0
+
+
+def process_memory(pid='self'):
+    """RSS, peak RSS and swap of one process from /proc/<pid>/status."""
+    fields = {}
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            for line in fh:
+                key, _, value = line.partition(':')
+                fields[key] = value.strip()
+    except OSError:
+        return None
+
+    def kb(key):
+        return _mb(int(fields.get(key, '0 kB').split()[0]) * 1024)
+
+    return {
+        'pid': int(fields.get('Pid', 0)),
+        'name': fields.get('Name'),
+        'rssMb': kb('VmRSS'),
+        'peakRssMb': kb('VmHWM'),
+        'swapMb': kb('VmSwap'),
+        'threads': int(fields.get('Threads', 0)),
+    }
+
+
+def container_processes(root_pid):
+    """Memory of ``root_pid`` and all its descendants (the gunicorn process tree)."""
+    parents = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as fh:
+                stat = fh.read()
+        except OSError:
+            continue
+        # The command name may contain spaces: ppid is the second field after ')'
+        parents[int(name)] = int(stat.rsplit(')', 1)[1].split()[1])
+    tree = [root_pid]
+    for pid in tree:
+        tree.extend(child for child, parent in parents.items() if parent == pid)
+    processes = [process_memory(pid) for pid in tree]
+    return [p for p in processes if p is not None]
+
+
+class ModelFootprints:
+    """Per-model memory estimate: file size plus RSS growth while loading."""
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def load(self, model, path, loader):
+        """Call ``loader()`` and record how much RSS it added."""
+        before = rss_bytes()
+        result = loader()
+        grown = max(0, rss_bytes() - before)
+        try:
+            file_bytes = os.path.getsize(path)
+        except OSError:
+            file_bytes = 0
+        with self._lock:
+            self._models[model] = {'fileMb': _mb(file_bytes), 'loadRssMb': _mb(grown)}
+        return result
+
+    def evicted(self, model):
+        with self._lock:
+            self._models.pop(model, None)
+
+    def report(self):
+        with self._lock:
+            return {model: dict(entry) for model, entry in sorted(self._models.items())}
+
+
+def _buffer_size(obj):
+    if type(obj).__name__ == 'ndarray':
+        return getattr(obj, 'nbytes', 0)
+    if isinstance(obj, memoryview):
+        return obj.nbytes
+    if isinstance(obj, _BUFFER_TYPES):
+        # For BytesIO this includes the internal buffer
+        return sys.getsizeof(obj)
+    return None
+
+
+def large_buffers(min_bytes=LARGE_BUFFER_BYTES, top=10):
+    """Count live buffer objects of at least ``min_bytes``.
+
+    bytes and ndarrays are not tracked by the garbage collector, so the
+    referents of every tracked object are scanned as well. This walks the
+    whole heap: fine for a diagnostics call, not for a request path.
+    """
+    seen = set()
+    by_type = {}
+    largest = []
+
+    def visit(obj):
+        size = _buffer_size(obj)
+        if size is None or size < min_bytes or id(obj) in seen:
+            return
+        seen.add(id(obj))
+        kind = type(obj).__name__
+        entry = by_type.setdefault(kind, {'count': 0, 'totalMb': 0.0})
+        entry['count'] += 1
+        entry['totalMb'] += size / (1024 * 1024)
+        largest.append((size, kind))
+
+    for obj in gc.get_objects():
+        visit(obj)
+        for ref in gc.get_referents(obj):
+            if not gc.is_tracked(ref):
+                visit(ref)
+
+    largest.sort(reverse=True)
+    return {
+        'minBytes': min_bytes,
+        'count': sum(e['count'] for e in by_type.values()),
+        'totalMb': round(sum(e['totalMb'] for e in by_type.values()), 1),
+        'byType': {k: {'count': v['count'], 'totalMb': round(v['totalMb'], 1)} for k, v in by_type.items()},
+        'largest': [{'type': kind, 'mb': _mb(size)} for size, kind in largest[:top]],
+    }
+
+
+def _stat_entry(stat):
+    frame = stat.traceback[0]
+    entry = {'site': f'{frame.filename}:{frame.lineno}', 'mb': _mb(stat.size), 'count': stat.count}
+    if hasattr(stat, 'size_diff'):
+        entry['diffMb'] = _mb(stat.size_diff)
+        entry['countDiff'] = stat.count_diff
+    return entry
+
+
+def allocations(top=15, rebase=False):
+    """Top allocation sites and growth since the baseline (None without tracemalloc)."""
+    global _baseline
+    if not tracemalloc.is_tracing():
+        return None
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    ))
+    current, peak = tracemalloc.get_traced_memory()
+    with _baseline_lock:
+        baseline = _baseline
+        if rebase or baseline is None:
+            _baseline = snapshot
+    report = {
+        'tracedMb': _mb(current),
+        'peakTracedMb': _mb(peak),
+        'top': [_stat_entry(s) for s in snapshot.statistics('lineno')[:top]],
+        'sinceBaseline': None,
+    }
+    if baseline is not None:
+        diff = snapshot.compare_to(baseline, 'lineno')
+        report['sinceBaseline'] = [_stat_entry(s) for s in diff[:top] if s.size_diff]
+    return report
+
+
+def report(root_pid, top=15, rebase=False):
+    """Everything except the model footprints, which the caller knows how to collect."""
+    return {
+        'pid': os.getpid(),
+        'process': process_memory(),
+        'processes': container_processes(root_pid),
+        'gcObjects': len(gc.get_objects()),
+        'largeBuffers': large_buffers(top=top),
+        'allocations': allocations(top, rebase),
+    }
@@ -0,0 +1,313 @@
+"""Model-affinity routing across gunicorn workers (TTS_EXECUTOR=shared).
+
+In thread and process mode every gunicorn worker ends up loading every voice
+it is asked for, so memory grows with workers x voices. In shared mode a
+fixed set of owner processes, started once by the gunicorn master (see
+gunicorn.conf.py), hold the models and listen on unix sockets. Each worker
+routes a model to its owner on a consistent-hash ring, so every voice is
+loaded once per container. A voice that gets more than TTS_HOT_MODEL_RPM
+requests per minute (as seen by a worker) is replicated to
+TTS_HOT_MODEL_REPLICAS owners; the cold replicas fall back to idle eviction.
+
+Owners run the same ModelHost as the process pool, one thread per worker
+connection; PCM comes back through a shared memory buffer per connection.
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import cancellation
+import chunking
+from inference_pool import SHM_BYTES, ModelHost, serve_connection, wav_from_reply
+from tracing import record
+
+logger = logging.getLogger(__name__)
+
+OWNER_COUNT = int(os.getenv('TTS_MODEL_OWNERS', '2'))
+HOT_MODEL_RPM = int(os.getenv('TTS_HOT_MODEL_RPM', '30'))
+HOT_MODEL_REPLICAS = int(os.getenv('TTS_HOT_MODEL_REPLICAS', '2'))
+SOCKET_DIR_ENV = 'TTS_OWNER_SOCKET_DIR'
+CONNECT_TIMEOUT_SECONDS = 30
+_VIRTUAL_NODES = 64
+
+_owners = []
+_owners_lock = threading.Lock()
+
+
+def _owner_main(address, voice_dir, model_ttl):
+    """Owner process: accept worker connections and serve each on its own thread."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    # Owners have their own resource tracker, which must not unlink the
+    # workers' buffers when an owner exits
+    host = ModelHost(voice_dir, model_ttl, untrack_buffers=True)
+    if os.path.exists(address):
+        os.unlink(address)
+    listener = Listener(address, family='AF_UNIX')
+    logger.info(f"Model owner listening on {address} (pid {os.getpid()})")
+
+    def evictor():
+        while True:
+            time.sleep(30)
+            host.evict_idle()
+
+    threading.Thread(target=evictor, name='tts-owner-evictor', daemon=True).start()
+    while True:
+        conn = listener.accept()
+        threading.Thread(target=serve_connection, args=(conn, host), name='tts-owner-conn', daemon=True).start()
+
+
+def _spawn_owner(address, voice_dir, model_ttl):
+    # A plain subprocess rather than multiprocessing: gunicorn forks its workers
+    # after this, and they must not inherit (and try to join) these children
+    return subprocess.Popen([sys.executable, os.path.abspath(__file__), address, voice_dir, str(model_ttl)])
+
+
+def _supervise(voice_dir, model_ttl):
+    while True:
+        time.sleep(2)
+        with _owners_lock:
+            for i, (address, proc) in enumerate(_owners):
+                if proc.poll() is not None:
+                    logger.warning(f"Model owner {i} exited ({proc.returncode}); restarting")
+                    _owners[i] = (address, _spawn_owner(address, voice_dir, model_ttl))
+
+
+def start_owners(voice_dir, model_ttl, count=OWNER_COUNT):
+    """Start the owner processes (once, in the gunicorn master) and export their socket dir."""
+    socket_dir = tempfile.mkdtemp(prefix='tts-owners-')
+    with _owners_lock:
+        for i in range(count):
+            address = os.path.join(socket_dir, f'owner-{i}.sock')
+            _owners.append((address, _spawn_owner(address, voice_dir, model_ttl)))
+    threading.Thread(target=_supervise, args=(voice_dir, model_ttl),
+                     name='tts-owner-supervisor', daemon=True).start()
+    # Inherited by the workers gunicorn forks next
+    os.environ[SOCKET_DIR_ENV] = socket_dir
+    logger.info(f"Started {count} model owners in {socket_dir}")
+    return socket_dir
+
+
+def stop_owners():
+    with _owners_lock:
+        for _address, proc in _owners:
+            proc.terminate()
+        for _address, proc in _owners:
+            try:
+                proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        _owners.clear()
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Consistent hashing of model names onto owner indices.
+
+    With only a handful of voices plain consistent hashing easily puts most
+    of them on one owner, so the voices known up front (the voice directory)
+    are placed on the least loaded owner, ties broken by ring order, in a
+    deterministic order every worker computes identically. Other model names
+    fall back to the plain ring.
+    """
+
+    def __init__(self, count, known_models=(), vnodes=_VIRTUAL_NODES):
+        self.count = count
+        points = sorted((_hash(f'owner-{i}#{v}'), i) for i in range(count) for v in range(vnodes))
+        self._keys = [p for p, _ in points]
+        self._owners = [i for _, i in points]
+        self._placed = {}
+        load = [0] * count
+        for model in sorted(set(known_models), key=_hash):
+            order = list(self._walk(model))
+            owner = min(order, key=lambda o: (load[o], order.index(o)))
+            load[owner] += 1
+            self._placed[model] = owner
+
+    def _walk(self, model):
+        """Distinct owners clockwise from the model's hash."""
+        start = bisect.bisect(self._keys, _hash(model))
+        seen = set()
+        for step in range(len(self._keys)):
+            owner = self._owners[(start + step) % len(self._keys)]
+            if owner not in seen:
+                seen.add(owner)
+                yield owner
+                if len(seen) == self.count:
+                    return
+
+    def owners(self, model, n=1):
+        """The model's primary owner followed by up to ``n - 1`` replicas."""
+        n = min(n, self.count)
+        primary = self._placed.get(model)
+        order = list(self._walk(model))
+        if primary is not None:
+            order.remove(primary)
+            order.insert(0, primary)
+        return order[:n]
+
+
+class _OwnerClient:
+    """This worker's connections to one owner, each with its own PCM buffer."""
+
+    def __init__(self, index, address):
+        self.index = index
+        self.address = address
+        self.in_flight = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _checkout(self):
+        with self._lock:
+            self.in_flight += 1
+            if self._idle:
+                return self._idle.pop()
+        deadline = time.time() + CONNECT_TIMEOUT_SECONDS
+        while True:
+            try:
+                conn = Client(self.address, family='AF_UNIX')
+                break
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                # Owner still starting (or being restarted by the supervisor)
+                if time.time() < deadline:
+                    time.sleep(0.1)
+                    continue
+                with self._lock:
+                    self.in_flight -= 1
+                raise RuntimeError(f'Model owner {self.index} unavailable: {e}') from e
+        return conn, shared_memory.SharedMemory(create=True, size=SHM_BYTES)
+
+    def _checkin(self, slot, healthy):
+        with self._lock:
+            self.in_flight -= 1
+            if healthy:
+                self._idle.append(slot)
+                return
+        conn, shm = slot
+        conn.close()
+        shm.close()
+        shm.unlink()
+
+    def request(self, build_msg):
+        """Send ``build_msg(shm_name)`` on an idle connection and return the reply."""
+        for attempt in range(2):
+            slot = self._checkout()
+            conn, shm = slot
+            try:
+                conn.send(build_msg(shm.name))
+                reply = conn.recv()
+                break
+            except (EOFError, OSError) as e:
+                self._checkin(slot, healthy=False)
+                # An idle connection may predate an owner restart: retry once on a new one
+                if attempt:
+                    raise RuntimeError(f'Model owner {self.index} connection lost: {e}') from e
+        if reply[0] == 'ok' and len(reply) == 4:
+            wav = wav_from_reply(reply, shm)
+            self._checkin(slot, healthy=True)
+            return reply[0], wav
+        self._checkin(slot, healthy=True)
+        return reply
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, shm in idle:
+            conn.close()
+            shm.close()
+            shm.unlink()
+
+
+class ModelRouter:
+    """Per-worker client: sends each model to its owner(s) on the hash ring."""
+
+    def __init__(self, socket_dir, known_models=(), count=OWNER_COUNT):
+        self._clients = [_OwnerClient(i, os.path.join(socket_dir, f'owner-{i}.sock')) for i in range(count)]
+        self._ring = HashRing(count, known_models)
+        self._recent = defaultdict(deque)
+        self._lock = threading.Lock()
+        logger.info(f"Model router: {count} owners in {socket_dir} (pid {os.getpid()})")
+
+    def _replicas(self, model):
+        """Track the request rate and return how many owners should serve the model."""
+        now = time.time()
+        with self._lock:
+            recent = self._recent[model]
+            recent.append(now)
+            while recent and now - recent[0] > 60:
+                recent.popleft()
+            hot = len(recent) > HOT_MODEL_RPM
+        return HOT_MODEL_REPLICAS if hot else 1
+
+    def _pick(self, model):
+        candidates = [self._clients[i] for i in self._ring.owners(model, self._replicas(model))]
+        return min(candidates, key=lambda c: c.in_flight)
+
+    def _raise_for(self, reply):
+        if reply[0] == 'missing':
+            raise FileNotFoundError(reply[1])
+        raise RuntimeError(reply[1])
+
+    def warm(self, model):
+        reply = self._pick(model).request(lambda _shm: ('warm', model))
+        if reply[0] != 'ok':
+            self._raise_for(reply)
+
+    def synthesize(self, text, model, length_scale, speaker=None):
+        """Synthesize on the owning process and return WAV bytes."""
+        cancellation.check(len(text))
+        client = self._pick(model)
+        t0 = time.perf_counter()
+        reply = client.request(lambda shm_name: ('synth', model, text, length_scale, speaker, shm_name))
+        if reply[0] != 'ok':
+            record('inference-failed', (time.perf_counter() - t0) * 1000)
+            self._raise_for(reply)
+        # Includes waiting for the owner's model lock
+        inference_ms = (time.perf_counter() - t0) * 1000
+        record('inference', inference_ms)
+        chunking.observe(model, len(text), inference_ms)
+        cancellation.progress(len(text))
+        return reply[1]
+
+    def assignment(self):
+        """Loaded models per owner, as reported by the owners."""
+        loaded = {}
+        for client in self._clients:
+            try:
+                reply = client.request(lambda _shm: ('models',))
+            except RuntimeError:
+                continue
+            for model in reply[1]:
+                loaded.setdefault(model, []).append(client.index)
+        return loaded
+
+    def memory(self):
+        """Memory report of each owner (see memory_diagnostics.py)."""
+        reports = []
+        for client in self._clients:
+            try:
+                reply = client.request(lambda _shm: ('memory',))
+            except RuntimeError:
+                continue
+            reports.append({'owner': client.index, **reply[1]})
+        return reports
+
+    def close(self):
+        for client in self._clients:
+            client.close()
+
+
+if __name__ == '__main__':
+    _owner_main(sys.argv[1], sys.argv[2], float(sys.argv[3]))
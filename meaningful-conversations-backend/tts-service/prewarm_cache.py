@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Pre-render fixed phrases into the shared audio store.
+
+Bot openers, transitions and other fixed sentences are rendered at build or
+deploy time so they are store hits from the first request. Clips are keyed
+exactly like /synthesize keys them, so the text must be what ttsService.js
+sends (i.e. after cleanTextForSpeech).
+
+Usage:
+  # Render a corpus (CSV with header text,voice,lengthScale,format[,speaker] or JSONL)
+  python prewarm_cache.py corpus.csv --store /var/cache/tts-audio --jobs 2
+
+  # Derive a corpus from the verbatim phrases in the bot definitions (run in the repo)
+  python prewarm_cache.py --from-bots ../bots.js --emit-corpus phrases.csv
+
+  # Inside the running container
+  podman exec meaningful-conversations-tts-production python prewarm_cache.py /tmp/phrases.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_store import AudioStore, cache_key, voice_file_id
+
+# Mirrors VOICE_MODELS in services/ttsService.js
+DEFAULT_VOICES = {
+    'de': ['de_DE-thorsten-medium', 'de_DE-eva_k-x_low'],
+    'en': ['en_US-amy-medium', 'en_US-ryan-medium'],
+}
+# ttsService.js: lengthScale = (1 / rate) * 1.10 server slowdown, rate 1.0 for most bots
+DEFAULT_LENGTH_SCALES = [1.1]
+
+# Sentences the prompts require the coach to say verbatim
+_VERBATIM_PATTERNS = [
+    ('en', re.compile(r'exactly this (?:sentence|question)[^"\n]*?"([^"]+)"')),
+    ('de', re.compile(r'genau diese[mnr]? (?:Satz|Frage)[^"\n]*?"([^"]+)"')),
+]
+
+
+def load_corpus(path):
+    """Read (text, voice, lengthScale, format, speaker) rows from CSV or JSONL."""
+    rows = []
+    with open(path, encoding='utf-8') as fh:
+        if path.endswith('.jsonl'):
+            records = (json.loads(line) for line in fh if line.strip())
+        else:
+            records = csv.DictReader(fh)
+        for rec in records:
+            text = (rec.get('text') or '').strip()
+            if not text:
+                continue
+            rows.append({
+                'text': text,
+                'voice': rec['voice'],
+                'lengthScale': float(rec.get('lengthScale') or 1.0),
+                'format': rec.get('format') or 'opus',
+                'speaker': rec.get('speaker') or None,
+            })
+    return rows
+
+
+def _load_phonetic_patterns(bots_path, language):
+    dictionary_path = os.path.join(os.path.dirname(os.path.abspath(bots_path)), 'config', 'phonetic-dictionary.json')
+    try:
+        with open(dictionary_path, encoding='utf-8') as fh:
+            dictionary = json.load(fh)
+    except OSError:
+        return []
+    return dictionary.get('languages', {}).get(language, {}).get('patterns', [])
+
+
+def backend_clean(text, phonetic_patterns):
+    """Python port of the plain-text part of cleanTextForSpeech() in ttsService.js."""
+    for pattern in phonetic_patterns:
+        flags = re.ASCII if pattern.get('caseSensitive', True) else re.ASCII | re.IGNORECASE
+        text = re.sub(rf"\b{re.escape(pattern['term'])}\b", lambda _m: pattern['phonetic'], text, flags=flags)
+    text = unicodedata.normalize('NFKC', text)
+    for src, dst in [
+        ('\u2018', "'"), ('\u2019', "'"), ('\u201c', '"'), ('\u201d', '"'),
+        ('\u2013', '-'), ('\u2014', '-'), ('\u2026', '...'), ('\u00ad', ''),
+    ]:
+        text = text.replace(src, dst)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def phrases_from_bots(bots_path, voices, length_scales, output_format):
+    """Build corpus rows from sentences the bot prompts mandate word for word."""
+    with open(bots_path, encoding='utf-8') as fh:
+        source = fh.read()
+    rows = []
+    seen = set()
+    for language, pattern in _VERBATIM_PATTERNS:
+        phonetic = _load_phonetic_patterns(bots_path, language)
+        for match in pattern.finditer(source):
+            text = backend_clean(match.group(1), phonetic)
+            for voice in voices.get(language, []):
+                for length_scale in length_scales:
+                    key = (text, voice, length_scale)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    rows.append({
+                        'text': text,
+                        'voice': voice,
+                        'lengthScale': length_scale,
+                        'format': output_format,
+                        'speaker': None,
+                    })
+    return rows
+
+
+def write_corpus(rows, path):
+    with open(path, 'w', encoding='utf-8', newline='') as fh:
+        writer = csv.DictWriter(fh, fieldnames=['text', 'voice', 'lengthScale', 'format', 'speaker'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def _render(job):
+    """Worker: render one row into the store (app is imported once per process)."""
+    import app
+
+    key, row = job
+    t0 = time.perf_counter()
+    try:
+        wav = app.synthesize_with_piper_safe(row['text'], row['voice'], row['lengthScale'], row['speaker'])
+        audio, mimetype = app.convert_audio(wav, row['format'])
+    except Exception as e:
+        return row, 'failed', str(e), 0
+    if not app.publish_clip(key, row['format'], audio, mimetype):
+        return row, 'failed', f'not stored (got {mimetype})', 0
+    return row, 'rendered', None, int((time.perf_counter() - t0) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pre-render fixed phrases into the TTS audio store.')
+    parser.add_argument('corpus', nargs='?', help='CSV (text,voice,lengthScale,format[,speaker]) or JSONL corpus')
+    parser.add_argument('--from-bots', metavar='BOTS_JS', help='Extract verbatim phrases from the bot definitions')
+    parser.add_argument('--emit-corpus', metavar='PATH', help='Write the collected rows as CSV and exit')
+    parser.add_argument('--voice', action='append', metavar='LANG=MODEL[,MODEL]',
+                        help='Voices per language for --from-bots (default: ttsService.js VOICE_MODELS)')
+    parser.add_argument('--length-scale', type=float, action='append', dest='length_scales',
+                        help=f'lengthScale values for --from-bots (default: {DEFAULT_LENGTH_SCALES})')
+    parser.add_argument('--format', default='opus', help='Output format for --from-bots rows (default: opus)')
+    parser.add_argument('--store', default=os.getenv('TTS_AUDIO_STORE_DIR', '/var/cache/tts-audio'),
+                        help='Audio store directory (default: $TTS_AUDIO_STORE_DIR)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='Parallel render processes')
+    parser.add_argument('--force', action='store_true', help='Re-render clips that are already stored')
+    args = parser.parse_args()
+
+    if not args.corpus and not args.from_bots:
+        parser.error('give a corpus file and/or --from-bots')
+
+    rows = load_corpus(args.corpus) if args.corpus else []
+    if args.from_bots:
+        voices = dict(DEFAULT_VOICES)
+        for spec in args.voice or []:
+            lang, _, models = spec.partition('=')
+            voices[lang] = [m for m in models.split(',') if m]
+        rows += phrases_from_bots(args.from_bots, voices, args.length_scales or DEFAULT_LENGTH_SCALES, args.format)
+
+    if args.emit_corpus:
+        write_corpus(rows, args.emit_corpus)
+        print(f'Wrote {len(rows)} rows to {args.emit_corpus}')
+        return 0
+
+    # Workers build their store from the environment when they import app
+    os.environ['TTS_AUDIO_STORE_DIR'] = args.store
+    # --jobs already gives one process per worker; with TTS_EXECUTOR=process/shared
+    # (set in the container) each would start pool or model-owner processes that
+    # nothing shuts down, so the workers run Piper themselves
+    os.environ['TTS_EXECUTOR'] = 'thread'
+    store = AudioStore(args.store, 0)
+
+    # Same key as app.clip_key(): the voice files are read where app.py reads them
+    voice_dir = os.getenv('PIPER_VOICE_DIR', '/models')
+    voice_files = {}
+    todo = {}
+    skipped = 0
+    for row in rows:
+        if row['voice'] not in voice_files:
+            voice_files[row['voice']] = voice_file_id(voice_dir, row['voice'])
+        key = cache_key(row['text'], row['voice'], row['lengthScale'], row['speaker'], row['format'],
+                        voice_files[row['voice']])
+        if not args.force and os.path.exists(store.path_for(key, row['format'])):
+            skipped += 1
+            continue
+        todo[key] = row
+    # Keep rows of one voice together so each worker loads few models
+    todo = sorted(todo.items(), key=lambda item: item[1]['voice'])
+
+    print(f'{len(rows)} phrases: {skipped} already stored, rendering {len(todo)} unique with {args.jobs} processes…')
+    t0 = time.time()
+    rendered = failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for row, status, error, ms in pool.map(_render, todo, chunksize=max(1, len(todo) // (args.jobs * 4))):
+                label = f"{row['voice']} x{row['lengthScale']} {row['format']}: {row['text'][:60]}"
+                if status == 'rendered':
+                    rendered += 1
+                    print(f'  ✓ {label} ({ms}ms)')
+                else:
+                    failed += 1
+                    print(f'  ✗ {label} — {error}')
+
+    print(f'\nDone in {time.time() - t0:.1f}s: {rendered} rendered, {skipped} skipped, {failed} failed → {args.store}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
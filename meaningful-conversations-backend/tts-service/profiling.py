@@ -0,0 +1,144 @@
+"""Opt-in profiling of single /synthesize requests.
+
+Disabled unless TTS_PROFILE_DIR is set; with it unset the request path only
+pays for one boolean check. A request is profiled when TTS_PROFILE_ALL=1 or
+when it carries ``X-TTS-Profile: <TTS_PROFILE_TOKEN>``.
+
+TTS_PROFILE_MODE selects the output:
+- ``cprofile`` (default): ``<name>.prof``, readable with ``python -m pstats``
+  or snakeviz.
+- ``sample``: ``<name>.collapsed``, a stack sampler's output in the collapsed
+  format understood by flamegraph.pl / speedscope.
+
+Each profile gets a ``<name>.json`` sidecar with the request parameters. The
+text itself is only written when TTS_PROFILE_INCLUDE_TEXT=1.
+"""
+
+import cProfile
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-TTS-Profile'
+
+PROFILE_DIR = os.getenv('TTS_PROFILE_DIR')
+PROFILE_TOKEN = os.getenv('TTS_PROFILE_TOKEN')
+PROFILE_ALL = os.getenv('TTS_PROFILE_ALL') == '1'
+PROFILE_MODE = os.getenv('TTS_PROFILE_MODE', 'cprofile')
+PROFILE_INCLUDE_TEXT = os.getenv('TTS_PROFILE_INCLUDE_TEXT') == '1'
+SAMPLE_INTERVAL = float(os.getenv('TTS_PROFILE_SAMPLE_MS', '5')) / 1000
+
+PROFILING_ENABLED = bool(PROFILE_DIR) and (PROFILE_ALL or bool(PROFILE_TOKEN))
+
+
+def wants_profile(headers):
+    """True if this request should run under the profiler."""
+    if PROFILE_ALL:
+        return True
+    supplied = headers.get(PROFILE_HEADER)
+    # compare_digest() rejects non-ASCII str, so compare bytes
+    return bool(supplied) and hmac.compare_digest(supplied.encode('utf-8'), PROFILE_TOKEN.encode('utf-8'))
+
+
+class _StackSampler:
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='tts-stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+
+
+class RequestProfiler:
+    """Context manager that profiles the enclosed block in the current thread."""
+
+    def __init__(self, mode=PROFILE_MODE):
+        self.mode = mode
+        self._profile = None
+        self._sampler = None
+        self.elapsed_ms = 0
+
+    def __enter__(self):
+        self._t0 = time.perf_counter()
+        if self.mode == 'sample':
+            self._sampler = _StackSampler(threading.get_ident(), SAMPLE_INTERVAL)
+            self._sampler.start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.elapsed_ms = int((time.perf_counter() - self._t0) * 1000)
+        return False
+
+    def dump(self, trace_id, params, extra=None):
+        """Write the profile plus a JSON sidecar; returns the profile path."""
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        base = os.path.join(PROFILE_DIR, f'{stamp}-{trace_id}')
+
+        if self._sampler is not None:
+            path = f'{base}.collapsed'
+            with open(path, 'w', encoding='utf-8') as fh:
+                for stack, count in self._sampler.stacks.most_common():
+                    fh.write(f'{stack} {count}\n')
+        else:
+            path = f'{base}.prof'
+            self._profile.dump_stats(path)
+
+        text = params.get('text') or ''
+        meta = {
+            'traceId': trace_id,
+            'mode': self.mode,
+            'elapsedMs': self.elapsed_ms,
+            'model': params.get('model'),
+            'format': params.get('format'),
+            'lengthScale': params.get('lengthScale'),
+            'speaker': params.get('speaker'),
+            'textLength': len(text),
+            'textSha256': hashlib.sha256(text.encode('utf-8')).hexdigest(),
+        }
+        if PROFILE_INCLUDE_TEXT:
+            meta['text'] = text
+        if extra:
+            meta.update(extra)
+        with open(f'{base}.json', 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh, indent=2, ensure_ascii=False)
+
+        logger.info(f"Profile written: {path} ({self.elapsed_ms}ms)")
+        return path
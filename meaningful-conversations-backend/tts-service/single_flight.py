@@ -0,0 +1,80 @@
+"""Coalescing of identical concurrent synthesis requests.
+
+A retry from the frontend while the first attempt is still running would
+otherwise synthesize the same text twice under the same model lock. The
+first request for a key becomes the leader and renders the clip; requests
+arriving while it runs wait for that result instead. Coalescing is per
+gunicorn worker; across workers and over time the audio store takes over.
+
+The backend's sanitize-and-retry is only partly covered: it sends different
+(sanitized) text, so it gets a key of its own and is not coalesced with the
+first attempt, e.g. after that attempt timed out. Only concurrent retries of
+the same sanitized text share a synthesis.
+
+The leader renders under a joint cancel token, so the shared job is only
+cancelled once every waiting request has been cancelled.
+"""
+
+import threading
+
+import cancellation
+from cancellation import SynthesisCancelled
+from tracing import span
+
+
+class _Flight:
+    def __init__(self, key, leader_token):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.joint = cancellation.JointToken(
+            leader_token.request_id if leader_token is not None else key, [leader_token])
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {'leaders': 0, 'followers': 0}
+
+    def run(self, key, fn):
+        """Return ``(fn(), coalesced)``, sharing one call among concurrent callers of ``key``."""
+        token = cancellation.current()
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight(key, token)
+                    self._stats['leaders'] += 1
+                else:
+                    flight.joint.join(token)
+                    self._stats['followers'] += 1
+
+            if leader:
+                try:
+                    with cancellation.bind(flight.joint):
+                        flight.result = fn()
+                except BaseException as e:
+                    flight.error = e
+                    raise
+                finally:
+                    with self._lock:
+                        del self._flights[key]
+                    flight.done.set()
+                return flight.result, False
+
+            with span('coalesce-wait'):
+                while not flight.done.wait(cancellation.LOCK_POLL_SECONDS):
+                    if token is not None:
+                        token.check()
+            if flight.error is None:
+                return flight.result, True
+            # Joined just as the job was cancelled for everyone else: run it ourselves
+            if isinstance(flight.error, SynthesisCancelled) and not (token is not None and token.cancelled):
+                continue
+            raise flight.error
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, inFlight=len(self._flights))
@@ -0,0 +1,48 @@
+"""Stand-in for PiperVoice used by load tests on machines without models.
+
+Enabled with TTS_STUB_VOICE=1. The stub burns GIL-holding CPU in proportion
+to the text length (like phonemization and inference would) and writes a
+sine tone whose duration follows the usual speaking rate, so queueing,
+locking, encoding and transfer behave like the real service.
+"""
+
+import array
+import math
+import os
+import time
+
+STUB_ENABLED = os.getenv('TTS_STUB_VOICE') == '1'
+# Characters "synthesized" per CPU second; ~real-time factor of a medium voice
+STUB_CHARS_PER_SEC = float(os.getenv('TTS_STUB_CHARS_PER_SEC', '400'))
+
+SAMPLE_RATE = 22050
+_SPOKEN_SECONDS_PER_CHAR = 0.065
+
+
+class StubVoice:
+    """Mimics the PiperVoice.load() / synthesize() surface used by the service."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        period = SAMPLE_RATE // 220
+        self._period = array.array('h', (
+            int(3000 * math.sin(2 * math.pi * i / period)) for i in range(period)
+        )).tobytes()
+
+    @classmethod
+    def load(cls, model_path):
+        return cls(os.path.basename(model_path).replace('.onnx', ''))
+
+    def synthesize(self, text, wav_file, speaker_id=None, length_scale=1.0):
+        deadline = time.thread_time() + len(text) / STUB_CHARS_PER_SEC
+        x = 0
+        while time.thread_time() < deadline:
+            x = (x * 31 + 7) % 1000003
+
+        seconds = max(0.2, len(text) * _SPOKEN_SECONDS_PER_CHAR * (length_scale or 1.0))
+        frames = int(seconds * SAMPLE_RATE)
+        repeats, rest = divmod(frames * 2, len(self._period))
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(SAMPLE_RATE)
+        wav_file.writeframes(self._period * repeats + self._period[:rest])
@@ -0,0 +1,185 @@
+"""Text normalization for Piper, cached per text and per sentence.
+
+``normalize(text)`` returns the sanitized text (NFKC, typographic quotes,
+dashes and ellipsis mapped to ASCII, characters Piper/ONNX chokes on
+replaced by spaces, whitespace collapsed) together with its sentences, so
+the chunk fallback does not split it again.
+
+The work is the character mapping, NFKC (skipped for text that is already
+normalized once the mapping has removed '…'), one precompiled regex pass for
+the unspeakable characters and ``str.split()``/``join`` for whitespace.
+The mapping is a fixed list of ``str.replace`` calls, not ``str.translate``:
+translate looks up every character of a non-ASCII string in its table and
+is ~35x slower here than the replaces, which scan with memchr. Uncached,
+this is about 2x faster than the previous sanitize + sentence split (see
+bench_normalize.py). Results are kept in two LRU levels:
+
+- texts, keyed by a blake2b hash of the whole text (TTS_NORMALIZE_CACHE_TEXTS):
+  the sanitize-and-retry paths and repeated requests get the result at the
+  cost of hashing;
+- sentences (TTS_NORMALIZE_CACHE_SENTENCES): a new text is normalized
+  sentence by sentence, so phrases that recur across texts (greetings,
+  voice-mode chunks of the same answer) are normalized once.
+
+Normalizing sentence by sentence gives the same result as normalizing the
+whole text: sentences are split after sentence punctuation, which survives
+normalization, and the whitespace between them collapses to one space
+either way.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+TEXT_CACHE_SIZE = int(os.getenv('TTS_NORMALIZE_CACHE_TEXTS', '256'))
+SENTENCE_CACHE_SIZE = int(os.getenv('TTS_NORMALIZE_CACHE_SENTENCES', '4096'))
+
+# Typographic characters mapped to ASCII; none of them (nor their
+# replacements) composes with a neighbour, so mapping them before NFKC gives
+# the same result as after it
+_REPLACEMENTS = (
+    ('\u2018', "'"), ('\u2019', "'"), ('\u201c', '"'), ('\u201d', '"'),
+    ('\u2013', '-'), ('\u2014', '-'), ('\u2026', '...'),
+)
+_SOFT_HYPHEN = '\u00ad'
+# Runs of anything Piper cannot speak become a space; whitespace is collapsed
+# afterwards with str.split()/join, which is much faster than letting the
+# regex rewrite every single space between words
+_JUNK_RE = re.compile(r"[^\w\s.,!?;:'\"()\-/]+")
+# Same boundaries as chunking._SENTENCE_RE
+_SENTENCE_RE = re.compile(r'(?<=[.!?…;])\s+')
+# In sanitized text every sentence boundary is one of these followed by a
+# single space, and '\0' never survives sanitizing, so it can mark the splits
+_SENTENCE_ENDS = tuple((end + ' ', end + '\0') for end in '.!?;')
+
+
+class Normalized:
+    """Sanitized text and its sentences (what split_tts_chunks splits first)."""
+
+    __slots__ = ('text', 'sentences')
+
+    def __init__(self, text, sentences):
+        self.text = text
+        self.sentences = sentences
+
+
+def sanitize(text):
+    """One uncached normalization pass."""
+    if not text:
+        return ''
+    for src, dst in _REPLACEMENTS:
+        text = text.replace(src, dst)
+    # Mapping '…' first leaves most text already normalized, so NFKC is skipped
+    if not unicodedata.is_normalized('NFKC', text):
+        text = unicodedata.normalize('NFKC', text)
+        # NFKC can produce them from compatibility forms (e.g. U+FE58)
+        for src, dst in _REPLACEMENTS:
+            text = text.replace(src, dst)
+    # After NFKC: a soft hyphen blocks composition of its neighbours
+    text = text.replace(_SOFT_HYPHEN, '')
+    return ' '.join(_JUNK_RE.sub(' ', text).split())
+
+
+def split_sentences(text):
+    """Sentences of sanitized text (what chunking._SENTENCE_RE would give)."""
+    if not text:
+        return ()
+    for end, marked in _SENTENCE_ENDS:
+        text = text.replace(end, marked)
+    return tuple(text.split('\0'))
+
+
+class _LRU:
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if self.size <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+
+_texts = _LRU(TEXT_CACHE_SIZE)
+_sentences = _LRU(SENTENCE_CACHE_SIZE)
+_lock = threading.Lock()
+_stats = Counter()
+
+
+def _text_key(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+def _sentence(raw):
+    """(sanitized, sentences) for one raw sentence, from the sentence cache."""
+    with _lock:
+        cached = _sentences.get(raw)
+        _stats['sentenceHits' if cached is not None else 'sentenceMisses'] += 1
+    if cached is not None:
+        return cached
+    clean = sanitize(raw)
+    # Characters replaced by spaces can expose further boundaries
+    result = (clean, split_sentences(clean))
+    with _lock:
+        _sentences.put(raw, result)
+    return result
+
+
+def normalize(text):
+    """Cached ``Normalized`` for ``text``."""
+    if not text:
+        return Normalized('', ())
+    key = _text_key(text)
+    with _lock:
+        cached = _texts.get(key)
+        _stats['textHits' if cached is not None else 'textMisses'] += 1
+    if cached is not None:
+        return cached
+
+    parts = []
+    sentences = []
+    for raw in _SENTENCE_RE.split(text):
+        clean, found = _sentence(raw)
+        if clean:
+            parts.append(clean)
+            sentences.extend(found)
+    result = Normalized(' '.join(parts), tuple(sentences))
+    with _lock:
+        _texts.put(key, result)
+    return result
+
+
+def clear():
+    with _lock:
+        _texts.clear()
+        _sentences.clear()
+
+
+def stats():
+    with _lock:
+        return {
+            'texts': len(_texts),
+            'sentences': len(_sentences),
+            'textHits': _stats['textHits'],
+            'textMisses': _stats['textMisses'],
+            'sentenceHits': _stats['sentenceHits'],
+            'sentenceMisses': _stats['sentenceMisses'],
+        }
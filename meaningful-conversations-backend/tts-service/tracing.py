@@ -0,0 +1,103 @@
+"""Per-request stage timing, exported as a W3C ``Server-Timing`` header.
+
+A trace is bound to the current context (thread or greenlet) for the lifetime
+of one request. Helpers deep in the synthesis path call ``span()`` without
+needing the trace passed down; outside a request (CLI tools, warmup) spans
+are no-ops.
+"""
+
+import contextvars
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACE_HEADER = 'X-Trace-Id'
+
+# Starts with a letter or digit, so '.', '..' and hidden names never reach a path
+_TRACE_ID_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$')
+_current = contextvars.ContextVar('tts_trace', default=None)
+
+
+class Trace:
+    """Accumulates named stage durations; repeated stages are summed."""
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self._spans = {}
+        self._notes = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, ms):
+        with self._lock:
+            total, count = self._spans.get(name, (0.0, 0))
+            self._spans[name] = (total + ms, count + 1)
+
+    def note(self, name, value):
+        """Attach a duration-less marker, e.g. which fallback path was taken."""
+        with self._lock:
+            self._notes[name] = str(value)
+
+    def spans(self):
+        with self._lock:
+            return dict(self._spans)
+
+    def server_timing(self):
+        parts = []
+        with self._lock:
+            for name, (total, count) in self._spans.items():
+                entry = f'{name};dur={total:.1f}'
+                if count > 1:
+                    entry += f';desc="x{count}"'
+                parts.append(entry)
+            for name, value in self._notes.items():
+                parts.append(f'{name};desc="{value}"')
+        return ', '.join(parts)
+
+
+def resolve_trace_id(incoming):
+    """Reuse a well-formed caller-supplied trace ID, otherwise mint one."""
+    if incoming and _TRACE_ID_RE.match(incoming):
+        return incoming
+    return uuid.uuid4().hex
+
+
+def start_trace(trace_id):
+    trace = Trace(trace_id)
+    token = _current.set(trace)
+    return trace, token
+
+
+def end_trace(token):
+    _current.reset(token)
+
+
+def current_trace():
+    return _current.get()
+
+
+def record(name, ms):
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, ms)
+
+
+def note(name, value):
+    trace = _current.get()
+    if trace is not None:
+        trace.note(name, value)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block into the current trace (no-op without one)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, (time.perf_counter() - t0) * 1000)
@@ -0,0 +1,248 @@
+"""Persistent WebSocket session for voice mode (``/ws``).
+
+One socket carries every utterance of a voice-mode conversation, so there is
+no per-utterance connection setup, ``/warmup`` call or HTTP response.
+
+Client -> server (JSON text messages):
+  {"type": "voice", "model": "...", "lengthScale": 1.1, "speaker": null, "format": "opus"}
+      Select the session voice (applies from the next utterance); loads the
+      model and keeps it pinned for as long as the socket is open.
+  {"type": "synthesize", "id": "u1", "text": "..."}
+      Queue an utterance. Optional model/lengthScale/speaker/format override
+      the session voice for this utterance only.
+  {"type": "cancel", "id": "u1"}   (without id: cancel everything, i.e. barge-in)
+  {"type": "ping"}
+
+Server -> client:
+  JSON: voice, started {id, utterance}, done {id, utterance, frames, timing},
+        cancelled {id}, error {id?, error}, pong
+  Binary audio frames: a 9-byte header ``!IIB`` (utterance number, sequence
+  number, flags with bit 0 = last frame) followed by one independently
+  decodable clip (WAV or Ogg/Opus) per sentence chunk.
+
+A session holds one gunicorn thread for as long as the socket is open, so a
+worker accepts at most TTS_WS_MAX_SESSIONS of them (further ones get an
+error and are closed) and closes sessions that have neither sent a message
+nor had an utterance in flight for TTS_WS_IDLE_TIMEOUT seconds.
+"""
+
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+import uuid
+
+import cancellation
+from cancellation import CancelToken, SynthesisCancelled
+from tracing import end_trace, start_trace
+
+logger = logging.getLogger(__name__)
+
+FRAME_HEADER = struct.Struct('!IIB')
+FLAG_LAST = 0x01
+
+DEFAULT_VOICE = {'model': 'de_DE-thorsten-medium', 'lengthScale': 1.0, 'speaker': None, 'format': 'opus'}
+
+# Per worker; 0 = no limit
+MAX_SESSIONS = int(os.getenv('TTS_WS_MAX_SESSIONS', '2'))
+IDLE_TIMEOUT_SECONDS = float(os.getenv('TTS_WS_IDLE_TIMEOUT', '300'))
+_slots = threading.BoundedSemaphore(MAX_SESSIONS) if MAX_SESSIONS > 0 else None
+
+
+class VoiceSession:
+    """Reads control messages on the socket thread and synthesizes on a worker thread.
+
+    ``backend`` provides ``chunks(text, model, length_scale)``, ``render(text, model, length_scale,
+    speaker, fmt) -> (audio, mimetype)``, ``pin(model) -> load_ms`` and
+    ``unpin(model)``; ``keepalive`` is the interval for ``backend.touch(model)``
+    while the session is idle.
+    """
+
+    def __init__(self, ws, backend, keepalive):
+        self.ws = ws
+        self.backend = backend
+        self.keepalive = keepalive
+        self.session_id = uuid.uuid4().hex[:12]
+        self.voice = dict(DEFAULT_VOICE)
+        self.pinned = None
+        self._send_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._tokens = {}
+        self._tokens_lock = threading.Lock()
+        self._utterances = 0
+        self._closed = threading.Event()
+
+    def send_json(self, payload):
+        with self._send_lock:
+            self.ws.send(json.dumps(payload))
+
+    def send_frame(self, utterance, seq, last, audio):
+        with self._send_lock:
+            self.ws.send(FRAME_HEADER.pack(utterance, seq, FLAG_LAST if last else 0) + audio)
+
+    def run(self):
+        if _slots is not None and not _slots.acquire(blocking=False):
+            logger.warning(f"Voice session rejected: {MAX_SESSIONS} sessions already open in this worker")
+            self.send_json({'type': 'error', 'error': 'Too many voice sessions, use /synthesize'})
+            return
+        try:
+            self._run()
+        finally:
+            if _slots is not None:
+                _slots.release()
+
+    def _run(self):
+        logger.info(f"Voice session opened: {self.session_id}")
+        worker = threading.Thread(target=self._work, name=f'tts-ws-{self.session_id}', daemon=True)
+        worker.start()
+        try:
+            idle_since = time.monotonic()
+            while True:
+                raw = self.ws.receive(timeout=IDLE_TIMEOUT_SECONDS / 4 if IDLE_TIMEOUT_SECONDS else None)
+                if raw is None:
+                    with self._tokens_lock:
+                        busy = bool(self._tokens)
+                    if busy:
+                        idle_since = time.monotonic()
+                    elif IDLE_TIMEOUT_SECONDS and time.monotonic() - idle_since >= IDLE_TIMEOUT_SECONDS:
+                        logger.info(f"Voice session idle for {int(IDLE_TIMEOUT_SECONDS)}s: {self.session_id}")
+                        self.send_json({'type': 'error', 'error': 'Idle timeout'})
+                        break
+                    continue
+                idle_since = time.monotonic()
+                try:
+                    msg = json.loads(raw)
+                except (TypeError, ValueError):
+                    self.send_json({'type': 'error', 'error': 'Expected a JSON text message'})
+                    continue
+                if not isinstance(msg, dict):
+                    self.send_json({'type': 'error', 'error': 'Expected a JSON object'})
+                    continue
+                self._handle(msg)
+        finally:
+            self._closed.set()
+            self._cancel_all()
+            self._queue.put(None)
+            worker.join(timeout=5)
+            if self.pinned is not None:
+                self.backend.unpin(self.pinned)
+            logger.info(f"Voice session closed: {self.session_id} ({self._utterances} utterances)")
+
+    def _handle(self, msg):
+        kind = msg.get('type')
+        if kind == 'ping':
+            self.send_json({'type': 'pong'})
+        elif kind == 'voice':
+            self._set_voice(msg)
+        elif kind == 'synthesize':
+            utt_id = str(msg.get('id') or uuid.uuid4().hex[:8])
+            if not msg.get('text'):
+                self.send_json({'type': 'error', 'id': utt_id, 'error': 'Text is required'})
+                return
+            token = CancelToken(f'{self.session_id}-{utt_id}')
+            with self._tokens_lock:
+                self._tokens[utt_id] = token
+            self._queue.put((utt_id, msg, token))
+        elif kind == 'cancel':
+            if msg.get('id') is None:
+                self._cancel_all()
+            else:
+                with self._tokens_lock:
+                    token = self._tokens.get(str(msg['id']))
+                if token is not None:
+                    token.cancel('explicit')
+        else:
+            self.send_json({'type': 'error', 'error': f'Unknown message type: {kind}'})
+
+    def _set_voice(self, msg):
+        voice = dict(self.voice)
+        for field in ('model', 'lengthScale', 'speaker', 'format'):
+            if field in msg:
+                voice[field] = msg[field]
+        try:
+            load_ms = self.backend.pin(voice['model'])
+        except Exception as e:
+            logger.warning(f"Voice session {self.session_id}: loading {voice['model']} failed: {e}")
+            self.send_json({'type': 'error', 'error': f"Voice {voice['model']} unavailable: {e}"})
+            return
+        if self.pinned is not None and self.pinned != voice['model']:
+            self.backend.unpin(self.pinned)
+        elif self.pinned == voice['model']:
+            # Already pinned by this session: drop the extra pin just taken
+            self.backend.unpin(voice['model'])
+        self.pinned = voice['model']
+        self.voice = voice
+        self.send_json({'type': 'voice', **voice, 'loadMs': load_ms})
+
+    def _cancel_all(self):
+        with self._tokens_lock:
+            tokens = list(self._tokens.values())
+        for token in tokens:
+            token.cancel('disconnected' if self._closed.is_set() else 'explicit')
+
+    def _work(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.keepalive)
+            except queue.Empty:
+                if self.pinned is not None:
+                    self.backend.touch(self.pinned)
+                continue
+            if item is None:
+                return
+            utt_id, msg, token = item
+            try:
+                self._synthesize(utt_id, msg, token)
+            except Exception as e:
+                # Socket closed under us; the reader loop shuts the session down
+                if self._closed.is_set():
+                    return
+                logger.error(f"Voice session {self.session_id} utterance {utt_id} failed: {e}", exc_info=True)
+                try:
+                    self.send_json({'type': 'error', 'id': utt_id, 'error': str(e)})
+                except Exception:
+                    return
+            finally:
+                with self._tokens_lock:
+                    self._tokens.pop(utt_id, None)
+
+    def _synthesize(self, utt_id, msg, token):
+        self._utterances += 1
+        utterance = self._utterances
+        model = msg.get('model', self.voice['model'])
+        length_scale = msg.get('lengthScale', self.voice['lengthScale'])
+        speaker = msg.get('speaker', self.voice['speaker'])
+        fmt = msg.get('format', self.voice['format'])
+        text = msg['text']
+
+        t0 = time.perf_counter()
+        token.begin()
+        trace, trace_token = start_trace(token.request_id)
+        try:
+            with cancellation.bind(token):
+                self.send_json({'type': 'started', 'id': utt_id, 'utterance': utterance})
+                chunks = self.backend.chunks(text, model, length_scale)
+                remaining = sum(len(c) for c in chunks)
+                for seq, chunk in enumerate(chunks):
+                    cancellation.check(remaining)
+                    remaining -= len(chunk)
+                    audio, _mimetype = self.backend.render(chunk, model, length_scale, speaker, fmt)
+                    cancellation.check(remaining)
+                    self.send_frame(utterance, seq, seq == len(chunks) - 1, audio)
+        except SynthesisCancelled:
+            self.send_json({'type': 'cancelled', 'id': utt_id, 'utterance': utterance})
+            return
+        finally:
+            end_trace(trace_token)
+
+        total_ms = int((time.perf_counter() - t0) * 1000)
+        logger.info(f"TTS WS Success: session={self.session_id}, utterance={utt_id}, model={model}, "
+                    f"{len(chunks)} frames, total={total_ms}ms")
+        self.send_json({
+            'type': 'done', 'id': utt_id, 'utterance': utterance, 'frames': len(chunks),
+            'totalMs': total_ms,
+            'timing': {name: round(ms, 1) for name, (ms, _count) in trace.spans().items()},
+        })
@@ -8,6 +8,8 @@ const path = require('path');
 // Cache for the loaded dictionary
 let dictionaryCache = null;
 let lastLoadTime = null;
+// Compiled word-boundary regexes per language (built on first use, dropped on reload)
+const compiledCache = new Map();
 
 /**
  * Load the phonetic dictionary from JSON file
@@ -59,6 +61,30 @@ function getPhoneticReplacements(language) {
     }));
 }
 
+/**
+ * Get phonetic replacements with their word-boundary regex precompiled
+ * Compiled once per language, so cleaning text does not build one RegExp per term per call
+ * @param {string} language - Language code ('de', 'en', etc.)
+ * @returns {Array} Array of { term, phonetic, caseSensitive, regex } (regex has the g flag)
+ */
+function getCompiledPhoneticPatterns(language) {
+    let compiled = compiledCache.get(language);
+    if (!compiled) {
+        compiled = getPhoneticReplacements(language).map(({ term, phonetic, caseSensitive }) => {
+            // Escape special regex characters in the term
+            const escapedTerm = term.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+            return {
+                term,
+                phonetic,
+                caseSensitive,
+                regex: new RegExp(`\\b${escapedTerm}\\b`, caseSensitive ? 'g' : 'gi'),
+            };
+        });
+        compiledCache.set(language, compiled);
+    }
+    return compiled;
+}
+
 /**
  * Get all phonetic patterns for a language (with metadata)
  * @param {string} language - Language code
@@ -81,6 +107,7 @@ function getPhoneticPatterns(language) {
 function reloadDictionary() {
     console.log('🔄 Reloading phonetic dictionary...');
     dictionaryCache = loadDictionary();
+    compiledCache.clear();
     return dictionaryCache;
 }
 
@@ -111,6 +138,7 @@ function getDictionaryStats() {
 
 module.exports = {
     getPhoneticReplacements,
+    getCompiledPhoneticPatterns,
     getPhoneticPatterns,
     reloadDictionary,
     getDictionaryStats
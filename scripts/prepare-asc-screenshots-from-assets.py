@@ -1,12 +1,38 @@
 #!/usr/bin/env python3
-"""Build App Store Connect sets from journey + archived app-store sources."""
+"""Build App Store Connect sets from journey + archived app-store sources.
+
+Builds are incremental: manifest.json records the SHA-256 of each source,
+the target size and PIPELINE_VERSION, and only screens whose source, size or
+pipeline changed (or whose output is missing) are resized and re-encoded.
+Use --force to rebuild everything.
+
+Screens are rendered in a process pool (--jobs, default: all cores), one
+image per worker at a time, so peak memory stays at a few full-resolution
+images per core. Large sources are first shrunk with an integer box reduce
+and only the last step uses LANCZOS. --compress-level sets the zlib level of
+the PNG encode (default 9; lower is faster and larger).
+
+--validate checks every PNG under screenshots/journey and
+screenshots/app-store in bulk (numpy): perceptual hash, edge background
+colour and blank-screen detection. Shipped entries get a ``validation``
+block in manifest.json with flags for blank screens, near-duplicate
+sources, aspect-ratio or dark-theme mismatches and archived sources that
+have a differing journey capture (possibly stale). --strict exits non-zero
+when a shipped entry is flagged.
+"""
 
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
-import shutil
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import numpy as np
 from PIL import Image
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -19,6 +45,23 @@ SRC_242 = APP_STORE / 'v2.4.2'
 IPHONE_SIZE = (1284, 2778)
 IPAD_SIZE = (2048, 2732)
 
+# Bump when resize_cover_crop / copy_or_resize change their output
+PIPELINE_VERSION = 2
+# Integer-reduce a source while it stays at least this many times the final
+# size; the LANCZOS pass then only covers the last factor (as Pillow's reducing_gap)
+REDUCING_GAP = 2.0
+DEFAULT_COMPRESS_LEVEL = 9
+
+# Validation: every image is reduced to a fixed-size thumbnail so the checks
+# run on one stacked (N, H, W, 3) array
+THUMB_SIZE = (64, 128)
+HASH_GRID = 32
+HASH_BITS = 8  # 8x8 low-frequency DCT block -> 64-bit pHash
+NEAR_DUPLICATE_BITS = 6
+BLANK_STD = 4.0
+BLANK_BACKGROUND_SHARE = 0.985
+ASPECT_TOLERANCE = 0.03
+
 # ASC upload order — sources must match screen content (see manifest.json)
 IPHONE_ASC: list[tuple[str, str, str]] = [
     ('app-store/v2.4.2/iphone/01-welcome-dark-iphone-de.png', '01-welcome-dark-iphone-de.png', 'Welcome / auth'),
@@ -60,18 +103,29 @@ def resolve_src(rel: str) -> Path:
     return ROOT / 'screenshots' / rel
 
 
+def edge_backgrounds(pixels: np.ndarray, border: int = 2) -> np.ndarray:
+    """Median colour of the outer frame of each image in an (N, H, W, 3) stack."""
+    n = pixels.shape[0]
+    frame = np.concatenate([
+        pixels[:, :border].reshape(n, -1, 3),
+        pixels[:, -border:].reshape(n, -1, 3),
+        pixels[:, border:-border, :border].reshape(n, -1, 3),
+        pixels[:, border:-border, -border:].reshape(n, -1, 3),
+    ], axis=1)
+    return np.median(frame, axis=1)
+
+
 def edge_background(img: Image.Image) -> tuple[int, int, int]:
-    px = img.load()
-    w, h = img.size
-    samples = [
-        px[2, 2], px[w - 3, 2], px[2, h - 3], px[w - 3, h - 3],
-        px[w // 2, 2], px[w // 2, h - 3],
-    ]
-    return (
-        sum(c[0] for c in samples) // len(samples),
-        sum(c[1] for c in samples) // len(samples),
-        sum(c[2] for c in samples) // len(samples),
-    )
+    pixels = np.asarray(img.convert('RGB'))[None]
+    return tuple(int(c) for c in edge_backgrounds(pixels, border=3)[0])
+
+
+def reduce_factor(size: tuple[int, int], target: tuple[int, int]) -> int:
+    """Largest integer reduce that keeps the image REDUCING_GAP times above the cover size."""
+    sw, sh = size
+    tw, th = target
+    # Cover-crop scales by max(tw/sw, th/sh): the source is min(sw/tw, sh/th) times too large
+    return max(1, int(min(sw / tw, sh / th) / REDUCING_GAP))
 
 
 def resize_cover_crop(img: Image.Image, target: tuple[int, int]) -> Image.Image:
@@ -84,82 +138,344 @@ def resize_cover_crop(img: Image.Image, target: tuple[int, int]) -> Image.Image:
     return resized.crop((left, top, left + tw, top + th))
 
 
-def copy_or_resize(src: Path, dest: Path, target: tuple[int, int]) -> None:
-    img = Image.open(src).convert('RGB')
+def copy_or_resize(src: Path, dest: Path, target: tuple[int, int],
+                   compress_level: int = DEFAULT_COMPRESS_LEVEL) -> dict:
+    """Render one screen; returns per-stage timings in ms (runs in a pool worker)."""
+    timings: dict[str, float] = {}
+    t = time.perf_counter()
+
+    def lap(stage: str) -> None:
+        nonlocal t
+        now = time.perf_counter()
+        timings[stage] = (now - t) * 1000
+        t = now
+
+    with Image.open(src) as opened:
+        opened.load()
+        lap('load')
+        # reduce() works on RGB(A); other modes (palette, grey) are converted first
+        img = opened if opened.mode in ('RGB', 'RGBA') else opened.convert('RGB')
+        factor = reduce_factor(img.size, target)
+        if factor > 1:
+            # Box-average before the RGBA -> RGB conversion so both run on the small image
+            img = img.reduce(factor)
+            lap('reduce')
+        img = img.convert('RGB')
+        lap('convert')
     if img.size != target:
         img = resize_cover_crop(img, target)
+        lap('resize')
     dest.parent.mkdir(parents=True, exist_ok=True)
-    img.save(dest, format='PNG', optimize=True)
-    print(f'  ✓ {dest.name} ← {src.name} ({img.size[0]}×{img.size[1]})')
+    tmp = dest.with_name(f'.{dest.name}.tmp')
+    img.save(tmp, format='PNG', compress_level=compress_level)
+    # Never leave a half-written screen behind if the run is interrupted
+    os.replace(tmp, dest)
+    lap('save')
+    return timings
+
+
+def file_sha256(path: Path) -> str:
+    # Hashing every source (~40 MB) takes well under 100 ms; mtimes are not
+    # used because the manifest is committed and checkouts reset them
+    h = hashlib.sha256()
+    with path.open('rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_thumbnail(path: Path) -> tuple[np.ndarray, tuple[int, int]]:
+    """Fixed-size RGB thumbnail and original size of one image (runs in a pool worker)."""
+    with Image.open(path) as img:
+        size = img.size
+        img = img if img.mode in ('RGB', 'RGBA') else img.convert('RGB')
+        factor = reduce_factor(size, THUMB_SIZE)
+        if factor > 1:
+            img = img.reduce(factor)
+        thumb = img.convert('RGB').resize(THUMB_SIZE, Image.Resampling.BOX)
+    return np.asarray(thumb, dtype=np.uint8), size
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    m = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n))
+    m[0] *= 1 / np.sqrt(2)
+    return m * np.sqrt(2 / n)
+
+
+def perceptual_hashes(pixels: np.ndarray) -> np.ndarray:
+    """pHash of each image as an (N, 64) bool array."""
+    n, h, w, _ = pixels.shape
+    gray = pixels.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    # Box-average the thumbnail down to the hash grid
+    grid = gray.reshape(n, HASH_GRID, h // HASH_GRID, HASH_GRID, w // HASH_GRID).mean(axis=(2, 4))
+    dct = _dct_matrix(HASH_GRID).astype(np.float32)
+    low = (dct @ grid @ dct.T)[:, :HASH_BITS, :HASH_BITS].reshape(n, -1)
+    # The DC term only carries overall brightness
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    return low > median
+
+
+def hamming_distances(hashes: np.ndarray) -> np.ndarray:
+    packed = np.packbits(hashes, axis=1)
+    xor = packed[:, None, :] ^ packed[None, :, :]
+    return np.unpackbits(xor, axis=2).sum(axis=2)
+
+
+def blank_screens(pixels: np.ndarray, backgrounds: np.ndarray) -> np.ndarray:
+    """True where an image is (almost) a single flat colour."""
+    flat = pixels.astype(np.int16)
+    std = flat.mean(axis=3).reshape(len(flat), -1).std(axis=1)
+    near_bg = (np.abs(flat - backgrounds[:, None, None, :]).max(axis=3) <= 12)
+    share = near_bg.reshape(len(flat), -1).mean(axis=1)
+    return (std < BLANK_STD) | (share > BLANK_BACKGROUND_SHARE)
+
+
+def validate(manifests: dict[str, list[dict]], jobs: int) -> int:
+    """Annotate manifest entries with validation results; returns the number of flagged entries."""
+    t0 = time.perf_counter()
+    shots = ROOT / 'screenshots'
+    paths = sorted(
+        p for tree in (JOURNEY, APP_STORE) for p in tree.rglob('*.png')
+        if OUT not in p.parents
+    )
+    rels = [p.relative_to(shots).as_posix() for p in paths]
+    index = {rel: i for i, rel in enumerate(rels)}
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            loaded = list(pool.map(load_thumbnail, paths, chunksize=8))
+    else:
+        loaded = [load_thumbnail(p) for p in paths]
+    decoded = time.perf_counter()
+
+    pixels = np.stack([thumb for thumb, _size in loaded])
+    sizes = np.array([size for _thumb, size in loaded], dtype=np.float64)
+    digests = [file_sha256(p) for p in paths]
+    backgrounds = edge_backgrounds(pixels)
+    blank = blank_screens(pixels, backgrounds)
+    hashes = perceptual_hashes(pixels)
+    distances = hamming_distances(hashes)
+    luminance = backgrounds @ np.array([0.299, 0.587, 0.114])
+
+    flagged = 0
+    for device, entries in manifests.items():
+        target_aspect = (IPHONE_SIZE if device == 'iphone' else IPAD_SIZE)
+        target_aspect = target_aspect[0] / target_aspect[1]
+        shipped = [index[e['source']] for e in entries]
+        for entry, i in zip(entries, shipped):
+            flags = []
+            if blank[i]:
+                flags.append('blank')
+            if abs(sizes[i, 0] / sizes[i, 1] / target_aspect - 1) > ASPECT_TOLERANCE:
+                flags.append('aspect-mismatch')
+            if '-dark-' in entry['source'] and luminance[i] > 128:
+                flags.append('theme-mismatch')
+            for other_entry, j in zip(entries, shipped):
+                if j != i and distances[i, j] <= NEAR_DUPLICATE_BITS:
+                    flags.append(f"near-duplicate:{other_entry['file']}")
+            if entry['source'].startswith('app-store/'):
+                for j, rel in enumerate(rels):
+                    if rel.startswith('journey/') and distances[i, j] <= NEAR_DUPLICATE_BITS \
+                            and digests[j] != digests[i]:
+                        flags.append(f'possibly-stale:{rel}')
+            entry['validation'] = {
+                'phash': np.packbits(hashes[i]).tobytes().hex(),
+                'background': [int(c) for c in backgrounds[i]],
+                'flags': flags,
+            }
+            if flags:
+                flagged += 1
+                print(f"  ⚠ {device}/{entry['file']} ← {entry['source']}: {', '.join(flags)}")
+
+    # Tree-wide findings that do not affect the shipped set
+    for i in np.flatnonzero(blank):
+        print(f'  · blank: {rels[i]}')
+    pairs = [(rels[i], rels[j], int(distances[i, j]))
+             for i, j in zip(*np.nonzero(np.triu(distances <= NEAR_DUPLICATE_BITS, k=1)))
+             if digests[i] != digests[j]]
+    for a, b, d in pairs[:20]:
+        print(f'  · near-duplicate ({d} bits): {a} ~ {b}')
+    if len(pairs) > 20:
+        print(f'  · … {len(pairs) - 20} more near-duplicate pairs')
+    print(f'Validated {len(paths)} images in {time.perf_counter() - t0:.2f}s '
+          f'(decode {decoded - t0:.2f}s): {flagged} shipped screen(s) flagged, '
+          f'{int(blank.sum())} blank, {len(pairs)} near-duplicate pairs in the trees')
+    return flagged
+
+
+def load_previous_manifest() -> dict[str, dict]:
+    """Entries of the last build keyed by 'iphone/<file>' / 'ipad/<file>' (empty if unusable)."""
+    path = OUT / 'manifest.json'
+    try:
+        payload = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if payload.get('pipelineVersion') != PIPELINE_VERSION:
+        return {}
+    return {
+        f'{device}/{entry["file"]}': entry
+        for device in ('iphone', 'ipad')
+        for entry in payload.get(device, [])
+    }
 
 
-def rebuild_iphone(out_dir: Path) -> list[dict]:
-    if out_dir.exists():
-        shutil.rmtree(out_dir)
-    out_dir.mkdir(parents=True)
-    manifest: list[dict] = []
+class Build:
+    """One incremental build: decides per screen whether to re-render it."""
 
-    print('iPhone ASC set (8 screens)…')
-    for rel, name, label in IPHONE_ASC:
+    def __init__(self, previous: dict[str, dict], force: bool,
+                 compress_level: int = DEFAULT_COMPRESS_LEVEL) -> None:
+        self.previous = previous
+        self.force = force
+        self.compress_level = compress_level
+        self.pending: list[tuple[Path, Path, tuple[int, int]]] = []
+        self.rebuilt = 0
+        self.unchanged = 0
+        self.removed = 0
+
+    def screen(self, out_dir: Path, rel: str, name: str, label: str,
+               target: tuple[int, int], optional: bool = False) -> dict:
         src = resolve_src(rel)
         if not src.exists():
             raise FileNotFoundError(src)
-        copy_or_resize(src, out_dir / name, IPHONE_SIZE)
-        manifest.append({'file': name, 'source': rel, 'screen': label, 'size': list(IPHONE_SIZE)})
+        previous = self.previous.get(f'{out_dir.name}/{name}')
+        digest = file_sha256(src)
+        dest = out_dir / name
+        up_to_date = (
+            not self.force
+            and previous is not None
+            and previous.get('sourceSha256') == digest
+            and previous.get('source') == rel
+            and previous.get('size') == list(target)
+            and previous.get('compressLevel') == self.compress_level
+            and dest.exists()
+        )
+        if up_to_date:
+            self.unchanged += 1
+        else:
+            self.pending.append((src, dest, target))
+        entry = {'file': name, 'source': rel, 'screen': label, 'size': list(target),
+                 'sourceSha256': digest, 'compressLevel': self.compress_level}
+        # Keep the last validation result while the source is unchanged (see --validate)
+        if previous is not None and previous.get('sourceSha256') == digest and 'validation' in previous:
+            entry['validation'] = previous['validation']
+        if optional:
+            entry['optional'] = True
+        return entry
+
+    def render(self, jobs: int) -> None:
+        """Render the pending screens, in a process pool when there is more than one."""
+        if not self.pending:
+            return
+        t0 = time.perf_counter()
+        print(f'Rendering {len(self.pending)} screen(s) with {min(jobs, len(self.pending))} worker(s)…')
+        busy_ms = 0.0
+        if jobs <= 1 or len(self.pending) == 1:
+            results = ((job, copy_or_resize(*job, self.compress_level)) for job in self.pending)
+            for job, timings in results:
+                busy_ms += self._report(job, timings)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {pool.submit(copy_or_resize, *job, self.compress_level): job for job in self.pending}
+                for future in as_completed(futures):
+                    busy_ms += self._report(futures[future], future.result())
+        wall_ms = (time.perf_counter() - t0) * 1000
+        print(f'  {len(self.pending)} screens in {wall_ms / 1000:.2f}s '
+              f'(per-image times add up to {busy_ms / 1000:.2f}s)')
+
+    def _report(self, job: tuple[Path, Path, tuple[int, int]], timings: dict) -> float:
+        src, dest, target = job
+        self.rebuilt += 1
+        stages = ', '.join(f'{stage} {ms:.0f}ms' for stage, ms in timings.items())
+        total = sum(timings.values())
+        print(f'  ✓ {dest.parent.name}/{dest.name} ← {src.name} ({target[0]}×{target[1]}) '
+              f'{total:.0f}ms: {stages}')
+        return total
+
+    def prune(self, out_dir: Path, manifest: list[dict]) -> None:
+        """Delete outputs that are no longer part of the set."""
+        keep = {entry['file'] for entry in manifest}
+        for path in out_dir.glob('*.png'):
+            if path.name not in keep:
+                path.unlink()
+                self.removed += 1
+                print(f'  ✗ {path.name} (no longer in the set)')
+
+
+def rebuild_iphone(out_dir: Path, build: Build) -> list[dict]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest: list[dict] = []
+
+    print('iPhone ASC set (8 screens)…')
+    for rel, name, label in IPHONE_ASC:
+        manifest.append(build.screen(out_dir, rel, name, label, IPHONE_SIZE))
 
     print('iPhone practice…')
     for rel, name, label in IPHONE_PRACTICE:
-        src = resolve_src(rel)
-        if not src.exists():
-            raise FileNotFoundError(src)
-        copy_or_resize(src, out_dir / name, IPHONE_SIZE)
-        manifest.append({'file': name, 'source': rel, 'screen': label, 'size': list(IPHONE_SIZE), 'optional': True})
+        manifest.append(build.screen(out_dir, rel, name, label, IPHONE_SIZE, optional=True))
 
+    build.prune(out_dir, manifest)
     return manifest
 
 
-def rebuild_ipad(out_dir: Path) -> list[dict]:
-    if out_dir.exists():
-        shutil.rmtree(out_dir)
-    out_dir.mkdir(parents=True)
+def rebuild_ipad(out_dir: Path, build: Build) -> list[dict]:
+    out_dir.mkdir(parents=True, exist_ok=True)
     manifest: list[dict] = []
 
     print('iPad base (v2.4.2)…')
     for name in IPAD_CARRY:
-        src = SRC_242 / 'ipad' / name
-        if not src.exists():
-            raise FileNotFoundError(src)
-        copy_or_resize(src, out_dir / name, IPAD_SIZE)
-        manifest.append({'file': name, 'source': f'app-store/v2.4.2/ipad/{name}', 'screen': name, 'size': list(IPAD_SIZE)})
+        manifest.append(build.screen(out_dir, f'app-store/v2.4.2/ipad/{name}', name, name, IPAD_SIZE))
 
     print('iPad practice…')
     for rel, name, label in IPAD_PRACTICE:
-        src = resolve_src(rel)
-        if not src.exists():
-            raise FileNotFoundError(src)
-        copy_or_resize(src, out_dir / name, IPAD_SIZE)
-        manifest.append({'file': name, 'source': rel, 'screen': label, 'size': list(IPAD_SIZE), 'optional': True})
+        manifest.append(build.screen(out_dir, rel, name, label, IPAD_SIZE, optional=True))
 
+    build.prune(out_dir, manifest)
     return manifest
 
 
 def write_manifest(iphone: list[dict], ipad: list[dict]) -> None:
     payload = {
         'version': VERSION,
+        'pipelineVersion': PIPELINE_VERSION,
         'iphoneAscSize': list(IPHONE_SIZE),
         'ipadAscSize': list(IPAD_SIZE),
         'iphone': iphone,
         'ipad': ipad,
     }
-    (OUT / 'manifest.json').write_text(json.dumps(payload, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    text = json.dumps(payload, indent=2, ensure_ascii=False) + '\n'
+    path = OUT / 'manifest.json'
+    # Leave the file (and its mtime) alone when nothing changed
+    if not path.exists() or path.read_text(encoding='utf-8') != text:
+        path.write_text(text, encoding='utf-8')
 
 
 def main() -> None:
-    iphone_manifest = rebuild_iphone(OUT / 'iphone')
-    ipad_manifest = rebuild_ipad(OUT / 'ipad')
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--force', action='store_true', help='Re-render every screen')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: all cores; each holds about one full-resolution image)')
+    parser.add_argument('--compress-level', type=int, default=DEFAULT_COMPRESS_LEVEL, choices=range(10),
+                        metavar='0-9', help=f'PNG zlib level (default {DEFAULT_COMPRESS_LEVEL})')
+    parser.add_argument('--validate', action='store_true',
+                        help='Check sources for blank screens, near-duplicates and mismatches (recorded in manifest.json)')
+    parser.add_argument('--strict', action='store_true', help='With --validate: exit 1 if a shipped screen is flagged')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    build = Build(load_previous_manifest(), args.force, args.compress_level)
+    iphone_manifest = rebuild_iphone(OUT / 'iphone', build)
+    ipad_manifest = rebuild_ipad(OUT / 'ipad', build)
+    build.render(args.jobs)
+    flagged = 0
+    if args.validate:
+        print('Validating sources…')
+        flagged = validate({'iphone': iphone_manifest, 'ipad': ipad_manifest}, args.jobs)
     write_manifest(iphone_manifest, ipad_manifest)
-    print(f'\nDone → {OUT}')
+    print(f'\nDone → {OUT} ({build.rebuilt} rebuilt, {build.unchanged} unchanged, '
+          f'{build.removed} removed in {time.perf_counter() - t0:.2f}s)')
     print('Update README.md manually if slot table changed; see manifest.json for sources.')
+    if args.strict and flagged:
+        sys.exit(1)
 
 
 if __name__ == '__main__':